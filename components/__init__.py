@@ -1,11 +1,35 @@
 # Written by: Christopher Gholmieh
 # Imports:
 
-# Calculator:
-from .calculator import Calculator
+# Importlib:
+from importlib import import_module
 
-# Writer:
-from .writer import Writer
+# Typing:
+from typing import Dict, Any
 
-# Agent:
-from .learner import Learner 
\ No newline at end of file
+
+# Components:
+# NOTE: Components are imported lazily, so the runtime never imports pandas or sklearn, and training tools never import Phidget22 or RPi.GPIO.
+COMPONENTS: Dict[str, str] = {
+    # Calculator:
+    "Calculator": ".calculator",
+
+    # Writer:
+    "Writer": ".writer",
+
+    # Agent:
+    "Learner": ".learner",
+
+    # Runtime:
+    "Runtime": ".runtime",
+}
+
+__all__ = list(COMPONENTS)
+
+
+# Methods:
+def __getattr__(name: str) -> Any:
+    if name not in COMPONENTS:
+        raise AttributeError("module {} has no attribute {}".format(__name__, name))
+
+    return getattr(import_module(COMPONENTS[name], __name__), name)
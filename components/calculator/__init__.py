@@ -3,3 +3,12 @@
 
 # Calculator:
 from .calculator import Calculator
+
+# Replay:
+from .replay import ReplaySpatial
+
+# Alignment:
+from .alignment import Aligner
+
+# Graph:
+from .graph import SensorGraph
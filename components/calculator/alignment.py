@@ -0,0 +1,178 @@
+# Written by: Christopher Gholmieh
+# Imports:
+
+# Profiler:
+from components.profiler import Histogram
+
+# Typing:
+from typing import Optional, Dict, List, Sequence
+
+# Numpy:
+import numpy
+
+
+# Aligner:
+class Aligner:
+    """
+    * Pairs the samples of every IMU (thigh and shank by default) at a common instant using their device timestamps, rather than combining whichever samples arrived last.
+        * Each device clock is mapped onto the host clock by the lowest observed (host - device) offset, the offset with the least transport delay.
+        * The offset leaks upwards by DRIFT per device millisecond, so it follows the drift of the device clocks.
+
+    * The common instant is the oldest of the newest samples, every IMU has been observed up to it.
+        * The values of the other IMUs are linearly interpolated between their samples around that instant, then normalized.
+        * NOTE: Meant for the unit orientation vectors of the acceleration mode, interpolating quaternions would also need a sign check.
+
+    * Statistics (nanosecond histograms):
+        * skew: time between the newest and oldest of the newest samples at each pairing.
+        * jitter: deviation of every host inter-arrival time from the matching device interval, all IMUs combined.
+
+    * NOTE: Not locked, the calculator pushes and pairs under its condition.
+    """
+
+    # Constants:
+    CAPACITY: int = 8
+
+    DRIFT: float = 1e-3
+
+    # Initialization:
+    def __init__(self, sensors: int = 2, width: int = 3, capacity: int = CAPACITY) -> None:
+        # Sensors:
+        self.sensors: int = sensors
+
+        # Capacity:
+        self.capacity: int = capacity
+
+        # Samples:
+        # NOTE: Ring buffers of the aligned times (host milliseconds) and values of each IMU, one row per IMU like Calculator.orientations.
+        self.times: numpy.ndarray = numpy.zeros((sensors, capacity), dtype=numpy.float64)
+        self.values: numpy.ndarray = numpy.zeros((sensors, capacity, width), dtype=numpy.float32)
+
+        self.counts: List[int] = [0] * sensors
+
+        # Clocks:
+        self.offsets: List[Optional[float]] = [None] * sensors
+
+        self.device_timestamps: List[float] = [0.0] * sensors
+        self.host_timestamps: List[int] = [0] * sensors
+
+        # Newest:
+        self.newest: numpy.ndarray = numpy.zeros(sensors, dtype=numpy.float64)
+
+        # Scratch:
+        # NOTE: Interpolation and normalization work in place, pairing allocates no arrays.
+        self.difference: numpy.ndarray = numpy.zeros(width, dtype=numpy.float32)
+        self.norms: numpy.ndarray = numpy.zeros(sensors, dtype=numpy.float32)
+
+        # Statistics:
+        self.skew: Histogram = Histogram()
+        self.jitter: Histogram = Histogram()
+
+    # Methods:
+    def push(self, imu: int, device_timestamp: float, host_timestamp: int, values: Sequence[float]) -> None:
+        """
+        * Adds a sample of an IMU (its row, 0: thigh and 1: shank by default), with its device timestamp (milliseconds) and host arrival time (monotonic nanoseconds).
+        """
+
+        # Variables (Assignment):
+        # Offset:
+        offset: float = host_timestamp / 1e6 - device_timestamp
+
+        # Logic:
+        if self.counts[imu]:
+            # Variables (Assignment):
+            # Interval:
+            interval: float = device_timestamp - self.device_timestamps[imu]
+
+            # Statistics:
+            self.jitter.record(int(abs((host_timestamp - self.host_timestamps[imu]) - interval * 1e6)))
+
+            # Offset:
+            offset = min(self.offsets[imu] + self.DRIFT * max(interval, 0.0), offset)
+
+        self.offsets[imu] = offset
+
+        self.device_timestamps[imu] = device_timestamp
+        self.host_timestamps[imu] = host_timestamp
+
+        # Variables (Assignment):
+        # Slot:
+        slot: int = self.counts[imu] % self.capacity
+
+        # Logic:
+        self.times[imu, slot] = device_timestamp + offset
+        self.values[imu, slot] = values
+
+        self.counts[imu] += 1
+
+    def interpolate(self, imu: int, instant: float, output: numpy.ndarray) -> None:
+        # Variables (Assignment):
+        # Newest:
+        newest: int = self.counts[imu] - 1
+
+        # Oldest:
+        oldest: int = max(self.counts[imu] - self.capacity, 0)
+
+        # Logic:
+        for index in range(newest, oldest, -1):
+            # Variables (Assignment):
+            # Previous & Next:
+            previous: int = (index - 1) % self.capacity
+            following: int = index % self.capacity
+
+            # Logic:
+            if self.times[imu, previous] <= instant:
+                # Variables (Assignment):
+                # Span:
+                span: float = self.times[imu, following] - self.times[imu, previous]
+
+                # Weight:
+                weight: float = (instant - self.times[imu, previous]) / span if span > 0.0 else 1.0
+
+                # Logic:
+                numpy.subtract(self.values[imu, following], self.values[imu, previous], out=self.difference)
+                numpy.multiply(self.difference, weight, out=self.difference)
+                numpy.add(self.values[imu, previous], self.difference, out=output)
+
+                return
+
+        # NOTE: The instant precedes every buffered sample, the oldest one is the closest.
+        output[:] = self.values[imu, oldest % self.capacity]
+
+    def pair(self, output: numpy.ndarray) -> Optional[float]:
+        """
+        * Writes the values of every IMU at their latest common instant into output (sensors, width), returning that instant (host milliseconds).
+            * Returns None, leaving output untouched, until every IMU delivered a sample.
+        """
+
+        # Logic:
+        if not all(self.counts):
+            return None
+
+        # Variables (Assignment):
+        # Newest:
+        for imu in range(self.sensors):
+            self.newest[imu] = self.times[imu, (self.counts[imu] - 1) % self.capacity]
+
+        # Instant:
+        instant: float = float(self.newest.min())
+
+        # Statistics:
+        self.skew.record(int((self.newest.max() - instant) * 1e6))
+
+        # Logic:
+        # NOTE: The IMU whose newest sample is the oldest is taken as is, the other ones are interpolated back to it.
+        for imu in range(self.sensors):
+            if self.newest[imu] == instant:
+                output[imu] = self.values[imu, (self.counts[imu] - 1) % self.capacity]
+            else:
+                self.interpolate(imu, instant, output[imu])
+
+        numpy.einsum("ij,ij->i", output, output, out=self.norms)
+        numpy.sqrt(self.norms, out=self.norms)
+
+        output /= self.norms[:, numpy.newaxis]
+
+        return instant
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {"skew": self.skew.summary(), "jitter": self.jitter.summary()}
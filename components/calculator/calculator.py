@@ -9,48 +9,102 @@ from Phidget22.Devices.Spatial import Spatial
 from loguru import logger
 
 # Typing:
-from typing import Optional, List, Any
+from typing import Optional, Callable, Tuple, List, Any
 
 # CTypes:
 import ctypes
 
-# Scipy:
-from scipy.spatial.transform import Rotation
-
 # Numpy:
 import numpy
 
+# Features:
+from components.learner.features import FeatureExtractor
+
+# Recorder:
+from components.recorder import Recorder
+
+# Alignment:
+from components.calculator.alignment import Aligner
+
+# Graph:
+from components.calculator.graph import SensorGraph
+
 # Math:
 from math import degrees, acos
 
 # Time:
-from time import sleep
+from time import sleep, monotonic_ns
 
+# Threading:
+from threading import Condition, RLock
 
-# Stack:
-class Stack:
+# Functools:
+from functools import partial
+
+
+# Ring Buffer:
+class RingBuffer:
     """
-    * Used to contain the past nth readings of the accelerometer or gyroscope.
+    * Used to contain the past nth readings of the accelerometer and gyroscope in a preallocated float32 array.
         * Readings of the accelerometer or gyroscope can be used to predict current movement/gait state.
+
+    * Every row is written twice (at head and head + limit), so the newest readings are always one contiguous slice.
+        * NOTE: Appends and snapshots are guarded by the lock, which may be shared to snapshot several buffers at once.
     """
 
     # Initialization:
-    def __init__(self, limit: int) -> None:
+    def __init__(self, limit: int, width: int, lock: Optional[Any] = None) -> None:
         # Limit:
         self.limit: int = limit
 
-        # Stack:
-        self.stack: List[Any] = []
+        # Width:
+        self.width: int = width
+
+        # Buffer:
+        self.buffer: numpy.ndarray = numpy.zeros((2 * limit, width), dtype=numpy.float32)
+
+        # Head:
+        self.head: int = 0
+
+        # Count:
+        self.count: int = 0
+
+        # Lock:
+        self.lock: Any = lock if lock is not None else RLock()
 
     # Methods:
-    def append(self, value: Any) -> None:
-        self.stack.append(value)
+    def append(self, *values: List[float]) -> None:
+        with self.lock:
+            # Variables (Assignment):
+            # Column:
+            column: int = 0
+
+            # Logic:
+            for value in values:
+                self.buffer[self.head, column:column + len(value)] = value
+                self.buffer[self.head + self.limit, column:column + len(value)] = value
+
+                column += len(value)
+
+            self.head = (self.head + 1) % self.limit
+            self.count = min(self.count + 1, self.limit)
+
+    def view(self) -> numpy.ndarray:
+        """
+        * Returns a zero-copy (limit, width) view of the readings, oldest first.
+            * NOTE: Only consistent while the lock is held, use snapshot otherwise.
+        """
+
+        return self.buffer[self.head:self.head + self.limit]
 
-        if len(self.stack) > self.limit:
-            self.stack.pop(0)
+    def snapshot(self, output: numpy.ndarray) -> numpy.ndarray:
+        with self.lock:
+            numpy.copyto(output, self.view())
+
+        return output
 
     def __len__(self) -> int:
-        return len(self.stack)
+        return self.count
 
 
 # Calculator:
@@ -61,44 +115,202 @@ class Calculator:
 
         * NOTE: When calibrating, keep knee fully extended.
 
+        * Quaternion mode measures the flexion as the z Euler component (extrinsic xyz) of the shank rotation relative to the thigh, through the C bindings.
+
     * 4/6/2025: Introducing functionality of C integrations.
+
+    * The spatial factory creates every IMU, pass a ReplaySpatial factory to run without the Phidget devices.
+
+    * The sensor graph declares the IMUs and the joints between them, the single knee (thigh and shank) by default (see SensorGraph).
+        * Every per-IMU state (orientations, quaternions, samples, readings, features) is one array or list with a row per sensor.
+        * The thigh and shank attributes are views of the actuated joint's rows, which calculate, step, and the lookup table act on.
+        * calculate_joints computes the angles of every joint in a single native call, whatever the amount of sensors.
+
+    * Acceleration mode fuses the gyroscope and accelerometer of every sample through a native complementary filter.
+        * The time constant (seconds) sets how long the gyroscope is trusted before the accelerometer corrects it.
+        * NOTE: A time constant of 0 falls back to the normalized acceleration of the latest sample.
+        * When fusing, the IMUs run at their minimum data interval, and only every decimation-th sample (the one closest to the data
+          interval) is buffered, recorded, featurized, and wakes wait_for_sample, so the control loop and the learner keep the data interval.
+
+    * With a feature horizon, every reading also updates a FeatureExtractor per IMU (see snapshot_features).
+
+    * With align, the orientations are paired at a common device instant before calculating (see Aligner and align).
+        * NOTE: Only available in acceleration mode, the skew and jitter statistics are kept by the aligner.
+
+    * With a lookup resolution, the pulse modulation is also available through a table keyed on the quantized orientation dot product.
+        * The table is rebuilt by calibrate, the maximum flexion error of a resolution is given by lookup_error.
+        * NOTE: Only available in acceleration mode, the quaternion flexion does not depend on a single dot product.
+
+    * The array methods (fuse_orientations, calculate_flexion_angles, calculate_quaternion_flexion_angles, calculate_pulse_modulations) process whole
+      recordings in one native call each, for offline replay and analysis, and need neither the IMUs nor actuation.
     """
 
+    # Constants:
+    WINDOW_SIZE: int = 3
+
+    TIME_CONSTANT: float = 0.5
+
+    LOOKUP_RESOLUTION: int = 16384
+
     # Initialization:
-    def __init__(self, use_quaternions: bool = False, debug: bool = False) -> None:
+    def __init__(self, use_quaternions: bool = False, debug: bool = False, data_interval: Optional[int] = None, spatial_factory: Optional[Callable[[], Any]] = None, profiler: Optional[Any] = None, time_constant: float = TIME_CONSTANT, feature_horizon: int = 0, recorder: Optional[Recorder] = None, align: bool = False, lookup_resolution: int = 0, graph: Optional[SensorGraph] = None) -> None:
+        # Validation:
+        if align and use_quaternions:
+            raise ValueError("Alignment is only available in acceleration mode!")
+
+        if lookup_resolution and use_quaternions:
+            raise ValueError("The pulse modulation table is only available in acceleration mode!")
+
+        if lookup_resolution == 1 or lookup_resolution < 0:
+            raise ValueError("The pulse modulation table must hold at least 2 entries!")
+
+        # Graph:
+        self.graph: SensorGraph = graph if graph is not None else SensorGraph.knee()
+
+        # Sensors:
+        sensors: int = len(self.graph)
+
+        # NOTE: Rows of the actuated joint's proximal (thigh) and distal (shank) sensors.
+        self.thigh_index, self.shank_index = self.graph.pair()
+
         # Orientations:
-        self.thigh_orientation: numpy.ndarray = numpy.array([0.0, 0.0, 1.0])
-        self.shank_orientation: numpy.ndarray = numpy.array([0.0, 0.0, 1.0])
+        # NOTE: Preallocated float32 buffers (one row per sensor) updated in place, so their pointers can be handed to the C bindings once.
+        self.orientations: numpy.ndarray = numpy.zeros((sensors, 3), dtype=numpy.float32)
+        self.orientations[:, 2] = 1.0
+
+        self.sensor_pointers: List[Any] = [orientation.ctypes.data_as(ctypes.POINTER(ctypes.c_float)) for orientation in self.orientations]
+
+        self.thigh_orientation: numpy.ndarray = self.orientations[self.thigh_index]
+        self.shank_orientation: numpy.ndarray = self.orientations[self.shank_index]
+
+        self.thigh_pointer: Any = self.sensor_pointers[self.thigh_index]
+        self.shank_pointer: Any = self.sensor_pointers[self.shank_index]
+
+        # Samples:
+        # NOTE: The latest [acceleration, angular_rotation] of each IMU, fused into the orientations by the C bindings.
+        self.samples: numpy.ndarray = numpy.zeros((sensors, 6), dtype=numpy.float32)
+
+        self.sample_pointers: List[Tuple[Any, Any]] = [
+            (sample[:3].ctypes.data_as(ctypes.POINTER(ctypes.c_float)), sample[3:].ctypes.data_as(ctypes.POINTER(ctypes.c_float))) for sample in self.samples
+        ]
+
+        self.thigh_sample: numpy.ndarray = self.samples[self.thigh_index]
+        self.shank_sample: numpy.ndarray = self.samples[self.shank_index]
+
+        self.thigh_sample_pointers: Tuple[Any, Any] = self.sample_pointers[self.thigh_index]
+        self.shank_sample_pointers: Tuple[Any, Any] = self.sample_pointers[self.shank_index]
+
+        # Fusion:
+        self.time_constant: float = time_constant
+
+        self.timestamps: List[Optional[float]] = [None] * sensors
+
+        # Decimation:
+        # NOTE: Set by actuate once the data interval of every IMU is known, every sample is kept until then.
+        self.decimations: List[int] = [1] * sensors
+        self.counts: List[int] = [0] * sensors
 
         # Quaternions:
         self.use_quaternions: bool = use_quaternions
 
-        self.thigh_quaternion: numpy.ndarray = numpy.array([1.0, 0.0, 0.0, 0.0])
-        self.shank_quaternion: numpy.ndarray = numpy.array([1.0, 0.0, 0.0, 0.0])
+        self.fusing: bool = not use_quaternions and time_constant > 0
 
-        # Actuated:
-        self.actuated: bool = False
+        # NOTE: Quaternions are [w, x, y, z], stored like the orientations in preallocated float32 buffers.
+        self.quaternions: numpy.ndarray = numpy.zeros((sensors, 4), dtype=numpy.float32)
+        self.quaternions[:, 0] = 1.0
+
+        self.thigh_quaternion: numpy.ndarray = self.quaternions[self.thigh_index]
+        self.shank_quaternion: numpy.ndarray = self.quaternions[self.shank_index]
+
+        self.thigh_quaternion_pointer: Any = self.thigh_quaternion.ctypes.data_as(ctypes.POINTER(ctypes.c_float))
+        self.shank_quaternion_pointer: Any = self.shank_quaternion.ctypes.data_as(ctypes.POINTER(ctypes.c_float))
+
+        # Alignment:
+        # NOTE: The aligned orientations are filled by align, calculations read them instead of the latest orientations when aligning.
+        self.aligner: Optional[Aligner] = Aligner(sensors) if align else None
+
+        self.aligned: numpy.ndarray = self.orientations.copy()
 
-        # Offset:
+        self.orientation_pointers: Tuple[Any, Any] = (
+            (self.aligned[self.thigh_index].ctypes.data_as(ctypes.POINTER(ctypes.c_float)), self.aligned[self.shank_index].ctypes.data_as(ctypes.POINTER(ctypes.c_float)))
+            if align else (self.thigh_pointer, self.shank_pointer)
+        )
+
+        # Joints:
+        # NOTE: Preallocated like the orientations, calculate_joints hands every pointer to a single native call.
+        self.calibration_offsets: numpy.ndarray = numpy.zeros(len(self.graph.joints), dtype=numpy.float32)
+
+        # NOTE: The actuated joint's offset, mirrored as a plain float so the hot path never converts a numpy scalar, calibrate sets both.
         self.calibration_offset: float = 0.0
+        self.joint_angles: numpy.ndarray = numpy.zeros(len(self.graph.joints), dtype=numpy.float32)
+
+        self.joint_arguments: Tuple[Any, ...] = (
+            (self.quaternions if use_quaternions else self.aligned if align else self.orientations).ctypes.data_as(ctypes.POINTER(ctypes.c_float)),
+            self.graph.proximal.ctypes.data_as(ctypes.POINTER(ctypes.c_int)), self.graph.distal.ctypes.data_as(ctypes.POINTER(ctypes.c_int)),
+            ctypes.c_int(len(self.graph.joints)),
+            self.calibration_offsets.ctypes.data_as(ctypes.POINTER(ctypes.c_float)), self.joint_angles.ctypes.data_as(ctypes.POINTER(ctypes.c_float)),
+        )
+
+        # Lookup:
+        # NOTE: A preallocated uint8 table indexed by the quantized dot product, filled by build_modulation_table.
+        self.lookup_resolution: int = lookup_resolution
+
+        self.modulation_table: Optional[numpy.ndarray] = numpy.zeros(lookup_resolution, dtype=numpy.uint8) if lookup_resolution else None
+        self.modulation_table_pointer: Any = self.modulation_table.ctypes.data_as(ctypes.POINTER(ctypes.c_ubyte)) if lookup_resolution else None
+
+        # Actuated:
+        self.actuated: bool = False
 
         # Debug:
         self.debug: bool = debug
 
+        # Profiler:
+        self.profiler: Optional[Any] = profiler
+
+        # Recorder:
+        # NOTE: Copies every sample into the session recorder (see Recorder), which writes them off the handler threads.
+        self.recorder: Optional[Recorder] = recorder
+
+        # NOTE: Samples carry their graph row, the session names every row after the graph's sensors.
+        if self.recorder is not None:
+            self.recorder.set_sensors(dict(zip(self.graph.sensors, self.graph.serials)))
+
+        self.sample_time: int = 0
+
+        # Factory:
+        spatial_factory = spatial_factory if spatial_factory is not None else Spatial
+
         # IMUs:
-        self.thigh_imu: Spatial = Spatial()
-        self.shank_imu: Spatial = Spatial()
+        self.imus: List[Spatial] = [spatial_factory() for _ in range(sensors)]
+
+        for imu, serial in zip(self.imus, self.graph.serials):
+            imu.setDeviceSerialNumber(serial)
+
+        self.thigh_imu: Spatial = self.imus[self.thigh_index]
+        self.shank_imu: Spatial = self.imus[self.shank_index]
+
+        # Interval:
+        self.data_interval: Optional[int] = data_interval
+
+        # Synchronization:
+        self.condition: Condition = Condition()
 
-        # Serial:
-        self.thigh_imu.setDeviceSerialNumber(721783)
-        self.shank_imu.setDeviceSerialNumber(721888)
+        self.sequences: List[int] = [0] * sensors
+        self.consumed_sequences: List[int] = [0] * sensors
 
-        # Stacks:
-        self.thigh_acceleration_readings: Stack = Stack(limit=3)
-        self.thigh_gyroscope_readings: Stack = Stack(limit=3)
+        # Buffers:
+        self.readings: List[RingBuffer] = [RingBuffer(limit=self.WINDOW_SIZE, width=6, lock=self.condition) for _ in range(sensors)]
 
-        self.shank_acceleration_readings: Stack = Stack(limit=3)
-        self.shank_gyroscope_readings: Stack = Stack(limit=3)
+        self.thigh_readings: RingBuffer = self.readings[self.thigh_index]
+        self.shank_readings: RingBuffer = self.readings[self.shank_index]
+
+        # Window:
+        self.window: numpy.ndarray = numpy.zeros((sensors, self.WINDOW_SIZE, 6), dtype=numpy.float32)
+
+        # Features:
+        self.extractors: Optional[List[FeatureExtractor]] = [FeatureExtractor(feature_horizon) for _ in range(sensors)] if feature_horizon else None
+
+        self.features: numpy.ndarray = numpy.zeros((sensors, FeatureExtractor.SIZE), dtype=numpy.float32)
 
         # Library:
         self.library: ctypes.CDLL = ctypes.CDLL("./one-step-optimizations/calculator-optimizations.so")
@@ -117,42 +329,351 @@ class Calculator:
 
         self.library.calculate_flexion_angle.restype = ctypes.c_float
 
+        self.library.calculate_quaternion_flexion_angle.argtypes = [
+            ctypes.POINTER(ctypes.c_float),
+            ctypes.POINTER(ctypes.c_float),
+            ctypes.c_float,
+        ]
+
+        self.library.calculate_quaternion_flexion_angle.restype = ctypes.c_float
+
+        self.library.calibrate_quaternion_flexion.argtypes = [
+            ctypes.POINTER(ctypes.c_float),
+            ctypes.POINTER(ctypes.c_float),
+        ]
+
+        self.library.calibrate_quaternion_flexion.restype = ctypes.c_float
+
+        self.library.update_orientation.argtypes = [
+            ctypes.POINTER(ctypes.c_float),
+            ctypes.POINTER(ctypes.c_float),
+            ctypes.POINTER(ctypes.c_float),
+            ctypes.c_float,
+            ctypes.c_float,
+        ]
+
+        self.library.update_orientation.restype = None
+
+        self.library.fuse_orientations.argtypes = [
+            ctypes.POINTER(ctypes.c_float),
+            ctypes.POINTER(ctypes.c_float),
+            ctypes.POINTER(ctypes.c_float),
+            ctypes.c_int,
+            ctypes.c_float,
+            ctypes.POINTER(ctypes.c_float),
+        ]
+
+        self.library.fuse_orientations.restype = None
+
+        self.library.calculate_flexion_angles.argtypes = [
+            ctypes.POINTER(ctypes.c_float),
+            ctypes.POINTER(ctypes.c_float),
+            ctypes.c_int,
+            ctypes.c_float,
+            ctypes.POINTER(ctypes.c_float),
+        ]
+
+        self.library.calculate_flexion_angles.restype = None
+
+        self.library.calculate_quaternion_flexion_angles.argtypes = [
+            ctypes.POINTER(ctypes.c_float),
+            ctypes.POINTER(ctypes.c_float),
+            ctypes.c_int,
+            ctypes.c_float,
+            ctypes.POINTER(ctypes.c_float),
+        ]
+
+        self.library.calculate_quaternion_flexion_angles.restype = None
+
+        self.library.calculate_pulse_modulations.argtypes = [
+            ctypes.POINTER(ctypes.c_float),
+            ctypes.c_int,
+            ctypes.POINTER(ctypes.c_ubyte),
+        ]
+
+        self.library.calculate_pulse_modulations.restype = None
+
+        self.library.calculate_joint_angles.argtypes = [
+            ctypes.POINTER(ctypes.c_float),
+            ctypes.POINTER(ctypes.c_int),
+            ctypes.POINTER(ctypes.c_int),
+            ctypes.c_int,
+            ctypes.POINTER(ctypes.c_float),
+            ctypes.POINTER(ctypes.c_float),
+        ]
+
+        self.library.calculate_joint_angles.restype = None
+
+        self.library.calculate_quaternion_joint_angles.argtypes = [
+            ctypes.POINTER(ctypes.c_float),
+            ctypes.POINTER(ctypes.c_int),
+            ctypes.POINTER(ctypes.c_int),
+            ctypes.c_int,
+            ctypes.POINTER(ctypes.c_float),
+            ctypes.POINTER(ctypes.c_float),
+        ]
+
+        self.library.calculate_quaternion_joint_angles.restype = None
+
+        self.library.build_modulation_table.argtypes = [
+            ctypes.POINTER(ctypes.c_ubyte),
+            ctypes.c_int,
+            ctypes.c_float,
+        ]
+
+        self.library.build_modulation_table.restype = None
+
+        self.library.lookup_pulse_modulation.argtypes = [
+            ctypes.POINTER(ctypes.c_float),
+            ctypes.POINTER(ctypes.c_float),
+            ctypes.POINTER(ctypes.c_ubyte),
+            ctypes.c_int,
+        ]
+
+        self.library.lookup_pulse_modulation.restype = ctypes.c_int
+
+        # Lookup:
+        # NOTE: A separate function object without argtypes, called with preconverted arguments like the fused Step.
+        self.lookup: Any = self.library["lookup_pulse_modulation"]
+        self.lookup.restype = ctypes.c_int
+
+        self.lookup_arguments: Tuple[Any, ...] = (*self.orientation_pointers, self.modulation_table_pointer, ctypes.c_int(lookup_resolution))
+
+        # Table:
+        if self.modulation_table is not None:
+            self.build_modulation_table()
+
     # Methods:
     def calculate_pulse_modulation(self, angle: float) -> int:
-        return self.library.calculate_pulse_modulation(angle)
+        if self.profiler is None:
+            return self.library.calculate_pulse_modulation(angle)
 
-    def handle_thigh_imu(self, spatial: Spatial, acceleration: List[float], angular_rotation: List[float], magnetic_field: List[float], timestamp: float) -> None:
-        if not self.actuated:
-            logger.error("[*] Handler set when calculator not Actuated.")
+        # Variables (Assignment):
+        # Start:
+        start: int = monotonic_ns()
 
-            return
+        # Modulation:
+        modulation: int = self.library.calculate_pulse_modulation(angle)
 
-        self.thigh_gyroscope_readings.append(angular_rotation)
-        self.thigh_acceleration_readings.append(acceleration)
+        # Logic:
+        self.profiler.record("modulation", start)
 
-        try:
-            if self.use_quaternions:
-                # Variables (Assignment):
-                # Quaternion:
-                quaternion = spatial.getQuaternion()
+        return modulation
 
-                # Logic:
-                self.thigh_quaternion = numpy.array([quaternion.w, quaternion.x, quaternion.y, quaternion.z])
-            else:
-                self.thigh_orientation = numpy.array([acceleration[0], acceleration[1], acceleration[2]])
+    @staticmethod
+    def lookup_error(resolution: int) -> float:
+        """
+        * Returns the maximum flexion error (degrees) of a pulse modulation table of the given resolution.
+            * The dot product moves by at most 1 / (resolution - 1) when quantized, acos is steepest at the ends of the range.
+            * NOTE: One pulse modulation step spans 180 / 224 degrees, an error below it (resolution 16384 and up) changes the modulation by at most one.
+        """
 
-                self.thigh_orientation = self.thigh_orientation / numpy.linalg.norm(self.thigh_orientation)
-        except PhidgetException as exception:
-            logger.error(f"[!] Error: {exception}")
+        return degrees(acos(1.0 - 1.0 / (resolution - 1)))
+
+    def build_modulation_table(self) -> None:
+        self.library.build_modulation_table(self.modulation_table_pointer, self.lookup_resolution, self.calibration_offset)
+
+    def lookup_pulse_modulation(self) -> int:
+        """
+        * Maps the current (or aligned) orientations straight to the pulse modulation through the table, without the flexion angle.
+        """
+
+        # Profiler:
+        if self.profiler is not None:
+            start: int = monotonic_ns()
+
+        # Logic:
+        with self.condition:
+            # Alignment:
+            if self.aligner is not None:
+                self.align()
+
+            modulation: int = self.lookup(*self.lookup_arguments)
+
+        if self.profiler is not None:
+            self.profiler.record("modulation", start)
+
+        return modulation
+
+    @staticmethod
+    def contiguous(array: Any, width: Optional[int], name: str) -> numpy.ndarray:
+        """
+        * Returns the array as C-contiguous float32 rows of the given width (1-d without one), copying only when it is not already.
+        """
+
+        # Variables (Assignment):
+        # Array:
+        array = numpy.ascontiguousarray(array, dtype=numpy.float32)
+
+        # Validation:
+        if (array.ndim != 1) if width is None else (array.ndim != 2 or array.shape[1] != width):
+            raise ValueError("{} must be {} float32 array, got shape {}!".format(name, "a (count,)" if width is None else "a (count, {})".format(width), array.shape))
+
+        # Logic:
+        return array
+
+    @staticmethod
+    def output(output: Optional[numpy.ndarray], count: int, dtype: Any, name: str, width: Optional[int] = None) -> numpy.ndarray:
+        # Variables (Assignment):
+        # Shape:
+        shape: Tuple[int, ...] = (count,) if width is None else (count, width)
+
+        # Logic:
+        if output is None:
+            return numpy.empty(shape, dtype=dtype)
+
+        # Validation:
+        if output.shape != shape or output.dtype != dtype or not output.flags.c_contiguous:
+            raise ValueError("{} output must be a contiguous {} {} array!".format(name.capitalize(), shape, numpy.dtype(dtype).name))
+
+        # Logic:
+        return output
+
+    def fuse_orientations(self, readings: Any, intervals: Any, orientation: Optional[numpy.ndarray] = None, output: Optional[numpy.ndarray] = None) -> numpy.ndarray:
+        """
+        * Fuses (count, 6) [acceleration..., angular_rotation...] readings of one IMU into their (count, 3) float32 orientations in one native call.
+            * Intervals are the (count,) seconds elapsed before every reading, a non-positive one resets the estimate like the first sample.
+            * The (3,) float32 orientation estimate is modified in place and left at the last reading, so consecutive chunks continue it.
+            * NOTE: Matches the handlers reading by reading (update_orientation with the calculator's time constant).
+        """
+
+        # Variables (Assignment):
+        # Readings & Intervals:
+        readings = self.contiguous(readings, 6, "Readings")
+        intervals = self.contiguous(intervals, None, "Intervals")
+
+        # Validation:
+        if len(readings) != len(intervals):
+            raise ValueError("Readings and intervals must hold the same amount of rows!")
+
+        # Orientation:
+        if orientation is None:
+            orientation = numpy.array([0.0, 0.0, 1.0], dtype=numpy.float32)
+
+        elif orientation.shape != (3,) or orientation.dtype != numpy.float32:
+            raise ValueError("Orientation must be a (3,) float32 array!")
+
+        # Output:
+        output = self.output(output, len(readings), numpy.float32, "orientation", 3)
+
+        # Logic:
+        self.library.fuse_orientations(
+            orientation.ctypes.data_as(ctypes.POINTER(ctypes.c_float)), readings.ctypes.data_as(ctypes.POINTER(ctypes.c_float)),
+            intervals.ctypes.data_as(ctypes.POINTER(ctypes.c_float)), len(output), self.time_constant, output.ctypes.data_as(ctypes.POINTER(ctypes.c_float))
+        )
+
+        return output
+
+    def calculate_flexion_angles(self, thigh_orientations: Any, shank_orientations: Any, calibration_offset: Optional[float] = None, output: Optional[numpy.ndarray] = None) -> numpy.ndarray:
+        """
+        * Calculates the (count,) float32 flexion angles of (count, 3) thigh and shank orientations in one native call.
+            * Contiguous float32 arrays (and the output) are passed without copies, the calibration offset defaults to the calibrated one.
+        """
+
+        # Variables (Assignment):
+        # Orientations:
+        thigh_orientations = self.contiguous(thigh_orientations, 3, "Thigh orientations")
+        shank_orientations = self.contiguous(shank_orientations, 3, "Shank orientations")
+
+        # Validation:
+        if len(thigh_orientations) != len(shank_orientations):
+            raise ValueError("Thigh and shank orientations must hold the same amount of rows!")
+
+        # Output:
+        output = self.output(output, len(thigh_orientations), numpy.float32, "flexion")
+
+        # Logic:
+        self.library.calculate_flexion_angles(
+            thigh_orientations.ctypes.data_as(ctypes.POINTER(ctypes.c_float)), shank_orientations.ctypes.data_as(ctypes.POINTER(ctypes.c_float)), len(output),
+            self.calibration_offset if calibration_offset is None else calibration_offset, output.ctypes.data_as(ctypes.POINTER(ctypes.c_float))
+        )
+
+        return output
+
+    def calculate_quaternion_flexion_angles(self, thigh_quaternions: Any, shank_quaternions: Any, calibration_offset: Optional[float] = None, output: Optional[numpy.ndarray] = None) -> numpy.ndarray:
+        """
+        * Calculates the (count,) float32 flexion angles of (count, 4) [w, x, y, z] thigh and shank quaternions in one native call.
+            * Contiguous float32 arrays (and the output) are passed without copies, the calibration offset defaults to the calibrated one.
+        """
+
+        # Variables (Assignment):
+        # Quaternions:
+        thigh_quaternions = self.contiguous(thigh_quaternions, 4, "Thigh quaternions")
+        shank_quaternions = self.contiguous(shank_quaternions, 4, "Shank quaternions")
+
+        # Validation:
+        if len(thigh_quaternions) != len(shank_quaternions):
+            raise ValueError("Thigh and shank quaternions must hold the same amount of rows!")
+
+        # Output:
+        output = self.output(output, len(thigh_quaternions), numpy.float32, "flexion")
+
+        # Logic:
+        self.library.calculate_quaternion_flexion_angles(
+            thigh_quaternions.ctypes.data_as(ctypes.POINTER(ctypes.c_float)), shank_quaternions.ctypes.data_as(ctypes.POINTER(ctypes.c_float)), len(output),
+            self.calibration_offset if calibration_offset is None else calibration_offset, output.ctypes.data_as(ctypes.POINTER(ctypes.c_float))
+        )
+
+        return output
+
+    def calculate_pulse_modulations(self, angles: Any, output: Optional[numpy.ndarray] = None) -> numpy.ndarray:
+        """
+        * Maps (count,) angles in degrees to their (count,) uint8 pulse modulations in one native call.
+        """
+
+        # Variables (Assignment):
+        # Angles:
+        angles = self.contiguous(angles, None, "Angles")
+
+        # Output:
+        output = self.output(output, len(angles), numpy.uint8, "modulation")
+
+        # Logic:
+        self.library.calculate_pulse_modulations(angles.ctypes.data_as(ctypes.POINTER(ctypes.c_float)), len(angles), output.ctypes.data_as(ctypes.POINTER(ctypes.c_ubyte)))
+
+        return output
+
+    def handle_imu(self, index: int, spatial: Spatial, acceleration: List[float], angular_rotation: List[float], magnetic_field: List[float], timestamp: float) -> None:
+        """
+        * Spatial data handler of the IMU at the given sensor row, bound to every IMU with its row by actuate.
+        """
+
+        # Profiler:
+        if self.profiler is not None:
+            start: int = monotonic_ns()
 
-    def handle_shank_imu(self, spatial: Spatial, acceleration: List[float], angular_rotation: List[float], magnetic_field: List[float], timestamp: float) -> None:
         if not self.actuated:
             logger.error("[*] Handler set when calculator not Actuated.")
 
             return
 
-        self.shank_gyroscope_readings.append(angular_rotation)
-        self.shank_acceleration_readings.append(acceleration)
+        # Decimation:
+        self.counts[index] += 1
+
+        kept: bool = self.counts[index] % self.decimations[index] == 0
+
+        if kept:
+            if self.recorder is not None:
+                self.recorder.record(index, acceleration, angular_rotation, magnetic_field, timestamp)
+
+            if self.profiler is not None:
+                buffered: int = monotonic_ns()
+
+            if self.extractors is not None:
+                # Variables (Assignment):
+                # Quantized:
+                # NOTE: Encoded outside the condition, only the running sums update holds it (see FeatureExtractor.push).
+                quantized: List[int] = self.extractors[index].encode(acceleration, angular_rotation)
+
+                # NOTE: Appended under the condition, so a window snapshot and a features snapshot always cover the same readings.
+                with self.condition:
+                    self.readings[index].append(acceleration, angular_rotation)
+                    self.extractors[index].push(quantized)
+            else:
+                self.readings[index].append(acceleration, angular_rotation)
+
+            if self.profiler is not None:
+                self.profiler.record("buffer", buffered)
 
         try:
             if self.use_quaternions:
@@ -161,22 +682,111 @@ class Calculator:
                 quaternion = spatial.getQuaternion()
 
                 # Logic:
-                self.shank_quaternion = numpy.array([quaternion.w, quaternion.x, quaternion.y, quaternion.z])
+                with self.condition:
+                    self.quaternions[index] = (quaternion.w, quaternion.x, quaternion.y, quaternion.z)
             else:
-                self.shank_orientation = numpy.array([acceleration[0], acceleration[1], acceleration[2]])
-
-                self.shank_orientation = self.shank_orientation / numpy.linalg.norm(self.shank_orientation)
+                with self.condition:
+                    # Sample:
+                    self.samples[index, :3] = acceleration
+                    self.samples[index, 3:] = angular_rotation
+
+                    # Fusion:
+                    self.library.update_orientation(
+                        self.sensor_pointers[index], *self.sample_pointers[index],
+                        (timestamp - self.timestamps[index]) / 1000 if self.timestamps[index] is not None else 0.0, self.time_constant
+                    )
+
+                    self.timestamps[index] = timestamp
+
+                    # Alignment:
+                    if self.aligner is not None:
+                        self.aligner.push(index, timestamp, monotonic_ns(), self.orientations[index])
         except PhidgetException as exception:
             logger.error(f"[!] Error: {exception}")
 
+        # Logic:
+        if kept:
+            with self.condition:
+                self.sequences[index] += 1
+
+                self.condition.notify_all()
+
+        # Profiler:
+        if self.profiler is not None:
+            self.sample_time = start
+
+            self.profiler.record("callback", start)
+
+    def ready(self) -> bool:
+        return all(len(readings) == self.WINDOW_SIZE for readings in self.readings)
+
+    def snapshot(self) -> numpy.ndarray:
+        """
+        * Copies the window of every IMU into one contiguous (sensors, WINDOW_SIZE, 6) float32 array under a single lock.
+            * Each row is [acceleration_x, acceleration_y, acceleration_z, angular_rotation_x, angular_rotation_y, angular_rotation_z].
+            * NOTE: The returned array is reused by the next snapshot, index it with thigh_index and shank_index.
+        """
+
+        with self.condition:
+            for index, readings in enumerate(self.readings):
+                readings.snapshot(self.window[index])
+
+        return self.window
+
+    def snapshot_features(self) -> numpy.ndarray:
+        """
+        * Computes the FeatureExtractor features of every IMU into one (sensors, FeatureExtractor.SIZE) float32 array under a single lock.
+            * NOTE: The returned array is reused by the next snapshot, it holds zeros without a feature horizon.
+        """
+
+        if self.extractors is None:
+            return self.features
+
+        with self.condition:
+            for index, extractor in enumerate(self.extractors):
+                extractor.values(self.features[index])
+
+        return self.features
+
+    def align(self) -> numpy.ndarray:
+        """
+        * Pairs the orientations of every IMU at their latest common device instant into the (sensors, 3) aligned orientations.
+            * Before every IMU delivered a sample (or without an aligner), the latest orientations are copied as they are.
+            * NOTE: The caller holds the condition, the returned array is reused by the next call.
+        """
+
+        if self.aligner is None or self.aligner.pair(self.aligned) is None:
+            numpy.copyto(self.aligned, self.orientations)
+
+        return self.aligned
+
+    def wait_for_sample(self, timeout: Optional[float] = None) -> bool:
+        """
+        * Blocks until every IMU has delivered a new reading since the previous call.
+            * Returns False when the timeout elapses before a synchronized reading of every IMU arrives.
+        """
+
+        with self.condition:
+            # Variables (Assignment):
+            # Ready:
+            ready: bool = self.condition.wait_for(
+                lambda: all(sequence > consumed for sequence, consumed in zip(self.sequences, self.consumed_sequences)), timeout
+            )
+
+            # Logic:
+            if ready:
+                self.consumed_sequences[:] = self.sequences
+
+            return ready
+
     def terminate(self) -> None:
         if not self.actuated:
             logger.error("[*] Attempted to terminate when calculator not Actuated.")
 
             return
 
-        self.thigh_imu.close()
-        self.shank_imu.close()
+        for imu in self.imus:
+            imu.close()
 
         logger.info("[*] IMUs disconnected.")
 
@@ -189,36 +799,50 @@ class Calculator:
 
             return
 
-        # Variables (Assignment):
-        # Dot:
-        dot_product = numpy.dot(self.thigh_orientation, self.shank_orientation)
+        with self.condition:
+            # Variables (Assignment):
+            # Orientations:
+            orientations: numpy.ndarray = self.align() if self.aligner is not None else self.orientations
 
-        # Logic:
-        self.calibration_offset = degrees(acos(self.clamp(-1.0, dot_product, 1.0)))
+            # Logic:
+            for joint, (proximal, distal) in enumerate(zip(self.graph.proximal.tolist(), self.graph.distal.tolist())):
+                if self.use_quaternions:
+                    # NOTE: The quaternion offset is negated, so the flexion component of the extended joint reads as zero.
+                    self.calibration_offsets[joint] = -self.library.calibrate_quaternion_flexion(
+                        self.quaternions[proximal].ctypes.data_as(ctypes.POINTER(ctypes.c_float)), self.quaternions[distal].ctypes.data_as(ctypes.POINTER(ctypes.c_float))
+                    )
+                else:
+                    self.calibration_offsets[joint] = degrees(acos(self.clamp(-1.0, numpy.dot(orientations[proximal], orientations[distal]), 1.0)))
+
+        self.calibration_offset = float(self.calibration_offsets[0])
 
         logger.warning(f"[*] Calibrated angle: {self.calibration_offset}")
 
+        if len(self.graph.joints) > 1:
+            logger.warning("[*] Calibrated joint angles: {}".format(", ".join("{}: {}".format(joint, offset) for joint, offset in zip(self.graph.joints, self.calibration_offsets.tolist()))))
+
+        if self.modulation_table is not None:
+            self.build_modulation_table()
+
+        if self.recorder is not None:
+            self.recorder.mark("calibrated")
+
     def calculate(self) -> Optional[float]:
         if not self.actuated:
             logger.error("[*] Attempted to calculate when calculator not Actuated.")
 
             return
 
+        # Profiler:
+        if self.profiler is not None:
+            start: int = monotonic_ns()
+
         try:
             if self.use_quaternions:
                 # Variables (Assignment):
-                # Rotations:
-                rotation_thigh = Rotation.from_quat(self.thigh_quaternion)
-                rotation_shank = Rotation.from_quat(self.shank_quaternion)
-
-                # Rotation:
-                relative_rotation = rotation_shank * rotation_thigh.inv()
-
-                # Euler:
-                euler_angles = relative_rotation.as_euler("xyz", degrees=True)
-
                 # Flexion:
-                flexion: float = self.clamp(0.0, euler_angles[2], 180.0)
+                with self.condition:
+                    flexion: float = self.library.calculate_quaternion_flexion_angle(self.thigh_quaternion_pointer, self.shank_quaternion_pointer, self.calibration_offset)
 
                 # Logic:
                 if self.debug:
@@ -227,12 +851,13 @@ class Calculator:
                 return flexion
             else:
                 # Variables (Assignment):
-                # Arrays:
-                thigh_array = (ctypes.c_float * 3)(*self.thigh_orientation)
-                shank_array = (ctypes.c_float * 3)(*self.shank_orientation)
-
                 # Flexion:
-                flexion: float = self.library.calculate_flexion_angle(thigh_array, shank_array, self.calibration_offset)
+                with self.condition:
+                    # Alignment:
+                    if self.aligner is not None:
+                        self.align()
+
+                    flexion: float = self.library.calculate_flexion_angle(*self.orientation_pointers, self.calibration_offset)
 
                 # Logic:
                 if self.debug:
@@ -243,6 +868,58 @@ class Calculator:
         except Exception as exception:
             logger.error(f"[!] Error: {exception}")
 
+        finally:
+            if self.profiler is not None:
+                self.profiler.record("calculate", start)
+
+    def calculate_joints(self) -> Optional[numpy.ndarray]:
+        """
+        * Calculates the angle of every joint of the sensor graph in a single native call, returning a (joints,) float32 array.
+            * The first angle is the actuated joint's flexion, as returned by calculate.
+            * NOTE: The returned array is reused by the next call.
+        """
+
+        if not self.actuated:
+            logger.error("[*] Attempted to calculate when calculator not Actuated.")
+
+            return
+
+        # Profiler:
+        if self.profiler is not None:
+            start: int = monotonic_ns()
+
+        # Logic:
+        with self.condition:
+            if self.use_quaternions:
+                self.library.calculate_quaternion_joint_angles(*self.joint_arguments)
+            else:
+                # Alignment:
+                if self.aligner is not None:
+                    self.align()
+
+                self.library.calculate_joint_angles(*self.joint_arguments)
+
+        if self.profiler is not None:
+            self.profiler.record("calculate", start)
+
+        if self.debug:
+            logger.info("[*] Joint angles: {}".format(", ".join("{}: {}".format(joint, angle) for joint, angle in zip(self.graph.joints, self.joint_angles.tolist()))))
+
+        return self.joint_angles
+
+    def step(self, writer: Any, stop: bool) -> Tuple[float, int]:
+        """
+        * Fast path calculating the flexion angle and pulse modulation, and writing the GPIO pins in a single native call.
+            * Requires a writer whose backend is fused (see Writer.fused), and is only available in acceleration mode.
+        """
+
+        with self.condition:
+            # Alignment:
+            if self.aligner is not None:
+                self.align()
+
+            return writer.step(*self.orientation_pointers, self.calibration_offset, stop)
+
     def clamp(self, minimum: float, value: float, maximum: float) -> float:
         return self.library.clamp(minimum, value, maximum)
 
@@ -251,21 +928,29 @@ class Calculator:
 
         try:
             # Initialization:
-            self.thigh_imu.openWaitForAttachment(5000)
-            self.shank_imu.openWaitForAttachment(5000)
+            for imu in self.imus:
+                imu.openWaitForAttachment(5000)
 
             # Logic:
             logger.info("[*} IMUs connected.")
 
-            self.thigh_imu.setOnSpatialDataHandler(self.handle_thigh_imu)
-            self.shank_imu.setOnSpatialDataHandler(self.handle_shank_imu)
+            for index, imu in enumerate(self.imus):
+                # NOTE: The filter integrates the gyroscope at the full IMU rate, the data interval is kept through decimation.
+                if self.fusing:
+                    imu.setDataInterval(imu.getMinDataInterval())
+                elif self.data_interval is not None:
+                    imu.setDataInterval(max(self.data_interval, imu.getMinDataInterval()))
+
+                if self.data_interval is not None:
+                    self.decimations[index] = max(1, round(self.data_interval / imu.getDataInterval()))
+
+                imu.setOnSpatialDataHandler(partial(self.handle_imu, index))
 
-            if not self.use_quaternions:
-                logger.info("[*] Waiting 2.0 seconds for proper calibration. Please keep knee fully extended during this time.")
+            logger.info("[*] Waiting 2.0 seconds for proper calibration. Please keep knee fully extended during this time.")
 
-                sleep(2.0)
+            sleep(2.0)
 
-                self.calibrate()
+            self.calibrate()
 
         except PhidgetException as exception:
             logger.error(f"[!] Error: {exception}")
@@ -0,0 +1,84 @@
+# Written by: Christopher Gholmieh
+# Imports:
+
+# Typing:
+from typing import Dict, List, Tuple, Sequence, Any
+
+# JSON:
+import json
+
+# Numpy:
+import numpy
+
+
+# Sensor Graph:
+class SensorGraph:
+    """
+    * Declares the IMUs of a leg (or both legs) by name and serial number, and the joints between them.
+        * Every joint is a (proximal, distal) pair of sensor names, such as ("thigh", "shank") for the knee.
+        * Sensors keep their declaration order, which is also their row in the calculator's orientation arrays.
+
+    * The first joint is the actuated one: the calculator's thigh and shank are its proximal and distal sensors.
+        * NOTE: The default graph (KNEE) is the single knee the joint was built around, with the original serial numbers.
+
+    * Graph files are JSON: {"sensors": {"thigh": 721783, ...}, "joints": {"knee": ["thigh", "shank"], ...}}.
+    """
+
+    # Constants:
+    KNEE: Dict[str, Any] = {
+        "sensors": {"thigh": 721783, "shank": 721888},
+        "joints": {"knee": ["thigh", "shank"]},
+    }
+
+    # Initialization:
+    def __init__(self, sensors: Dict[str, int], joints: Dict[str, Sequence[str]]) -> None:
+        # Validation:
+        if not joints:
+            raise ValueError("Sensor graph must declare at least one joint!")
+
+        for name, pair in joints.items():
+            # Validation:
+            if len(pair) != 2 or pair[0] == pair[1]:
+                raise ValueError("Joint {} must connect two different sensors!".format(name))
+
+            for sensor in pair:
+                if sensor not in sensors:
+                    raise ValueError("Joint {} references the undeclared sensor {}!".format(name, sensor))
+
+        # Sensors:
+        self.sensors: List[str] = list(sensors)
+        self.serials: List[int] = [int(serial) for serial in sensors.values()]
+
+        self.indices: Dict[str, int] = {sensor: index for index, sensor in enumerate(self.sensors)}
+
+        # Joints:
+        self.joints: List[str] = list(joints)
+
+        # NOTE: int32 index arrays, handed to the native joint kernels as they are.
+        self.proximal: numpy.ndarray = numpy.array([self.indices[pair[0]] for pair in joints.values()], dtype=numpy.int32)
+        self.distal: numpy.ndarray = numpy.array([self.indices[pair[1]] for pair in joints.values()], dtype=numpy.int32)
+
+    # Methods:
+    @classmethod
+    def knee(cls) -> "SensorGraph":
+        return cls(cls.KNEE["sensors"], cls.KNEE["joints"])
+
+    @classmethod
+    def load(cls, path: str) -> "SensorGraph":
+        # Variables (Assignment):
+        # Specification:
+        with open(path) as file:
+            specification: Dict[str, Any] = json.load(file)
+
+        # Logic:
+        return cls(specification["sensors"], specification["joints"])
+
+    def pair(self, joint: int = 0) -> Tuple[int, int]:
+        """
+        * Returns the (proximal, distal) sensor rows of a joint, (thigh, shank) for the actuated one.
+        """
+
+        return int(self.proximal[joint]), int(self.distal[joint])
+
+    def __len__(self) -> int:
+        return len(self.sensors)
@@ -0,0 +1,182 @@
+# Written by: Christopher Gholmieh
+# Imports:
+
+# Typing:
+from typing import Optional, Callable, List, Any
+
+# Threading:
+from threading import Thread, Event
+
+# Time:
+from time import perf_counter, sleep
+
+# CSV:
+import csv
+
+# Recorder:
+from components.recorder import Recorder
+
+
+# Quaternion:
+class ReplayQuaternion:
+    """
+    * Mirrors the w, x, y, z attributes of the Phidget quaternion, replays always report the identity rotation.
+    """
+
+    # Initialization:
+    def __init__(self) -> None:
+        # Components:
+        self.w: float = 1.0
+        self.x: float = 0.0
+        self.y: float = 0.0
+        self.z: float = 0.0
+
+
+# Replay Spatial:
+class ReplaySpatial:
+    """
+    * Stand-in for the Phidget Spatial device that streams recorded readings into the data handler.
+        * Rows are [acceleration_x, acceleration_y, acceleration_z, angular_rotation_x, angular_rotation_y, angular_rotation_z, ...].
+        * Session files (see Recorder) replay the records of the sensor the replay stands in for, looked up by its serial number
+          (once set) in the session's sensor table, the shank records when the session holds none for it.
+        * CSV recordings hold shank readings only, every replayed IMU streams them.
+        * The magnetic field is reported as zeros and timestamps are synthesized from the data interval.
+
+    * Speed scales the data interval: 1.0 replays in real time, 0.0 replays as fast as possible.
+        * NOTE: The replay starts over once the end of the recording is reached when looping.
+    """
+
+    # Constants:
+    DATA_INTERVAL: int = 16
+
+    # NOTE: Recordings are sampled at the data interval, a replay never streams them faster than they were recorded.
+    MINIMUM_DATA_INTERVAL: int = DATA_INTERVAL
+
+    # Initialization:
+    def __init__(self, path: str, speed: float = 1.0, loop: bool = True) -> None:
+        # Path:
+        self.path: str = path
+
+        # Speed:
+        self.speed: float = speed
+
+        # Loop:
+        self.loop: bool = loop
+
+        # Serial:
+        self.serial: int = 0
+
+        # Interval:
+        self.data_interval: int = self.DATA_INTERVAL
+
+        # Handler:
+        self.handler: Optional[Callable[..., None]] = None
+
+        # Readings:
+        # NOTE: Read on attachment, once the serial number tells which IMU of a session is replayed.
+        self.readings: List[List[float]] = []
+
+        # Thread:
+        self.thread: Optional[Thread] = None
+        self.stopped: Event = Event()
+
+    # Methods:
+    @staticmethod
+    def read(path: str, serial: int = 0) -> List[List[float]]:
+        # Logic:
+        if path.endswith(Recorder.EXTENSION):
+            # Variables (Assignment):
+            # Records, Labels & Sensors:
+            records, labels, sensors = Recorder.load(path)
+
+            # Sensor:
+            sensor: str = next((name for name, number in sensors.items() if number == serial), Recorder.SHANK)
+
+            # Readings:
+            readings, _ = Recorder.select(records, labels, sensors, sensor, labelled=False)
+
+            # Logic:
+            # NOTE: A session without records of the sensor (such as an imported CSV recording) replays its shank readings.
+            if not len(readings):
+                readings, _ = Recorder.select(records, labels, sensors, Recorder.SHANK, labelled=False)
+
+            return readings.tolist()
+
+        with open(path, newline="") as file:
+            # Variables (Assignment):
+            # Reader:
+            reader: Any = csv.reader(file)
+
+            # Header:
+            next(reader)
+
+            # Logic:
+            return [[float(value) for value in row[:6]] for row in reader if row]
+
+    def setDeviceSerialNumber(self, serial: int) -> None:
+        self.serial = serial
+
+    def getDeviceSerialNumber(self) -> int:
+        return self.serial
+
+    def setDataInterval(self, data_interval: int) -> None:
+        self.data_interval = data_interval
+
+    def getDataInterval(self) -> int:
+        return self.data_interval
+
+    def getMinDataInterval(self) -> int:
+        return self.MINIMUM_DATA_INTERVAL
+
+    def setOnSpatialDataHandler(self, handler: Callable[..., None]) -> None:
+        self.handler = handler
+
+    def getQuaternion(self) -> ReplayQuaternion:
+        return ReplayQuaternion()
+
+    def openWaitForAttachment(self, timeout: int) -> None:
+        # Readings:
+        self.readings = self.read(self.path, self.serial)
+
+        # Logic:
+        self.stopped.clear()
+
+        self.thread = Thread(target=self.stream, daemon=True)
+        self.thread.start()
+
+    def close(self) -> None:
+        # Logic:
+        self.stopped.set()
+
+        if self.thread is not None:
+            self.thread.join()
+
+    def stream(self) -> None:
+        # Variables (Assignment):
+        # Timestamp:
+        timestamp: float = 0.0
+
+        # Deadline:
+        deadline: float = perf_counter()
+
+        # Logic:
+        while not self.stopped.is_set():
+            for reading in self.readings:
+                # Logic:
+                if self.stopped.is_set():
+                    return
+
+                if self.handler is not None:
+                    self.handler(self, reading[0:3], reading[3:6], [0.0, 0.0, 0.0], timestamp)
+
+                # Timestamp:
+                timestamp += self.data_interval
+
+                # Interval:
+                if self.speed > 0.0:
+                    deadline += self.data_interval / 1000 / self.speed
+
+                    sleep(max(0.0, deadline - perf_counter()))
+
+            if not self.loop:
+                return
@@ -0,0 +1,237 @@
+# Written by: Christopher Gholmieh
+# Imports:
+
+# Typing:
+from typing import List, Optional, Sequence
+
+# Struct:
+from struct import Struct
+
+# Math:
+from math import sqrt
+
+# Numpy:
+import numpy
+
+
+# Feature Extractor:
+class FeatureExtractor:
+    """
+    * Gait features over the latest horizon readings of one IMU, updated in O(1) per reading and computed in batch for training.
+        * Per channel mean and variance of [acceleration_x, ..., angular_rotation_z], mean angular rotation magnitude,
+          and the amount of zero crossings of each angular rotation axis (see NAMES).
+        * Until horizon readings arrived (start of a recording), the features cover the readings available so far.
+
+    * Readings are quantized to fixed point (SCALE) and accumulated in int64, so the running sums are exact.
+        * The incremental update and the batch transform therefore produce bit-identical features, training and runtime match exactly.
+        * The update runs on the IMU handler threads, it keeps the running sums in Python integers and updates them with scalar arithmetic (no numpy calls).
+        * NOTE: Readings must stay below sqrt(2 ** 63 / (SCALE ** 2 * horizon)) in magnitude (about 2.3e4 with a horizon of 64).
+    """
+
+    # Constants:
+    SCALE: float = 16384.0
+
+    CHANNELS: int = 6
+
+    NAMES: List[str] = (
+        ["mean_" + channel for channel in ("acceleration_x", "acceleration_y", "acceleration_z", "angular_rotation_x", "angular_rotation_y", "angular_rotation_z")] +
+        ["variance_" + channel for channel in ("acceleration_x", "acceleration_y", "acceleration_z", "angular_rotation_x", "angular_rotation_y", "angular_rotation_z")] +
+        ["mean_angular_rotation_magnitude"] +
+        ["zero_crossings_" + channel for channel in ("angular_rotation_x", "angular_rotation_y", "angular_rotation_z")]
+    )
+
+    SIZE: int = len(NAMES)
+
+    READING: Struct = Struct("6f")
+
+    SQUARES: Struct = Struct("3f")
+
+    FLOAT: Struct = Struct("f")
+
+    # Initialization:
+    def __init__(self, horizon: int = 25) -> None:
+        # Validation:
+        if horizon < 2:
+            raise ValueError("Feature horizon must hold at least 2 readings!")
+
+        # Horizon:
+        self.horizon: int = horizon
+
+        # Readings:
+        # NOTE: Quantized [channels..., magnitude] and the zero crossing flags with the previous reading, one row per reading.
+        self.readings: List[List[int]] = [[0] * (self.CHANNELS + 1) for _ in range(horizon)]
+        self.crossings: List[List[int]] = [[0] * 3 for _ in range(horizon)]
+
+        # Sums:
+        self.sums: List[int] = [0] * (self.CHANNELS + 1)
+        self.squares: List[int] = [0] * self.CHANNELS
+        self.crossing_sums: List[int] = [0] * 3
+
+        # Count:
+        self.count: int = 0
+
+    # Methods:
+    @classmethod
+    def quantize(cls, readings: numpy.ndarray) -> numpy.ndarray:
+        """
+        * Quantizes (..., 6) float32 readings into (..., 7) int64 fixed point [channels..., angular rotation magnitude].
+        """
+
+        # Variables (Assignment):
+        # Readings:
+        readings = numpy.asarray(readings, dtype=numpy.float32)
+
+        # Magnitude:
+        # NOTE: Written out element-wise, reductions could sum in a different order for single readings and batches.
+        magnitude: numpy.ndarray = numpy.sqrt(readings[..., 3] * readings[..., 3] + readings[..., 4] * readings[..., 4] + readings[..., 5] * readings[..., 5])
+
+        # Logic:
+        return numpy.rint(numpy.concatenate([readings, magnitude[..., numpy.newaxis]], axis=-1) * numpy.float32(cls.SCALE)).astype(numpy.int64)
+
+    @classmethod
+    def finalize(cls, sums: numpy.ndarray, squares: numpy.ndarray, crossing_sums: numpy.ndarray, counts: numpy.ndarray, output: Optional[numpy.ndarray] = None) -> numpy.ndarray:
+        """
+        * Turns the integer sums into the float32 features, element-wise for a single reading (1-d) or a batch (2-d).
+        """
+
+        # Variables (Assignment):
+        # Counts:
+        counts = numpy.asarray(counts, dtype=numpy.float64)[..., numpy.newaxis]
+
+        # Means:
+        means: numpy.ndarray = sums / counts / cls.SCALE
+
+        # Variances:
+        variances: numpy.ndarray = numpy.maximum(squares / counts / (cls.SCALE * cls.SCALE) - means[..., :cls.CHANNELS] * means[..., :cls.CHANNELS], 0.0)
+
+        # Output:
+        if output is None:
+            output = numpy.zeros(sums.shape[:-1] + (cls.SIZE,), dtype=numpy.float32)
+
+        # Logic:
+        output[..., 0:6] = means[..., :cls.CHANNELS]
+        output[..., 6:12] = variances
+        output[..., 12] = means[..., cls.CHANNELS]
+        output[..., 13:16] = crossing_sums
+
+        return output
+
+    @classmethod
+    def float32(cls, value: float) -> float:
+        return cls.FLOAT.unpack(cls.FLOAT.pack(value))[0]
+
+    def encode(self, acceleration: Sequence[float], angular_rotation: Sequence[float]) -> List[int]:
+        """
+        * Quantizes a single reading exactly like quantize, without touching the extractor (see push).
+            * NOTE: quantize's float32 operations are performed in double and rounded to float32 after each one,
+              which is exact for +, *, and sqrt, so both quantize a reading to the same integers.
+        """
+
+        # Variables (Assignment):
+        # Reading:
+        reading: tuple = self.READING.unpack(self.READING.pack(*acceleration, *angular_rotation))
+
+        # Magnitude:
+        squares: tuple = self.SQUARES.unpack(self.SQUARES.pack(reading[3] * reading[3], reading[4] * reading[4], reading[5] * reading[5]))
+
+        magnitude: float = self.float32(sqrt(self.float32(self.float32(squares[0] + squares[1]) + squares[2])))
+
+        # Quantized:
+        # NOTE: Scaling by a power of two is exact in float32 and double alike, round rounds half to even like numpy.rint.
+        quantized: List[int] = [round(value * self.SCALE) for value in reading]
+        quantized.append(round(magnitude * self.SCALE))
+
+        return quantized
+
+    def push(self, quantized: List[int]) -> None:
+        """
+        * Adds an encoded reading, and drops the reading leaving the horizon from the running sums.
+        """
+
+        # Variables (Assignment):
+        # Slot:
+        slot: int = self.count % self.horizon
+
+        # Crossings:
+        previous: List[int] = self.readings[(self.count - 1) % self.horizon]
+
+        crossings: List[int] = [int((value < 0) != (last < 0)) for value, last in zip(quantized[3:6], previous[3:6])] if self.count > 0 else [0, 0, 0]
+
+        # Logic:
+        # NOTE: The reading leaving the horizon is dropped in the same pass, one list per running sum.
+        if self.count >= self.horizon:
+            # Variables (Assignment):
+            # Oldest & Leaving:
+            # NOTE: The oldest remaining reading loses its previous reading, so its crossing flag leaves the horizon.
+            oldest: List[int] = self.readings[slot]
+            leaving: List[int] = self.crossings[(slot + 1) % self.horizon]
+
+            # Logic:
+            self.sums = [total + value - old for total, value, old in zip(self.sums, quantized, oldest)]
+            self.squares = [total + value * value - old * old for total, value, old in zip(self.squares, quantized, oldest)]
+            self.crossing_sums = [total + flag - old for total, flag, old in zip(self.crossing_sums, crossings, leaving)]
+        else:
+            self.sums = [total + value for total, value in zip(self.sums, quantized)]
+            self.squares = [total + value * value for total, value in zip(self.squares, quantized)]
+            self.crossing_sums = [total + flag for total, flag in zip(self.crossing_sums, crossings)]
+
+        self.readings[slot] = quantized
+        self.crossings[slot] = crossings
+
+        self.count += 1
+
+    def update(self, acceleration: Sequence[float], angular_rotation: Sequence[float]) -> None:
+        # Logic:
+        self.push(self.encode(acceleration, angular_rotation))
+
+    def values(self, output: Optional[numpy.ndarray] = None) -> numpy.ndarray:
+        """
+        * Returns the features over the latest readings (zeros before the first reading).
+        """
+
+        # Logic:
+        if self.count == 0:
+            return numpy.zeros(self.SIZE, dtype=numpy.float32) if output is None else output
+
+        return self.finalize(
+            numpy.array(self.sums, dtype=numpy.int64), numpy.array(self.squares, dtype=numpy.int64), numpy.array(self.crossing_sums, dtype=numpy.int64),
+            min(self.count, self.horizon), output
+        )
+
+    @classmethod
+    def transform(cls, readings: numpy.ndarray, horizon: int, first: int = 0) -> numpy.ndarray:
+        """
+        * Batch features at every reading of a (rows, 6) recording, identical to updating an extractor reading by reading.
+            * First is the index of the first row within its recording, rows before it are missing from the horizons.
+            * NOTE: When first > 0, the horizon - 1 preceding readings are expected as the first rows (see Learner.stream_windows),
+              the features of those context rows are not complete.
+        """
+
+        # Variables (Assignment):
+        # Quantized:
+        quantized: numpy.ndarray = cls.quantize(readings)
+
+        # Rows:
+        rows: int = len(quantized)
+
+        # Crossings:
+        crossings: numpy.ndarray = numpy.zeros((rows, 3), dtype=numpy.int64)
+        crossings[1:] = (quantized[1:, 3:6] < 0) != (quantized[:-1, 3:6] < 0)
+
+        # Cumulative:
+        # NOTE: Cumulative sums may wrap around on long recordings, differences of wrapped int64 sums are still exact.
+        cumulative_sums: numpy.ndarray = numpy.concatenate([numpy.zeros((1, cls.CHANNELS + 1), dtype=numpy.int64), numpy.cumsum(quantized, axis=0)])
+        cumulative_squares: numpy.ndarray = numpy.concatenate([numpy.zeros((1, cls.CHANNELS), dtype=numpy.int64), numpy.cumsum(quantized[:, :cls.CHANNELS] ** 2, axis=0)])
+        cumulative_crossings: numpy.ndarray = numpy.concatenate([numpy.zeros((1, 3), dtype=numpy.int64), numpy.cumsum(crossings, axis=0)])
+
+        # Ends & Starts:
+        ends: numpy.ndarray = numpy.arange(rows)
+        starts: numpy.ndarray = numpy.maximum(ends - horizon + 1, 0)
+
+        # Logic:
+        return cls.finalize(
+            cumulative_sums[ends + 1] - cumulative_sums[starts],
+            cumulative_squares[ends + 1] - cumulative_squares[starts],
+            cumulative_crossings[ends + 1] - cumulative_crossings[starts + 1],
+            numpy.minimum(ends + first + 1, horizon),
+        )
@@ -0,0 +1,421 @@
+# Written by: Christopher Gholmieh
+# Imports:
+
+# Typing:
+from typing import Optional, List, Tuple, Any
+
+# Loguru:
+from loguru import logger
+
+# CTypes:
+import ctypes
+
+# Numpy:
+import numpy
+
+
+# Tables:
+class Tables(ctypes.Structure):
+    """
+    * Node tables of a bound forest, mirroring struct forest of the forest-optimizations C bindings.
+    """
+
+    # Fields:
+    _fields_ = [
+        ("features", ctypes.POINTER(ctypes.c_int)),
+        ("thresholds", ctypes.POINTER(ctypes.c_double)),
+        ("left_children", ctypes.POINTER(ctypes.c_int)),
+        ("right_children", ctypes.POINTER(ctypes.c_int)),
+        ("values", ctypes.POINTER(ctypes.c_double)),
+        ("roots", ctypes.POINTER(ctypes.c_int)),
+        ("tree_count", ctypes.c_int),
+        ("class_count", ctypes.c_int),
+    ]
+
+
+# Forest:
+class Forest:
+    """
+    * Flattened, array-backed representation of a fitted RandomForestClassifier.
+        * The node tables of every tree are concatenated, and children indices are absolute (LEAF for leaves).
+        * Values hold the class probabilities of each node, accumulated and compared exactly like sklearn.
+
+    * Prediction runs through the forest-optimizations C bindings once bound, or a vectorized numpy traversal otherwise.
+
+    * Forests can be saved to a versioned .forest file and memory-mapped back without importing sklearn:
+        * Header (64 bytes): MAGIC, then little-endian int32 version, tree count, node count, class count, feature count, label bytes,
+          feature horizon (0 when the forest only sees raw readings, see FeatureExtractor), then a float32 confidence threshold
+          (0 unless the forest is the first stage of a cascade, see Learner).
+        * Arrays (each 8-byte aligned): features (int32), thresholds (float64), left children (int32), right children (int32),
+          values (float64, node count x class count), roots (int32), labels (UTF-8, newline separated).
+    """
+
+    # Constants:
+    LEAF: int = -1
+
+    LIBRARY_PATH: str = "./one-step-optimizations/forest-optimizations.so"
+
+    # Format:
+    MAGIC: bytes = b"OSFOREST"
+    VERSION: int = 1
+
+    HEADER_SIZE: int = 64
+
+    # Initialization:
+    def __init__(self, features: numpy.ndarray, thresholds: numpy.ndarray, left_children: numpy.ndarray, right_children: numpy.ndarray, values: numpy.ndarray, roots: numpy.ndarray, classes: numpy.ndarray, feature_count: int, horizon: int = 0, confidence: float = 0.0) -> None:
+        # Nodes:
+        self.features: numpy.ndarray = numpy.ascontiguousarray(features, dtype=numpy.int32)
+        self.thresholds: numpy.ndarray = numpy.ascontiguousarray(thresholds, dtype=numpy.float64)
+
+        self.left_children: numpy.ndarray = numpy.ascontiguousarray(left_children, dtype=numpy.int32)
+        self.right_children: numpy.ndarray = numpy.ascontiguousarray(right_children, dtype=numpy.int32)
+
+        self.values: numpy.ndarray = numpy.ascontiguousarray(values, dtype=numpy.float64)
+
+        # Trees:
+        self.roots: numpy.ndarray = numpy.ascontiguousarray(roots, dtype=numpy.int32)
+
+        # Classes:
+        self.classes: numpy.ndarray = numpy.asarray(classes)
+
+        # Features:
+        self.feature_count: int = feature_count
+
+        self.horizon: int = horizon
+
+        # Confidence:
+        self.confidence: float = confidence
+
+        # Scratch:
+        self.probabilities: numpy.ndarray = numpy.zeros(len(self.classes), dtype=numpy.float64)
+        self.predictions: numpy.ndarray = numpy.zeros(1, dtype=numpy.int32)
+        self.decided: ctypes.c_int = ctypes.c_int(0)
+
+        # Library:
+        self.library: Optional[ctypes.CDLL] = None
+
+    # Methods:
+    @classmethod
+    def from_classifier(cls, classifier: Any, encoder: Any, horizon: int = 0, confidence: float = 0.0) -> "Forest":
+        # Variables (Declaration):
+        # Tables:
+        features, thresholds, left_children, right_children, values, roots = [], [], [], [], [], []
+
+        # Variables (Assignment):
+        # Offset:
+        offset: int = 0
+
+        # Logic:
+        for estimator in classifier.estimators_:
+            # Variables (Assignment):
+            # Tree:
+            tree: Any = estimator.tree_
+
+            # Leaves:
+            leaves: numpy.ndarray = tree.children_left == cls.LEAF
+
+            # Logic:
+            features.append(numpy.where(leaves, 0, tree.feature))
+            thresholds.append(tree.threshold)
+
+            left_children.append(numpy.where(leaves, cls.LEAF, tree.children_left + offset))
+            right_children.append(numpy.where(leaves, cls.LEAF, tree.children_right + offset))
+
+            values.append(tree.value[:, 0, :])
+            roots.append(offset)
+
+            offset += tree.node_count
+
+        return cls(
+            numpy.concatenate(features), numpy.concatenate(thresholds), numpy.concatenate(left_children), numpy.concatenate(right_children),
+            numpy.concatenate(values), numpy.array(roots), encoder.inverse_transform(classifier.classes_), classifier.n_features_in_, horizon, confidence
+        )
+
+    def save(self, path: str) -> None:
+        # Variables (Assignment):
+        # Labels:
+        labels: bytes = "\n".join(str(label) for label in self.classes).encode("utf-8")
+
+        # Header:
+        header: bytes = self.MAGIC + numpy.array(
+            [self.VERSION, len(self.roots), len(self.features), len(self.classes), self.feature_count, len(labels), self.horizon], dtype="<i4"
+        ).tobytes() + numpy.array([self.confidence], dtype="<f4").tobytes()
+
+        # Logic:
+        with open(path, "wb") as file:
+            file.write(header.ljust(self.HEADER_SIZE, b"\0"))
+
+            for segment in (self.features, self.thresholds, self.left_children, self.right_children, self.values, self.roots):
+                # Variables (Assignment):
+                # Data:
+                data: bytes = segment.astype(segment.dtype.newbyteorder("<")).tobytes()
+
+                # Logic:
+                file.write(data.ljust((len(data) + 7) // 8 * 8, b"\0"))
+
+            file.write(labels)
+
+    @classmethod
+    def read_header(cls, header: bytes, path: str) -> Tuple[int, int, int, int, int, int, float]:
+        """
+        * Returns the (tree count, node count, class count, feature count, label bytes, horizon, confidence) fields of a .forest header.
+        """
+
+        # Validation:
+        if header[:len(cls.MAGIC)] != cls.MAGIC:
+            raise ValueError("{} is not a forest file!".format(path))
+
+        # Variables (Assignment):
+        # Header:
+        # NOTE: Forests saved before the horizon and confidence existed hold zero padding in their place.
+        version, tree_count, node_count, class_count, feature_count, label_size, horizon = numpy.frombuffer(header[len(cls.MAGIC):len(cls.MAGIC) + 28], dtype="<i4").tolist()
+
+        confidence: float = float(numpy.frombuffer(header[len(cls.MAGIC) + 28:len(cls.MAGIC) + 32], dtype="<f4")[0])
+
+        # Validation:
+        if version != cls.VERSION:
+            raise ValueError("Unsupported forest file version {} (expected {})!".format(version, cls.VERSION))
+
+        # Logic:
+        return tree_count, node_count, class_count, feature_count, label_size, horizon, confidence
+
+    @staticmethod
+    def segments(tree_count: int, node_count: int, class_count: int) -> List[Tuple[str, int, int]]:
+        """
+        * Returns the (dtype, count, size) of every array of a .forest file in order, sizes padded to 8 bytes.
+        """
+
+        return [
+            (dtype, count, (numpy.dtype(dtype).itemsize * count + 7) // 8 * 8)
+            for dtype, count in (("<i4", node_count), ("<f8", node_count), ("<i4", node_count), ("<i4", node_count), ("<f8", node_count * class_count), ("<i4", tree_count))
+        ]
+
+    @classmethod
+    def describe(cls, path: str) -> Tuple[int, List[str]]:
+        """
+        * Returns the feature horizon and the labels of a .forest file, reading its header and label table only.
+        """
+
+        # Logic:
+        with open(path, "rb") as file:
+            # Variables (Assignment):
+            # Header:
+            tree_count, node_count, class_count, _, label_size, horizon, _ = cls.read_header(file.read(cls.HEADER_SIZE), path)
+
+            # Logic:
+            file.seek(cls.HEADER_SIZE + sum(size for _, _, size in cls.segments(tree_count, node_count, class_count)))
+
+            return horizon, file.read(label_size).decode("utf-8").split("\n")
+
+    @classmethod
+    def load(cls, path: str) -> "Forest":
+        """
+        * Memory-maps a .forest file, the node tables are views of the mapping rather than copies.
+        """
+
+        # Variables (Assignment):
+        # Mapping:
+        mapping: numpy.memmap = numpy.memmap(path, dtype=numpy.uint8, mode="r")
+
+        # Header:
+        tree_count, node_count, class_count, feature_count, label_size, horizon, confidence = cls.read_header(bytes(mapping[:cls.HEADER_SIZE]), path)
+
+        # Offset:
+        offset: int = cls.HEADER_SIZE
+
+        # Segments:
+        segments: List[numpy.ndarray] = []
+
+        # Logic:
+        for dtype, count, size in cls.segments(tree_count, node_count, class_count):
+            # Logic:
+            segments.append(mapping[offset:offset + numpy.dtype(dtype).itemsize * count].view(dtype))
+
+            offset += size
+
+        # Variables (Assignment):
+        # Labels:
+        labels: List[str] = bytes(mapping[offset:offset + label_size]).decode("utf-8").split("\n")
+
+        # Logic:
+        features, thresholds, left_children, right_children, values, roots = segments
+
+        return cls(
+            features, thresholds, left_children, right_children, values.reshape(node_count, class_count), roots, numpy.array(labels), feature_count, horizon, confidence
+        )
+
+    def bind(self, library_path: str = LIBRARY_PATH) -> bool:
+        # Logic:
+        try:
+            # Library:
+            self.library = ctypes.CDLL(library_path)
+        except OSError as exception:
+            # Logging:
+            logger.warning("[!] Forest library {} unavailable: {}".format(library_path, exception))
+
+            return False
+
+        self.library.predict_forest.restype = None
+        self.library.predict_forest.argtypes = [
+            ctypes.POINTER(ctypes.c_int),
+            ctypes.POINTER(ctypes.c_double),
+            ctypes.POINTER(ctypes.c_int),
+            ctypes.POINTER(ctypes.c_int),
+            ctypes.POINTER(ctypes.c_double),
+            ctypes.POINTER(ctypes.c_int),
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.POINTER(ctypes.c_float),
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.POINTER(ctypes.c_double),
+            ctypes.POINTER(ctypes.c_int),
+        ]
+
+        self.library.predict_cascade_window.restype = ctypes.c_int
+        self.library.predict_cascade_window.argtypes = [
+            ctypes.POINTER(Tables),
+            ctypes.c_double,
+            ctypes.POINTER(Tables),
+            ctypes.POINTER(ctypes.c_float),
+            ctypes.POINTER(ctypes.c_double),
+            ctypes.POINTER(ctypes.c_int),
+        ]
+
+        # Pointers:
+        self.arguments: tuple = (
+            self.features.ctypes.data_as(ctypes.POINTER(ctypes.c_int)),
+            self.thresholds.ctypes.data_as(ctypes.POINTER(ctypes.c_double)),
+            self.left_children.ctypes.data_as(ctypes.POINTER(ctypes.c_int)),
+            self.right_children.ctypes.data_as(ctypes.POINTER(ctypes.c_int)),
+            self.values.ctypes.data_as(ctypes.POINTER(ctypes.c_double)),
+            self.roots.ctypes.data_as(ctypes.POINTER(ctypes.c_int)),
+            len(self.roots),
+            len(self.classes),
+        )
+
+        self.probabilities_pointer: Any = self.probabilities.ctypes.data_as(ctypes.POINTER(ctypes.c_double))
+
+        self.tables: Any = ctypes.pointer(Tables(*self.arguments))
+
+        return True
+
+    def traverse(self, windows: numpy.ndarray) -> numpy.ndarray:
+        """
+        * Numpy fallback used when the C bindings are not compiled, walks every tree of every window level by level.
+            * Returns the summed class probabilities of every window, accumulated tree by tree like the C bindings.
+        """
+
+        # Variables (Assignment):
+        # Nodes:
+        nodes: numpy.ndarray = numpy.repeat(self.roots[numpy.newaxis, :], len(windows), axis=0)
+
+        # Rows:
+        rows: numpy.ndarray = numpy.arange(len(windows))[:, numpy.newaxis]
+
+        # Logic:
+        while True:
+            # Variables (Assignment):
+            # Children:
+            left_children: numpy.ndarray = self.left_children[nodes]
+
+            # Internal:
+            internal: numpy.ndarray = left_children != self.LEAF
+
+            # Logic:
+            if not internal.any():
+                break
+
+            # Variables (Assignment):
+            # Direction:
+            left: numpy.ndarray = windows[rows, self.features[nodes]].astype(numpy.float64) <= self.thresholds[nodes]
+
+            # Logic:
+            nodes = numpy.where(internal, numpy.where(left, left_children, self.right_children[nodes]), nodes)
+
+        # Variables (Assignment):
+        # Probabilities:
+        probabilities: numpy.ndarray = numpy.zeros((len(windows), len(self.classes)), dtype=numpy.float64)
+
+        # Logic:
+        for tree in range(len(self.roots)):
+            probabilities += self.values[nodes[:, tree]]
+
+        return probabilities
+
+    def predict(self, windows: numpy.ndarray) -> numpy.ndarray:
+        """
+        * Classifies an (n, feature_count) array of windows, returning the label of each window.
+            * NOTE: Float32 C-contiguous windows are passed to the C bindings without copying.
+        """
+
+        # Variables (Assignment):
+        # Windows:
+        windows = numpy.ascontiguousarray(windows, dtype=numpy.float32).reshape(-1, self.feature_count)
+
+        # Logic:
+        if self.library is None:
+            return self.classes[numpy.argmax(self.traverse(windows), axis=1)]
+
+        # Predictions:
+        if len(windows) > len(self.predictions):
+            self.predictions = numpy.zeros(len(windows), dtype=numpy.int32)
+
+        # Logic:
+        self.library.predict_forest(
+            *self.arguments,
+            windows.ctypes.data_as(ctypes.POINTER(ctypes.c_float)), len(windows), self.feature_count,
+            self.probabilities_pointer, self.predictions.ctypes.data_as(ctypes.POINTER(ctypes.c_int))
+        )
+
+        return self.classes[self.predictions[:len(windows)]]
+
+    def vote(self, windows: numpy.ndarray) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        * Classifies an (n, feature_count) array of windows through the numpy traversal, returning the class index and confidence of each window.
+            * The confidence is the share of the summed class probabilities held by the predicted class (1 when every tree agrees).
+        """
+
+        # Variables (Assignment):
+        # Windows:
+        windows = numpy.ascontiguousarray(windows, dtype=numpy.float32).reshape(-1, self.feature_count)
+
+        # Probabilities:
+        probabilities: numpy.ndarray = self.traverse(windows)
+
+        # Predictions:
+        predictions: numpy.ndarray = numpy.argmax(probabilities, axis=1)
+
+        # Totals:
+        totals: numpy.ndarray = probabilities.sum(axis=1)
+
+        # Logic:
+        return predictions, numpy.divide(probabilities[numpy.arange(len(windows)), predictions], totals, out=numpy.zeros(len(windows)), where=totals > 0)
+
+    def predict_cascade(self, forest: "Forest", window: numpy.ndarray) -> Tuple[str, bool]:
+        """
+        * Classifies a single float32 C-contiguous window with this forest as the first stage of a cascade in front of the given one.
+            * Returns the label, and whether this forest decided alone (its confidence reached self.confidence, see vote).
+            * NOTE: Both stages run in a single call to the C bindings once both are bound, the forests must share their classes.
+        """
+
+        # Logic:
+        if self.library is None or forest.library is None:
+            # Variables (Assignment):
+            # Predictions & Confidences:
+            predictions, confidences = self.vote(window)
+
+            # Logic:
+            if confidences[0] >= self.confidence:
+                return self.classes[predictions[0]], True
+
+            return forest.predict(window)[0], False
+
+        # Variables (Assignment):
+        # Prediction:
+        prediction: int = self.library.predict_cascade_window(
+            self.tables, self.confidence, forest.tables, window.ctypes.data_as(ctypes.POINTER(ctypes.c_float)), self.probabilities_pointer, ctypes.byref(self.decided)
+        )
+
+        # Logic:
+        return self.classes[prediction], bool(self.decided.value)
@@ -1,29 +1,35 @@
 # Written by: Christopher Gholmieh
 # Imports:
 
-# Collections:
-from collections import Counter
-
-# SKLearn:
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import LabelEncoder
-from sklearn.metrics import accuracy_score
-
 # Typing:
-from typing import Tuple, List
-
-# Joblib:
-from joblib import dump, load
+from typing import TYPE_CHECKING, Tuple, List, Dict, Union, Optional, Iterator, Sequence, Any
 
 # Loguru:
 from loguru import logger
 
-# Pandas:
-from pandas import DataFrame, read_csv
+# Forest:
+from .forest import Forest
+
+# Features:
+from .features import FeatureExtractor
+
+# Recorder:
+from components.recorder import Recorder
+
+# Time:
+from time import monotonic_ns
+
+# OS:
+import os
 
 # Numpy:
-from numpy import ndarray, array
+from numpy import ndarray, asarray, concatenate, unique, arange, empty, cumsum, argsort, nextafter, float32
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Training:
+if TYPE_CHECKING:
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.preprocessing import LabelEncoder
 
 
 # Learner:
@@ -31,10 +37,25 @@ class Learner:
     """
     * Predicts whether a person is moving forwards, moving backwards, or idle.
         * Used to decide whether the writer should send a signal.
+
+    * Learners are trained with sklearn, but predictions always run through the flattened Forest engine.
+        * A .forest learner path is memory-mapped directly, so sklearn and joblib are never imported at runtime.
+        * A .pkl learner path is unpickled with joblib and flattened after loading.
+
+    * With a feature horizon, every window is extended with the FeatureExtractor features at its last reading.
+        * Training computes them in batch, the runtime passes the features of the calculator (see Calculator.snapshot_features).
+        * The horizon is stored in .forest files, loading one restores it.
+
+    * Training validates on the most recent windows of the recording (time-ordered), never on windows shuffled in between training windows.
+        * NOTE: The windows overlapping the split are dropped, so no reading is shared by the training and validation windows.
+
+    * A cascade puts a shallow forest in front of the full one (see fit_cascade), saved next to the learner as -cascade.forest.
+        * The first stage decides alone when its confidence reaches its calibrated threshold (easy windows, such as standing still).
+        * Otherwise the full forest classifies the window, decisions counts how often each stage decided.
     """
 
     # Initialization:
-    def __init__(self, learner_path: str, estimators: int = 100) -> None:
+    def __init__(self, learner_path: str, estimators: int = 100, depth: Optional[int] = None, horizon: int = 0, profiler: Optional[Any] = None) -> None:
         # Constants:
         # Learner:
         self.learner_path: str = learner_path
@@ -48,57 +69,360 @@ class Learner:
         # State:
         self.state: int = 42
 
+        # Estimators:
+        self.estimators: int = estimators
+
+        # Depth:
+        self.depth: Optional[int] = depth
+
+        # Horizon:
+        self.horizon: int = horizon
+
+        # Validation:
+        self.validation_size: float = 0.2
+
         # Variables (Assignment):
         # Learner:
-        self.learner: RandomForestClassifier = RandomForestClassifier(
-            # Estimators:
-            n_estimators=estimators,
-
-            # State:
-            random_state=self.state,
-        )
+        self.learner: Optional["RandomForestClassifier"] = None
 
         # Encoder:
-        self.encoder: LabelEncoder = LabelEncoder()
+        self.encoder: Optional["LabelEncoder"] = None
+
+        # Forest:
+        self.forest: Optional[Forest] = None
+
+        # Cascade:
+        self.cascade: Optional[Forest] = None
+
+        # Decisions:
+        # NOTE: Predictions decided by the first stage of the cascade, then by the full forest.
+        self.decisions: List[int] = [0, 0]
+
+        # Buffer:
+        # NOTE: Single window of readings and features, reused by every prediction.
+        self.buffer: Optional[ndarray] = None
+
+        # Profiler:
+        self.profiler: Optional[Any] = profiler
+
+    # Properties:
+    @property
+    def cascade_path(self) -> str:
+        return self.learner_path.replace(".pkl", ".forest").replace(".forest", "-cascade.forest")
 
     # Methods:
-    def create_sliding_windows(self, data: List[List[str]]) -> Tuple[ndarray, ndarray]:
+    def compile(self) -> None:
+        """
+        * Flattens the fitted sklearn learner into the Forest engine used for predictions.
+        """
+
+        # Forest:
+        self.forest = Forest.from_classifier(self.learner, self.encoder, self.horizon)
+
+        # Logic:
+        self.bind()
+
+    def bind(self) -> None:
+        # Horizon:
+        self.horizon = self.forest.horizon
+
+        # Buffer:
+        self.buffer = empty((1, self.forest.feature_count), dtype=float32)
+
+        # Logic:
+        if self.forest.bind():
+            logger.info("[*] Using compiled forest engine ({} trees, {} nodes).".format(len(self.forest.roots), len(self.forest.features)))
+        else:
+            logger.warning("[!] Using numpy forest engine, compile the forest optimizations for lower latency.")
+
+    def create_sliding_windows(self, data: Union[ndarray, List[List[Any]]]) -> Tuple[ndarray, ndarray]:
+        """
+        * Windows rows of [features..., label], returning (windows, labels) where each window concatenates window_size rows.
+        """
+
         # Variables (Assignment):
+        # Rows:
+        rows: ndarray = asarray(data, dtype=object)
+
+        # Logic:
+        if len(rows) < self.window_size:
+            return empty((0, (rows.shape[1] - 1 if rows.ndim == 2 else 0) * self.window_size), dtype=float32), empty(0, dtype=object)
+
+        return self.window(rows[:, :-1].astype(float32), rows[:, -1].astype(str))
+
+    def window(self, features: ndarray, labels: ndarray, first: int = 0, context: int = 0) -> Tuple[ndarray, ndarray]:
+        """
+        * Vectorized windowing of (rows, features) readings and their labels.
+            * Windows are strided views of the readings, copied once into a (windows, window_size * features) float32 array.
+            * The label of a window is its most common label, ties go to the label occurring first (like Counter.most_common).
+            * With a feature horizon, the FeatureExtractor features at the last reading of each window are appended.
+
+        * First is the index of the first row within its recording, so windows keep the same stride across chunks.
+            * The first context rows were carried over from the previous chunk, windows ending within them were already produced.
+        """
+
+        # Variables (Assignment):
+        # Skip:
+        skip: int = max(context - self.window_size + 1, 0)
+
+        # Offset:
+        offset: int = skip + (-(first + skip) % self.stride)
+
         # Windows:
-        windows: List[List[float]] = []
+        windows: ndarray = sliding_window_view(features, self.window_size, axis=0)[offset::self.stride]
+
+        # Codes:
+        classes, codes = unique(labels, return_inverse=True)
+
+        # Window Codes:
+        window_codes: ndarray = sliding_window_view(codes.reshape(-1), self.window_size)[offset::self.stride]
 
-        # Labels:
-        labels: List[str] = []
+        # Counts:
+        counts: ndarray = (window_codes[:, :, None] == window_codes[:, None, :]).sum(axis=2)
+
+        # Windows:
+        windows = windows.transpose(0, 2, 1).reshape(len(windows), self.window_size * features.shape[1]).astype(float32)
 
         # Logic:
-        for iteration in range(0, len(data) - self.window_size + 1, self.stride):
+        if self.horizon:
             # Variables (Assignment):
-            # Window:
-            window: List[float] = list(map(float, data[iteration][:-1]))
+            # Ends:
+            ends: ndarray = arange(len(windows)) * self.stride + offset + self.window_size - 1
+
+            # Windows:
+            windows = concatenate([windows, FeatureExtractor.transform(features, self.horizon, first)[ends]], axis=1)
+
+        return windows, classes[window_codes[arange(len(window_codes)), counts.argmax(axis=1)]]
+
+    def read_chunks(self, file: str, chunk_size: int) -> Iterator[Tuple[ndarray, ndarray]]:
+        """
+        * Yields (readings, labels) chunks of one recording, a CSV file or a session file (.session, see Recorder).
+            * Session files are memory-mapped, their shank records are sliced rather than parsed.
+            * NOTE: The learner classifies shank windows (see Joint.step), CSV recordings hold shank readings.
+        """
+
+        # Logic:
+        if file.endswith(Recorder.EXTENSION):
+            # Variables (Assignment):
+            # Readings & Labels:
+            readings, labels = Recorder.select(*Recorder.load(file), Recorder.SHANK)
 
             # Logic:
-            for second_iteration in range(1, self.window_size):
-                window.extend(map(float, data[iteration + second_iteration][:-1]))
+            for start in range(0, len(readings), chunk_size):
+                yield readings[start:start + chunk_size], labels[start:start + chunk_size]
+
+            return
+
+        # Pandas:
+        from pandas import read_csv
+
+        # Logic:
+        for chunk in read_csv(file, chunksize=chunk_size):
+            yield chunk.iloc[:, :-1].to_numpy(dtype=float32), chunk.iloc[:, -1].to_numpy(dtype=str)
 
+    def stream_windows(self, files: Union[str, Sequence[str]], chunk_size: int = 100000) -> Iterator[Tuple[ndarray, ndarray]]:
+        """
+        * Yields (windows, labels) chunks of one or more recordings (see read_chunks), reading at most chunk_size rows at a time.
+            * The last rows of a chunk (window and feature horizon) are carried over, so windows span chunk boundaries but never recordings.
+        """
+
+        # Logic:
+        for file in ([files] if isinstance(files, str) else files):
             # Variables (Assignment):
-            # Labels:
-            window_labels: List[str] = [data[iteration + second_iteration][-1] for second_iteration in range(self.window_size)]
+            # Carry:
+            carry_features: Optional[ndarray] = None
+            carry_labels: Optional[ndarray] = None
 
-            # Majority:
-            majority: str = Counter(window_labels).most_common(1)[0][0]
+            # Row:
+            row: int = 0
 
             # Logic:
-            # Windows:
-            windows.append(window)
+            for features, labels in self.read_chunks(file, chunk_size):
+                # Variables (Assignment):
+                # Rows:
+                rows: int = len(features)
 
-            # Labels:
-            labels.append(majority)
+                # First:
+                first: int = row
+
+                # Context:
+                context: int = 0
+
+                # Logic:
+                if carry_features is not None:
+                    features, labels = concatenate([carry_features, features]), concatenate([carry_labels, labels])
+
+                    first -= len(carry_features)
+                    context = len(carry_features)
+
+                row += rows
+
+                if len(features) >= self.window_size:
+                    yield self.window(features, labels, first, context)
+
+                # Variables (Assignment):
+                # Carry:
+                carry: int = min(max(self.window_size, self.horizon) - 1, len(features))
+
+                # Logic:
+                carry_features, carry_labels = features[len(features) - carry:], labels[len(labels) - carry:]
+
+    def read_windows(self, files: Union[str, Sequence[str]], chunk_size: int = 100000) -> Tuple[ndarray, ndarray]:
+        # Variables (Assignment):
+        # Chunks:
+        chunks: List[Tuple[ndarray, ndarray]] = list(self.stream_windows(files, chunk_size))
+
+        # Logic:
+        if not chunks:
+            raise ValueError("No recording holds at least {} readings!".format(self.window_size))
+
+        return concatenate([windows for windows, _ in chunks]), concatenate([labels for _, labels in chunks])
+
+    def split(self, windows: ndarray, labels: ndarray) -> Tuple[ndarray, ndarray, ndarray, ndarray]:
+        """
+        * Splits time-ordered windows into the oldest windows for training and the most recent ones for validation.
+        """
+
+        # Variables (Assignment):
+        # Split:
+        split: int = int(len(windows) * (1.0 - self.validation_size))
+
+        # Gap:
+        gap: int = split + (self.window_size - 1) // self.stride
+
+        # Logic:
+        return windows[:split], windows[gap:], labels[:split], labels[gap:]
+
+    def split_calibration(self, count: int) -> Tuple[slice, slice]:
+        """
+        * Splits time-ordered validation windows into the oldest half, calibrating the cascade first stage, and the most recent half, evaluating it.
+            * NOTE: The windows overlapping the split are dropped, like split does, so no reading is shared by both halves.
+        """
+
+        # Variables (Assignment):
+        # Split:
+        split: int = count // 2
 
         # Logic:
-        return array(windows), array(labels)
+        return slice(0, split), slice(split + (self.window_size - 1) // self.stride, count)
+
+    @staticmethod
+    def calibrate_confidence(confidences: ndarray, agreements: ndarray, agreement: float) -> Optional[float]:
+        """
+        * Returns the lowest confidence threshold whose accepted windows (confidence >= threshold) agree with the full forest at least as often as asked.
+            * None when not even the most confident windows reach the agreement.
+            * NOTE: The threshold is rounded down to float32 (the .forest header field), so the calibrated windows stay accepted.
+        """
+
+        # Variables (Assignment):
+        # Order:
+        order: ndarray = argsort(-asarray(confidences), kind="stable")
+
+        # Confidences:
+        confidences = asarray(confidences)[order]
+
+        # Agreements:
+        # NOTE: Agreement of the windows accepted by each threshold, only meaningful at the last window of every tied confidence.
+        agreements = cumsum(asarray(agreements)[order]) / arange(1, len(order) + 1)
+
+        # Eligible:
+        eligible: ndarray = (agreements >= agreement) & concatenate([confidences[1:] != confidences[:-1], [True]])
+
+        # Logic:
+        if not eligible.any():
+            return None
+
+        # Variables (Assignment):
+        # Threshold:
+        threshold: float = float(confidences[eligible.nonzero()[0][-1]])
+
+        # Logic:
+        return float(nextafter(float32(threshold), float32(0.0))) if float32(threshold) > threshold else float(float32(threshold))
+
+    def fit_cascade(self, window_train: ndarray, label_train: ndarray, window_test: ndarray, estimators: int = 3, depth: int = 4, agreement: float = 0.99) -> Optional[Dict[str, float]]:
+        """
+        * Fits the first stage of the cascade (a shallow forest on the same windows) in front of the compiled learner.
+            * Its threshold is calibrated on the oldest half of the validation windows, so its decisions agree with the full forest on at least the given share of them.
+            * Returns the share of the held-out (most recent) validation windows the first stage decides and their agreement, with the calibration
+              agreement, or None (no cascade) when it never reaches the agreement (see split_calibration).
+            * NOTE: The first stage is only installed when its held-out agreement also reaches the agreement, a threshold that does not generalize
+              is rejected rather than trusted.
+        """
+
+        # Variables (Assignment):
+        # Calibration & Evaluation:
+        calibration, evaluation = self.split_calibration(len(window_test))
+
+        # Validation:
+        if calibration.stop == 0 or evaluation.start >= evaluation.stop:
+            raise ValueError("At least {} validation windows are needed to calibrate and evaluate the cascade first stage!".format(2 * ((self.window_size - 1) // self.stride + 1)))
+
+        # SKLearn:
+        from sklearn.ensemble import RandomForestClassifier
+
+        # Variables (Assignment):
+        # Stage:
+        stage: Forest = Forest.from_classifier(
+            RandomForestClassifier(n_estimators=estimators, max_depth=depth, random_state=self.state).fit(window_train, label_train), self.encoder, self.horizon
+        )
+
+        # Predictions & Confidences:
+        predictions, confidences = stage.vote(window_test)
+
+        # Agreements:
+        agreements: ndarray = stage.classes[predictions] == self.forest.predict(window_test)
+
+        # Threshold:
+        threshold: Optional[float] = self.calibrate_confidence(confidences[calibration], agreements[calibration], agreement)
+
+        # Logic:
+        if threshold is None:
+            logger.warning("[!] Cascade first stage never agrees with the full forest on {:.1%} of its windows, no cascade is used.".format(agreement))
+
+            self.cascade = None
+
+            return None
+
+        # Variables (Assignment):
+        # Accepted:
+        accepted: ndarray = confidences >= threshold
+
+        # Agreement:
+        # NOTE: The held-out windows may all fall below the threshold, their agreement is then NaN.
+        held_out: float = float(agreements[evaluation][accepted[evaluation]].mean()) if accepted[evaluation].any() else float("nan")
+
+        calibrated: float = float(agreements[calibration][accepted[calibration]].mean())
+
+        # Validation:
+        # NOTE: NaN fails the comparison, a threshold deciding none of the held-out windows cannot be verified.
+        if not held_out >= agreement:
+            logger.warning("[!] Cascade first stage (confidence >= {:.3f}) agrees with the full forest on {:.2%} of the held-out windows ({:.2%} on the calibration windows), below {:.1%}, no cascade is used.".format(
+                threshold, held_out, calibrated, agreement
+            ))
+
+            self.cascade = None
+
+            return None
+
+        # Cascade:
+        stage.confidence = threshold
+        stage.bind()
+
+        self.cascade = stage
+
+        # Logic:
+        logger.info("[*] Cascade first stage ({} trees, {} nodes, confidence >= {:.3f}) decides {:.1%} of the held-out validation windows, agreeing with the full forest on {:.2%} of them ({:.2%} on the calibration windows).".format(
+            estimators, len(stage.features), threshold, accepted[evaluation].mean(), held_out, calibrated
+        ))
+
+        return {"share": float(accepted[evaluation].mean()), "agreement": held_out, "calibration_agreement": calibrated, "threshold": threshold}
 
     # Predict:
-    def predict(self, data: List[List[float]]) -> str:
+    def predict(self, data: Union[ndarray, List[List[float]]], features: Optional[ndarray] = None) -> str:
+        # Profiler:
+        if self.profiler is not None:
+            start: int = monotonic_ns()
+
         try:
             # Validation:
             if len(data) != self.window_size:
@@ -106,31 +430,106 @@ class Learner:
                     self.window_size
                 ))
 
-            # Variables (Assignment):
-            # Window:
-            window: ndarray = array(data).flatten().reshape(1, -1)
+            # Validation:
+            if self.forest is None:
+                raise ValueError("Learner must be loaded or trained before predicting!")
 
-            # Prediction:
-            prediction: ndarray = self.learner.predict(window)
+            if self.horizon and features is None:
+                raise ValueError("Learner was trained with a feature horizon of {}, features must be given!".format(self.horizon))
+
+            # Buffer:
+            self.buffer[0, :self.window_size * FeatureExtractor.CHANNELS] = asarray(data, dtype=float32).reshape(-1)
+
+            if self.horizon:
+                self.buffer[0, -FeatureExtractor.SIZE:] = features
 
             # Logic:
-            return self.encoder.inverse_transform(prediction)[0]
+            if self.cascade is not None:
+                # Variables (Assignment):
+                # Prediction & Decided:
+                prediction, decided = self.cascade.predict_cascade(self.forest, self.buffer)
+
+                # Logic:
+                self.decisions[0 if decided else 1] += 1
+
+                return prediction
+
+            return self.forest.predict(self.buffer)[0]
         except Exception as exception:
             logger.error(f"[Error]: {exception}")
+        finally:
+            if self.profiler is not None:
+                self.profiler.record("predict", start)
+
+    def predict_windows(self, windows: ndarray) -> ndarray:
+        """
+        * Classifies an (n, feature_count) array of windows (see window), returning the label of each window.
+            * Without a cascade, every window is classified in a single call to the forest engine.
+            * With a cascade, the windows are classified one by one like predict, so the labels match the runtime's.
+        """
+
+        # Validation:
+        if self.forest is None:
+            raise ValueError("Learner must be loaded or trained before predicting!")
+
+        # Variables (Assignment):
+        # Windows:
+        windows = asarray(windows, dtype=float32).reshape(-1, self.forest.feature_count)
+
+        # Logic:
+        if self.cascade is None:
+            return self.forest.predict(windows)
+
+        # Variables (Assignment):
+        # Predictions:
+        predictions: ndarray = empty(len(windows), dtype=self.forest.classes.dtype)
+
+        # Logic:
+        for index in range(len(windows)):
+            # Variables (Assignment):
+            # Prediction & Decided:
+            self.buffer[0] = windows[index]
+
+            predictions[index], decided = self.cascade.predict_cascade(self.forest, self.buffer)
+
+            # Logic:
+            self.decisions[0 if decided else 1] += 1
+
+        return predictions
 
     # Train:
-    def train(self, file: str) -> None:
+    def train(self, file: Union[str, Sequence[str]], save: bool = False, cascade: bool = False) -> Optional[float]:
+        """
+        * Fits a learner on the oldest windows of the recording, and returns its accuracy on the most recent ones.
+            * The learner is only saved when asked to, see tools/train.py for the latency-budgeted search.
+            * With cascade, a first stage is also fitted on the same training windows, and calibrated and evaluated on halves of the validation ones (see fit_cascade).
+        """
+
+        # SKLearn:
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.preprocessing import LabelEncoder
+        from sklearn.metrics import accuracy_score
+
         # Logic:
         try:
             # Variables (Assignment):
-            # Data:
-            data: DataFrame = read_csv(file)
+            # Learner:
+            self.learner = RandomForestClassifier(
+                # Estimators:
+                n_estimators=self.estimators,
 
-            # List:
-            data_list: List[List[str]] = data.values.tolist()
+                # Depth:
+                max_depth=self.depth,
+
+                # State:
+                random_state=self.state,
+            )
+
+            # Encoder:
+            self.encoder = LabelEncoder()
 
             # Arrays:
-            window_array, label_array = self.create_sliding_windows(data_list)
+            window_array, label_array = self.read_windows(file)
 
             # Labels:
             encoded_labels: ndarray = self.encoder.fit_transform(label_array)
@@ -146,12 +545,11 @@ class Learner:
 
             # Variables (Definition):
             # Windows & Labels:
-            window_train, window_test, label_train, label_test = train_test_split(
-                window_array, encoded_labels, random_state=self.state, test_size=0.2
-            )
+            window_train, window_test, label_train, label_test = self.split(window_array, encoded_labels)
 
             # Logic:
             self.learner.fit(window_train, label_train)
+            self.compile()
 
             # Variables (Assignment):
             # Prediction:
@@ -161,15 +559,17 @@ class Learner:
             accuracy: float = accuracy_score(label_test, label_prediction)
 
             # Logging:
-            logger.info("Learner accuracy: {:3f}".format(accuracy))
+            logger.info("[*] Learner accuracy (time-ordered validation): {:3f}".format(accuracy))
+
+            # Cascade:
+            if cascade:
+                self.fit_cascade(window_train, label_train, window_test)
 
             # Logic:
-            if input("[?] Would you like to save this potential learner? [y/N]: ").strip().lower() in "yes":
-                # Logic:
+            if save:
                 self.save()
-            else:
-                # Logging:
-                logger.info("[*] Learner not saved..")
+
+            return accuracy
 
         # Exceptions:
         except FileNotFoundError as exception:
@@ -181,16 +581,46 @@ class Learner:
     def load(self) -> None:
         # Logic:
         try:
-            # Variables (Assignment):
-            # Learner:
-            self.learner: RandomForestClassifier = load(
-                self.learner_path
-            )
+            if self.learner_path.endswith(".forest"):
+                # Forest:
+                self.forest = Forest.load(self.learner_path)
 
-            # Encoder:
-            self.encoder: LabelEncoder = load(
-                self.learner_path.replace(".pkl", "-encoder.pkl")
-            )
+                # Logic:
+                self.bind()
+            else:
+                # Joblib:
+                from joblib import load
+
+                # Variables (Assignment):
+                # Learner:
+                self.learner = load(
+                    self.learner_path
+                )
+
+                # Encoder:
+                self.encoder = load(
+                    self.learner_path.replace(".pkl", "-encoder.pkl")
+                )
+
+                # Forest:
+                # NOTE: Pickled learners do not store their feature horizon, construct the Learner with it (the .forest header does).
+                self.compile()
+
+            # Cascade:
+            if os.path.exists(self.cascade_path):
+                # Forest:
+                self.cascade = Forest.load(self.cascade_path)
+
+                # Validation:
+                if list(self.cascade.classes) != list(self.forest.classes) or self.cascade.feature_count != self.forest.feature_count:
+                    logger.warning("[!] Cascade first stage {} does not match the learner, it is ignored.".format(self.cascade_path))
+
+                    self.cascade = None
+                else:
+                    # Logic:
+                    self.cascade.bind()
+
+                    logger.info("[*] Using cascade first stage from {} (confidence >= {:.3f}).".format(self.cascade_path, self.cascade.confidence))
 
             # Logging:
             logger.info("[*] Learner loaded successfully from {}".format(self.learner_path))
@@ -202,13 +632,27 @@ class Learner:
 
     # Save:
     def save(self) -> None:
+        # Joblib:
+        from joblib import dump
+
         # Logic:
         try:
-            # Learner:
-            dump(self.learner, self.learner_path)
-            
-            # Encoder:
-            dump(self.encoder, self.learner_path.replace(".pkl", "-encoder.pkl"))
+            if self.learner_path.endswith(".pkl"):
+                # Learner:
+                dump(self.learner, self.learner_path)
+
+                # Encoder:
+                dump(self.encoder, self.learner_path.replace(".pkl", "-encoder.pkl"))
+
+            # Forest:
+            self.forest.save(self.learner_path.replace(".pkl", ".forest"))
+
+            # Cascade:
+            if self.cascade is not None:
+                self.cascade.save(self.cascade_path)
+            elif os.path.exists(self.cascade_path):
+                # NOTE: A stale first stage would otherwise be loaded in front of the new learner.
+                os.remove(self.cascade_path)
 
             # Logging:
             logger.info("[*] Learner saved successfully to {}".format(self.learner_path))
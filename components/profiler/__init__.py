@@ -0,0 +1,5 @@
+# Written by: Christopher Gholmieh
+# Imports:
+
+# Profiler:
+from .profiler import Profiler, Histogram
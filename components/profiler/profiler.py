@@ -0,0 +1,139 @@
+# Written by: Christopher Gholmieh
+# Imports:
+
+# Typing:
+from typing import Dict, List, Iterable
+
+# Loguru:
+from loguru import logger
+
+# Time:
+from time import monotonic_ns
+
+# JSON:
+import json
+
+
+# Histogram:
+class Histogram:
+    """
+    * Fixed-size latency histogram in nanoseconds, using log-linear buckets (SUBBUCKETS per power of two).
+        * Recording is a handful of integer operations, and the relative bucket error is at most 1 / SUBBUCKETS.
+        * Percentiles report the upper bound of the bucket they fall into, the maximum is exact.
+
+    * NOTE: Recording is not locked, concurrent writers to the same histogram may very rarely lose a count.
+    """
+
+    # Constants:
+    SUBBUCKET_BITS: int = 3
+    SUBBUCKETS: int = 1 << SUBBUCKET_BITS
+
+    MAGNITUDES: int = 40
+
+    # Initialization:
+    def __init__(self) -> None:
+        # Counts:
+        self.counts: List[int] = [0] * (self.MAGNITUDES * self.SUBBUCKETS)
+
+        # Statistics:
+        self.count: int = 0
+        self.total: int = 0
+        self.maximum: int = 0
+
+    # Methods:
+    def record(self, nanoseconds: int) -> None:
+        # Variables (Assignment):
+        # Magnitude:
+        magnitude: int = nanoseconds.bit_length()
+
+        # Logic:
+        if magnitude <= self.SUBBUCKET_BITS:
+            self.counts[nanoseconds] += 1
+        else:
+            self.counts[min((magnitude - self.SUBBUCKET_BITS) * self.SUBBUCKETS + ((nanoseconds >> (magnitude - self.SUBBUCKET_BITS - 1)) & (self.SUBBUCKETS - 1)), len(self.counts) - 1)] += 1
+
+        self.count += 1
+        self.total += nanoseconds
+
+        if nanoseconds > self.maximum:
+            self.maximum = nanoseconds
+
+    def upper_bound(self, index: int) -> int:
+        # Variables (Assignment):
+        # Magnitude:
+        magnitude, subbucket = divmod(index, self.SUBBUCKETS)
+
+        # Logic:
+        if magnitude == 0:
+            return subbucket
+
+        return ((self.SUBBUCKETS + subbucket + 1) << (magnitude - 1)) - 1
+
+    def percentile(self, percentile: float) -> int:
+        # Variables (Assignment):
+        # Target:
+        target: float = self.count * percentile / 100.0
+
+        # Cumulative:
+        cumulative: int = 0
+
+        # Logic:
+        for index, count in enumerate(self.counts):
+            cumulative += count
+
+            if count and cumulative >= target:
+                return min(self.upper_bound(index), self.maximum)
+
+        return self.maximum
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean_us": self.total / self.count / 1000 if self.count else 0.0,
+            "p50_us": self.percentile(50.0) / 1000,
+            "p99_us": self.percentile(99.0) / 1000,
+            "max_us": self.maximum / 1000,
+        }
+
+
+# Profiler:
+class Profiler:
+    """
+    * Collects per-stage latencies of the control pipeline into fixed-size histograms.
+        * Components take an optional profiler, and skip every timestamp when it is None, so disabling it costs nothing.
+
+    * Stages:
+        * callback: Phidget callback entry to return.
+        * buffer: Ring buffer update within the callback.
+        * predict: Learner.predict.
+        * calculate: Calculator.calculate.
+        * modulation: Calculator.calculate_pulse_modulation.
+        * write: Writer.write_pulse_modulation / Writer.write_stop_pin.
+        * step: Writer.step, the fused flexion, modulation, and GPIO write in one native call (stands in for calculate, modulation, and write in fused mode).
+        * end-to-end: Newest IMU callback entry to the end of the GPIO write.
+    """
+
+    # Constants:
+    STAGES: tuple = ("callback", "buffer", "predict", "calculate", "modulation", "write", "step", "end-to-end")
+
+    # Initialization:
+    def __init__(self, stages: Iterable[str] = STAGES) -> None:
+        # Histograms:
+        self.histograms: Dict[str, Histogram] = {stage: Histogram() for stage in stages}
+
+    # Methods:
+    def record(self, stage: str, start: int) -> None:
+        self.histograms[stage].record(monotonic_ns() - start)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {stage: histogram.summary() for stage, histogram in self.histograms.items() if histogram.count}
+
+    def report(self) -> None:
+        for stage, summary in self.summary().items():
+            logger.info("[*] Latency {:<12} n={:<8} p50={:>9.1f} us  p99={:>9.1f} us  max={:>9.1f} us".format(
+                stage, summary["count"], summary["p50_us"], summary["p99_us"], summary["max_us"]
+            ))
+
+    def dump(self, path: str) -> None:
+        with open(path, "w") as file:
+            json.dump(self.summary(), file, indent=4)
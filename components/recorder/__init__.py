@@ -0,0 +1,5 @@
+# Written by: Christopher Gholmieh
+# Imports:
+
+# Recorder:
+from .recorder import Recorder
@@ -0,0 +1,450 @@
+# Written by: Christopher Gholmieh
+# Imports:
+
+# Typing:
+from typing import Optional, Sequence, Tuple, List, Dict, BinaryIO, Any
+
+# Loguru:
+from loguru import logger
+
+# Threading:
+from threading import Thread, Event, Lock
+
+# Time:
+from time import monotonic_ns
+
+# OS:
+import os
+
+# CSV:
+import csv
+
+# Numpy:
+import numpy
+
+
+# Recorder:
+class Recorder:
+    """
+    * Records the IMU samples of a session into an append-only binary file, without writing on the IMU handler threads.
+        * Samples are copied into a preallocated ring buffer (RECORD layout), and a background thread appends them to the file.
+        * Every sample carries its IMU row in the sensor table, the current label and, once, the latest event (indices into the
+          label table, -1 for none).
+
+    * Session file layout:
+        * Header (HEADER_SIZE bytes): MAGIC, then little-endian int32 version, record size, label bytes, and sensor bytes, then the
+          label table (UTF-8, newline separated) from LABELS_OFFSET on, directly followed by the sensor table ("name serial" lines).
+        * The sensor table holds the sensor graph's names and serial numbers in row order (see SensorGraph), readers resolve IMU rows
+          by sensor name (see row) rather than by fixed rows.
+        * Records: fixed-width RECORD rows from HEADER_SIZE on, readable with numpy.memmap (see load), a torn last record is ignored.
+        * NOTE: Rows are fixed width rather than column blocks so the file stays append-only, columns are zero-copy strided views.
+        * NOTE: Version 1 sessions predate the sensor table, they were recorded from the knee (SENSORS).
+
+    * NOTE: Every IMU handler records from its own thread, the ring buffer is guarded by a lock, overwritten samples are counted as dropped.
+    """
+
+    # Constants:
+    THIGH: str = "thigh"
+    SHANK: str = "shank"
+
+    # NOTE: The knee (SensorGraph.KNEE), the sensors of sessions recorded without a sensor graph.
+    SENSORS: Dict[str, int] = {"thigh": 721783, "shank": 721888}
+
+    # Format:
+    EXTENSION: str = ".session"
+
+    MAGIC: bytes = b"OSRECORD"
+    VERSION: int = 2
+
+    VERSIONS: Tuple[int, ...] = (1, 2)
+
+    HEADER_SIZE: int = 4096
+    LABELS_OFFSET: int = 64
+
+    # Records:
+    RECORD: numpy.dtype = numpy.dtype([
+        ("timestamp", "<i8"),
+        ("device_timestamp", "<f8"),
+        ("imu", "<i2"),
+        ("label", "<i2"),
+        ("event", "<i2"),
+        ("acceleration", "<f4", (3,)),
+        ("angular_rotation", "<f4", (3,)),
+        ("magnetic_field", "<f4", (3,)),
+    ])
+
+    # Initialization:
+    def __init__(self, path: str, labels: Sequence[str] = (), capacity: int = 8192, interval: float = 0.25) -> None:
+        # Path:
+        self.path: str = path
+
+        # Labels:
+        self.labels: List[str] = []
+
+        # Sensors:
+        self.sensors: Dict[str, int] = dict(self.SENSORS)
+
+        # File:
+        # NOTE: Opened unbuffered without O_APPEND, records are written at the end and the header is rewritten in place when labels are added.
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            self.file: BinaryIO = open(path, "r+b", buffering=0)
+
+            self.labels, self.sensors = self.read_header(self.file.read(self.HEADER_SIZE), path)
+
+            # Variables (Assignment):
+            # Size:
+            size: int = os.path.getsize(path)
+
+            # Logic:
+            # NOTE: A record torn by a crash is dropped, so the next records stay aligned.
+            self.file.truncate(size - (size - self.HEADER_SIZE) % self.RECORD.itemsize)
+        else:
+            self.file = open(path, "w+b", buffering=0)
+
+            self.write_header()
+
+        self.indices: Dict[str, int] = {label: index for index, label in enumerate(self.labels)}
+
+        for label in labels:
+            self.index(label)
+
+        # Records:
+        self.records: numpy.ndarray = numpy.zeros(capacity, dtype=self.RECORD)
+
+        self.capacity: int = capacity
+
+        # Cursors:
+        self.head: int = 0
+        self.tail: int = 0
+
+        # Statistics:
+        self.dropped: int = 0
+        self.written: int = 0
+
+        # Annotations:
+        self.label: int = -1
+        self.event: int = -1
+
+        # Lock:
+        self.lock: Lock = Lock()
+
+        # Thread:
+        self.interval: float = interval
+
+        self.stopped: Event = Event()
+        self.thread: Thread = Thread(target=self.drain_loop, daemon=True)
+
+    # Methods:
+    @classmethod
+    def read_header(cls, header: bytes, path: str) -> Tuple[List[str], Dict[str, int]]:
+        # Validation:
+        if header[:len(cls.MAGIC)] != cls.MAGIC:
+            raise ValueError("{} is not a session file!".format(path))
+
+        # Variables (Assignment):
+        # Fields:
+        # NOTE: The sensor bytes of version 1 headers are zero padding.
+        version, record_size, label_size, sensor_size = numpy.frombuffer(header[len(cls.MAGIC):len(cls.MAGIC) + 16], dtype="<i4").tolist()
+
+        # Validation:
+        if version not in cls.VERSIONS or record_size != cls.RECORD.itemsize:
+            raise ValueError("Unsupported session file version {} with {} byte records (expected {} with {} byte records)!".format(
+                version, record_size, cls.VERSION, cls.RECORD.itemsize
+            ))
+
+        # Labels:
+        labels: List[str] = header[cls.LABELS_OFFSET:cls.LABELS_OFFSET + label_size].decode("utf-8").split("\n") if label_size else []
+
+        # Sensors:
+        sensors: Dict[str, int] = dict(cls.SENSORS)
+
+        if sensor_size:
+            sensors = {
+                name: int(serial) for name, serial in (
+                    line.rsplit(" ", 1) for line in header[cls.LABELS_OFFSET + label_size:cls.LABELS_OFFSET + label_size + sensor_size].decode("utf-8").split("\n")
+                )
+            }
+
+        # Logic:
+        return labels, sensors
+
+    @classmethod
+    def create_header(cls, labels: Sequence[str], sensors: Dict[str, int]) -> bytes:
+        # Variables (Assignment):
+        # Labels:
+        table: bytes = "\n".join(labels).encode("utf-8")
+
+        # Sensors:
+        sensor_table: bytes = "\n".join("{} {}".format(name, serial) for name, serial in sensors.items()).encode("utf-8")
+
+        # Validation:
+        if cls.LABELS_OFFSET + len(table) + len(sensor_table) > cls.HEADER_SIZE:
+            raise ValueError("Session label and sensor tables exceed {} bytes!".format(cls.HEADER_SIZE - cls.LABELS_OFFSET))
+
+        # Logic:
+        return (
+            cls.MAGIC + numpy.array([cls.VERSION, cls.RECORD.itemsize, len(table), len(sensor_table)], dtype="<i4").tobytes()
+        ).ljust(cls.LABELS_OFFSET, b"\0") + (table + sensor_table).ljust(cls.HEADER_SIZE - cls.LABELS_OFFSET, b"\0")
+
+    def write_header(self) -> None:
+        os.pwrite(self.file.fileno(), self.create_header(self.labels, self.sensors), 0)
+
+    def set_sensors(self, sensors: Dict[str, int]) -> None:
+        """
+        * Declares the sensors (name to serial number, in row order) whose rows the recorded samples carry, rewriting the header.
+            * NOTE: Appending to a session recorded from other sensors would mix up their rows, it is refused.
+        """
+
+        # Validation:
+        # NOTE: Compared as item lists, the order of the sensors is their row order.
+        if list(sensors.items()) != list(self.sensors.items()) and (self.head or os.path.getsize(self.path) > self.HEADER_SIZE):
+            raise ValueError("Session file {} was recorded from the sensors {}, not {}!".format(self.path, self.sensors, dict(sensors)))
+
+        # Logic:
+        self.sensors = dict(sensors)
+
+        self.write_header()
+
+    def index(self, label: str) -> int:
+        """
+        * Returns the index of a label in the session label table, adding it (and rewriting the header) when it is new.
+        """
+
+        # Logic:
+        if label not in self.indices:
+            self.labels.append(label)
+            self.indices[label] = len(self.labels) - 1
+
+            self.write_header()
+
+        return self.indices[label]
+
+    def set_label(self, label: Optional[str]) -> None:
+        self.label = self.index(label) if label is not None else -1
+
+    def mark(self, event: str) -> None:
+        """
+        * Attaches an event (such as "calibrated") to the next recorded sample.
+        """
+
+        self.event = self.index(event)
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def record(self, imu: int, acceleration: Sequence[float], angular_rotation: Sequence[float], magnetic_field: Sequence[float], timestamp: float) -> None:
+        # Variables (Assignment):
+        # Host Timestamp:
+        host_timestamp: int = monotonic_ns()
+
+        # Logic:
+        with self.lock:
+            self.records[self.head % self.capacity] = (
+                host_timestamp, timestamp, imu, self.label, self.event, acceleration, angular_rotation, magnetic_field
+            )
+
+            self.head += 1
+            self.event = -1
+
+    def drain(self) -> None:
+        # Logic:
+        with self.lock:
+            # Variables (Assignment):
+            # Head:
+            head: int = self.head
+
+            # Overrun:
+            if head - self.tail > self.capacity:
+                self.dropped += head - self.tail - self.capacity
+                self.tail = head - self.capacity
+
+            # Logic:
+            if head == self.tail:
+                return
+
+            # Variables (Assignment):
+            # Records:
+            records: numpy.ndarray = self.records[numpy.arange(self.tail, head) % self.capacity]
+
+            # Logic:
+            self.tail = head
+
+        self.file.seek(0, os.SEEK_END)
+
+        records.tofile(self.file)
+
+        self.written += len(records)
+
+    def drain_loop(self) -> None:
+        while not self.stopped.wait(self.interval):
+            self.drain()
+
+    def stop(self) -> None:
+        # Logic:
+        self.stopped.set()
+
+        if self.thread.is_alive():
+            self.thread.join()
+
+        self.drain()
+
+        if self.dropped:
+            logger.warning("[!] Recorder dropped {} samples.".format(self.dropped))
+
+        logger.info("[*] Recorded {} samples to {}.".format(self.written, self.path))
+
+        self.file.close()
+
+    @classmethod
+    def load(cls, path: str) -> Tuple[numpy.ndarray, List[str], Dict[str, int]]:
+        """
+        * Memory-maps the records of a session file, returning (records, labels, sensors), the records are a read-only view of the file.
+        """
+
+        # Variables (Assignment):
+        # Labels & Sensors:
+        with open(path, "rb") as file:
+            labels, sensors = cls.read_header(file.read(cls.HEADER_SIZE), path)
+
+        # Count:
+        count: int = (os.path.getsize(path) - cls.HEADER_SIZE) // cls.RECORD.itemsize
+
+        # Logic:
+        if count <= 0:
+            return numpy.zeros(0, dtype=cls.RECORD), labels, sensors
+
+        return numpy.memmap(path, dtype=cls.RECORD, mode="r", offset=cls.HEADER_SIZE, shape=(count,)), labels, sensors
+
+    @staticmethod
+    def row(sensors: Dict[str, int], sensor: str) -> int:
+        """
+        * Returns the IMU row of a sensor in a session's sensor table, -1 (which no record carries) when the session has no such sensor.
+        """
+
+        return list(sensors).index(sensor) if sensor in sensors else -1
+
+    @classmethod
+    def select(cls, records: numpy.ndarray, labels: Sequence[str], sensors: Dict[str, int], sensor: str = SHANK, labelled: bool = True) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        * Returns the (rows, 6) float32 [acceleration..., angular_rotation...] readings of one sensor's records, and their labels ("" when unlabelled).
+            * NOTE: Unlabelled records are left out unless asked for, readings on both sides of them become adjacent.
+        """
+
+        # Variables (Assignment):
+        # Mask:
+        mask: numpy.ndarray = records["imu"] == cls.row(sensors, sensor)
+
+        if labelled:
+            mask &= records["label"] >= 0
+
+        # Records:
+        records = records[mask]
+
+        # Readings:
+        readings: numpy.ndarray = numpy.empty((len(records), 6), dtype=numpy.float32)
+
+        readings[:, :3] = records["acceleration"]
+        readings[:, 3:] = records["angular_rotation"]
+
+        # Logic:
+        # NOTE: The appended "" is the label of index -1.
+        return readings, numpy.asarray(list(labels) + [""], dtype=str)[records["label"]]
+
+    @classmethod
+    def from_csv(cls, csv_path: str, path: str, sensor: str = SHANK, data_interval: int = 16, chunk_size: int = 65536) -> int:
+        """
+        * Converts a CSV recording ([acceleration..., angular_rotation..., label] rows) into a new session file of one sensor.
+            * Device timestamps are synthesized from the data interval (milliseconds), like the replay does.
+            * The sensor is the session's only one (row 0), with the knee's serial number of that name (0 otherwise).
+        """
+
+        # Validation:
+        if os.path.exists(path):
+            raise FileExistsError("Session file {} already exists!".format(path))
+
+        # Variables (Assignment):
+        # Recorder:
+        recorder: Recorder = cls(path)
+
+        recorder.set_sensors({sensor: cls.SENSORS.get(sensor, 0)})
+
+        # Count:
+        count: int = 0
+
+        # Logic:
+        with open(csv_path, newline="") as file:
+            # Variables (Assignment):
+            # Reader:
+            reader: Any = csv.reader(file)
+
+            # Header:
+            next(reader)
+
+            # Rows:
+            rows: List[List[str]] = []
+
+            # Logic:
+            for row in reader:
+                # Logic:
+                if row:
+                    rows.append(row)
+
+                if len(rows) == chunk_size:
+                    count += recorder.append_rows(rows, 0, data_interval, count)
+
+                    rows = []
+
+            if rows:
+                count += recorder.append_rows(rows, 0, data_interval, count)
+
+        recorder.file.close()
+
+        return count
+
+    def append_rows(self, rows: List[List[str]], imu: int, data_interval: int, first: int) -> int:
+        # Variables (Assignment):
+        # Records:
+        records: numpy.ndarray = numpy.zeros(len(rows), dtype=self.RECORD)
+
+        # Readings:
+        readings: numpy.ndarray = numpy.array([row[:6] for row in rows], dtype=numpy.float32)
+
+        # Logic:
+        records["device_timestamp"] = (numpy.arange(len(rows)) + first) * float(data_interval)
+        records["timestamp"] = (numpy.arange(len(rows)) + first) * data_interval * 1000000
+        records["imu"] = imu
+        records["label"] = [self.index(row[6]) for row in rows]
+        records["event"] = -1
+        records["acceleration"] = readings[:, :3]
+        records["angular_rotation"] = readings[:, 3:]
+
+        self.file.seek(0, os.SEEK_END)
+
+        records.tofile(self.file)
+
+        return len(records)
+
+    @classmethod
+    def to_csv(cls, path: str, csv_path: str, sensor: str = SHANK) -> int:
+        """
+        * Converts the labelled records of one sensor of a session file into a CSV recording, returning the amount of rows written.
+        """
+
+        # Variables (Assignment):
+        # Readings & Labels:
+        readings, row_labels = cls.select(*cls.load(path), sensor)
+
+        # Logic:
+        with open(csv_path, "w", newline="") as file:
+            # Variables (Assignment):
+            # Writer:
+            writer: Any = csv.writer(file)
+
+            # Logic:
+            writer.writerow(["acceleration_x", "acceleration_y", "acceleration_z", "angular_rotation_x", "angular_rotation_y", "angular_rotation_z", "label"])
+
+            # NOTE: Float32 values are written with their shortest round-tripping representation.
+            for reading, label in zip(readings, row_labels.tolist()):
+                writer.writerow([str(value) for value in reading] + [label])
+
+        return len(readings)
@@ -0,0 +1,11 @@
+# Written by: Christopher Gholmieh
+# Imports:
+
+# Runtime:
+from .runtime import Runtime
+
+# Shared:
+from .shared import SharedRing
+
+# Real Time:
+from .realtime import RealTime
@@ -0,0 +1,118 @@
+# Written by: Christopher Gholmieh
+# Imports:
+
+# Typing:
+from typing import Optional, Set, Any
+
+# Loguru:
+from loguru import logger
+
+# OS:
+import os
+
+# GC:
+import gc
+
+
+# Real Time:
+class RealTime:
+    """
+    * Opt-in real-time mode of the calling thread (the control thread), entered once startup is done and left at shutdown.
+        * Pins the thread to a single core, so it is never migrated between cores (and their caches) by the scheduler.
+        * Requests SCHED_FIFO at the given priority, so ordinary processes never preempt it.
+        * Freezes every object allocated during startup out of the garbage collector, then disables it, so no collection pauses the loop.
+
+    * NOTE: Affinity and scheduling policy apply to the calling thread only on Linux, threads started afterwards inherit them.
+    * NOTE: SCHED_FIFO requires root or CAP_SYS_NICE (or an RLIMIT_RTPRIO allowance), it is skipped with a warning otherwise.
+    * NOTE: With the collector disabled, reference cycles created in the loop are only reclaimed after exit, the hot path must not create them.
+    """
+
+    # Constants:
+    CORE: int = 3
+
+    PRIORITY: int = 50
+
+    # Initialization:
+    def __init__(self, core: int = CORE, priority: int = PRIORITY) -> None:
+        # Options:
+        self.core: int = core
+        self.priority: int = priority
+
+        # State:
+        # NOTE: The previous affinity and policy, restored on exit, None while outside of real-time mode.
+        self.affinity: Optional[Set[int]] = None
+
+        self.policy: Optional[int] = None
+        self.parameters: Optional[Any] = None
+
+        # Applied:
+        self.pinned: bool = False
+        self.scheduled: bool = False
+        self.entered: bool = False
+
+    # Methods:
+    def pin(self) -> None:
+        # Validation:
+        if self.core not in os.sched_getaffinity(0):
+            logger.warning("[!] Control thread not pinned, core {} is unavailable.".format(self.core))
+
+            return
+
+        # Logic:
+        self.affinity = os.sched_getaffinity(0)
+
+        try:
+            os.sched_setaffinity(0, {self.core})
+
+            self.pinned = True
+        except OSError as exception:
+            logger.warning("[!] Control thread not pinned to core {}: {}".format(self.core, exception))
+
+    def schedule(self) -> None:
+        # Logic:
+        self.policy = os.sched_getscheduler(0)
+        self.parameters = os.sched_getparam(0)
+
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(self.priority))
+
+            self.scheduled = True
+        except OSError as exception:
+            logger.warning("[!] SCHED_FIFO not granted to the control thread: {}".format(exception))
+
+    def enter(self) -> None:
+        # Validation:
+        if self.entered:
+            return
+
+        # Logic:
+        self.pin()
+        self.schedule()
+
+        # NOTE: A full collection first, so the frozen generation holds live startup objects only.
+        gc.collect()
+        gc.freeze()
+        gc.disable()
+
+        self.entered = True
+
+        logger.info("[*] Real-time mode: pinned {} | SCHED_FIFO {} | GC frozen ({} objects) and disabled.".format(
+            "to core {}".format(self.core) if self.pinned else "no", "priority {}".format(self.priority) if self.scheduled else "no", gc.get_freeze_count()
+        ))
+
+    def exit(self) -> None:
+        # Validation:
+        if not self.entered:
+            return
+
+        # Logic:
+        gc.enable()
+        gc.unfreeze()
+
+        if self.scheduled:
+            os.sched_setscheduler(0, self.policy, self.parameters)
+
+        if self.pinned:
+            os.sched_setaffinity(0, self.affinity)
+
+        self.pinned = self.scheduled = self.entered = False
@@ -0,0 +1,476 @@
+# Written by: Christopher Gholmieh
+# Imports:
+
+# Shared:
+from .shared import SharedRing
+
+# Components:
+from components.learner.features import FeatureExtractor
+from components.learner import Learner
+from components.learner.forest import Forest
+
+# Typing:
+from typing import Optional, Sequence, Dict, List, Any
+
+# Loguru:
+from loguru import logger
+
+# Multiprocessing:
+import multiprocessing
+
+# Shared Memory:
+from multiprocessing.shared_memory import SharedMemory
+
+# Time:
+from time import sleep, monotonic, monotonic_ns
+
+# CTypes:
+import ctypes
+
+# Signal:
+import signal
+
+# OS:
+import os
+
+# Numpy:
+import numpy
+
+
+# Runtime:
+class Runtime:
+    """
+    * Runs acquisition, inference, and actuation as three processes, so none of them competes with the others for a GIL.
+        * Acquisition: owns the Calculator (the Spatial handlers) and the optional session Recorder, publishes every synchronized sample into the samples ring.
+        * Inference: classifies the latest sample with the Learner, publishes the prediction into the predictions ring.
+        * Actuation: owns the Writer, steps on every new sample with the latest prediction available.
+
+    * The processes only exchange fixed-layout records (SAMPLE, PREDICTION, CONTROL) in shared memory.
+        * Every CONTROL field is written by a single process: stopped by the parent, calibrated and samples by acquisition, predictions by inference,
+          the rest by actuation.
+        * The duration is counted from calibration on, like Joint's.
+        * Doorbell semaphores wake the consumers up, they never carry data.
+        * A slow prediction therefore never delays sample ingestion or actuation, the actuation uses the previous prediction instead.
+
+    * Every process is pinned to its own core (acquisition, inference, actuation), core 0 is left to the system by default.
+        * NOTE: Pinning is skipped, with a warning, for cores the machine does not have.
+
+    * NOTE: Processes are forked, the rings are inherited rather than attached by name.
+    """
+
+    # Constants:
+    CORES: tuple = (1, 2, 3)
+
+    CAPACITY: int = 64
+
+    STOP_LABEL: str = "standing still"
+
+    LEARNER_PATH: str = "./learners/one-step-learner.forest"
+
+    # Records:
+    SAMPLE: numpy.dtype = numpy.dtype([
+        ("sequence", "<i8"),
+        ("timestamp", "<i8"),
+        ("window", "<f4", (2, 3, 6)),
+        ("orientations", "<f4", (2, 3)),
+        ("calibration_offset", "<f4"),
+        ("features", "<f4", (2, FeatureExtractor.SIZE)),
+    ])
+
+    PREDICTION: numpy.dtype = numpy.dtype([
+        ("sequence", "<i8"),
+        ("sample", "<i8"),
+        ("prediction", "<i2"),
+    ])
+
+    CONTROL: numpy.dtype = numpy.dtype([
+        ("stopped", "<i4"),
+        ("calibrated", "<i4"),
+        ("samples", "<i8"),
+        ("predictions", "<i8"),
+        ("actuations", "<i8"),
+        ("skipped", "<i8"),
+        ("worst_latency", "<i8"),
+    ])
+
+    # Initialization:
+    def __init__(self, target_rate: float = 50.0, replay: Optional[str] = None, speed: float = 1.0, duration: Optional[float] = None, debug: bool = False, telemetry: Optional[Dict[str, Any]] = None, backend: str = "native", registers: str = "/dev/gpiomem", cores: Sequence[int] = CORES, record: Optional[str] = None, label: Optional[str] = None, align: bool = False, graph: Optional[str] = None, learner_path: str = LEARNER_PATH) -> None:
+        # Validation:
+        if len(cores) != 3:
+            raise ValueError("Exactly three cores (acquisition, inference, actuation) must be given!")
+
+        # Options:
+        self.target_rate: float = target_rate
+        self.period: float = 1.0 / target_rate
+
+        self.replay: Optional[str] = replay
+        self.speed: float = speed
+
+        self.duration: Optional[float] = duration
+
+        self.debug: bool = debug
+
+        self.telemetry: Dict[str, Any] = telemetry or {}
+
+        self.backend: str = backend
+        self.registers: str = registers
+
+        self.cores: Sequence[int] = cores
+
+        self.record: Optional[str] = record
+        self.label: Optional[str] = label
+
+        self.align: bool = align
+
+        # NOTE: A path, loaded by the acquisition process, so the runtime stays picklable.
+        self.graph: Optional[str] = graph
+
+        # NOTE: A .forest learner, loaded by the inference process.
+        self.learner_path: str = learner_path
+
+        # Horizon & Labels:
+        # NOTE: Read once from the .forest header, so acquisition maintains the features inference expects and actuation names its predictions.
+        self.horizon: int = 0
+        self.labels: List[str] = []
+
+        try:
+            self.horizon, self.labels = Forest.describe(learner_path)
+        except FileNotFoundError:
+            # Logging:
+            # NOTE: Like Learner.load, a missing learner is logged, predictions are then recorded as none.
+            logger.error("[!] Learner file {} was not found.".format(learner_path))
+
+        # Context:
+        self.context: Any = multiprocessing.get_context("fork")
+
+        # Rings:
+        self.samples: SharedRing = SharedRing(self.SAMPLE, self.CAPACITY, lock=self.context.Lock())
+        self.predictions: SharedRing = SharedRing(self.PREDICTION, self.CAPACITY, lock=self.context.Lock())
+
+        # Control:
+        self.memory: SharedMemory = SharedMemory(create=True, size=self.CONTROL.itemsize)
+
+        self.control: numpy.ndarray = numpy.ndarray((), dtype=self.CONTROL, buffer=self.memory.buf)
+        self.control[...] = 0
+
+        # Doorbells:
+        self.inference_doorbell: Any = self.context.Semaphore(0)
+        self.actuation_doorbell: Any = self.context.Semaphore(0)
+
+        # Processes:
+        self.processes: List[Any] = []
+
+    # Methods:
+    def pin(self, core: int, name: str) -> None:
+        # Validation:
+        if core >= (os.cpu_count() or 1):
+            logger.warning("[!] {} process not pinned, core {} is unavailable.".format(name.capitalize(), core))
+
+            return
+
+        # Logic:
+        try:
+            os.sched_setaffinity(0, {core})
+        except OSError as exception:
+            logger.warning("[!] {} process not pinned to core {}: {}".format(name.capitalize(), core, exception))
+
+    def prepare(self, core: int, name: str) -> None:
+        # Signal:
+        # NOTE: CTRL + C reaches the whole process group, only the parent reacts to it and stops the children through the control record.
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+        # Logic:
+        self.pin(core, name)
+
+    def acquire(self) -> None:
+        """
+        * Acquisition process: publishes a SAMPLE record for every synchronized thigh and shank reading.
+        """
+
+        # Imports:
+        from components.calculator import Calculator, ReplaySpatial, SensorGraph
+        from components.recorder import Recorder
+
+        # Initialization:
+        self.prepare(self.cores[0], "acquisition")
+
+        # Variables (Assignment):
+        # Factory:
+        spatial_factory: Any = (lambda: ReplaySpatial(self.replay, speed=self.speed)) if self.replay is not None else None
+
+        # Recorder:
+        recorder: Optional[Recorder] = Recorder(self.record) if self.record is not None else None
+
+        if recorder is not None:
+            recorder.set_label(self.label)
+            recorder.start()
+
+        # Calculator:
+        calculator: Calculator = Calculator(use_quaternions=False, debug=self.debug, data_interval=int(1000 * self.period), spatial_factory=spatial_factory, feature_horizon=self.horizon, recorder=recorder, align=self.align, graph=SensorGraph.load(self.graph) if self.graph is not None else None)
+        calculator.actuate()
+
+        self.control["calibrated"] = 1
+
+        # Rows:
+        rows: List[int] = [calculator.thigh_index, calculator.shank_index]
+
+        # Logic:
+        while not self.control["stopped"]:
+            # Logic:
+            if not calculator.wait_for_sample(timeout=self.period * 4) or not calculator.ready():
+                continue
+
+            # Variables (Assignment):
+            # Slot:
+            slot: numpy.ndarray = self.samples.claim()
+
+            # Logic:
+            with calculator.condition:
+                calculator.thigh_readings.snapshot(slot["window"][0])
+                calculator.shank_readings.snapshot(slot["window"][1])
+
+                # NOTE: The slot carries the actuated joint's rows only, whatever the amount of sensors of the graph.
+                slot["orientations"] = (calculator.align() if self.align else calculator.orientations)[rows]
+
+                if self.horizon:
+                    slot["features"] = calculator.snapshot_features()[rows]
+
+            slot["calibration_offset"] = calculator.calibration_offset
+            slot["timestamp"] = monotonic_ns()
+
+            self.samples.commit(slot)
+
+            self.control["samples"] += 1
+
+            # Doorbells:
+            self.inference_doorbell.release()
+            self.actuation_doorbell.release()
+
+        calculator.terminate()
+
+        if calculator.aligner is not None:
+            # Variables (Assignment):
+            # Summary:
+            summary: Dict[str, Dict[str, float]] = calculator.aligner.summary()
+
+            # Logging:
+            logger.info("[*] Inter-device skew: p50 {:.2f} ms, p99 {:.2f} ms | Inter-arrival jitter: p50 {:.2f} ms, p99 {:.2f} ms".format(
+                summary["skew"]["p50_us"] / 1000, summary["skew"]["p99_us"] / 1000, summary["jitter"]["p50_us"] / 1000, summary["jitter"]["p99_us"] / 1000
+            ))
+
+        if recorder is not None:
+            recorder.stop()
+
+    def infer(self) -> None:
+        """
+        * Inference process: publishes a PREDICTION record for the latest sample, skipping the samples it could not keep up with.
+        """
+
+        # Initialization:
+        self.prepare(self.cores[1], "inference")
+
+        # Variables (Assignment):
+        # Learner:
+        learner: Learner = Learner(learner_path=self.learner_path)
+        learner.load()
+
+        # Indices:
+        indices: Dict[str, int] = {label: index for index, label in enumerate(self.labels)}
+
+        # Sample:
+        sample: numpy.ndarray = numpy.zeros((), dtype=self.SAMPLE)
+
+        # Sequence:
+        last_sequence: int = -1
+
+        # Logic:
+        while not self.control["stopped"]:
+            # Logic:
+            if not self.inference_doorbell.acquire(timeout=self.period * 4):
+                continue
+
+            # Variables (Assignment):
+            # Sequence:
+            sequence: int = self.samples.latest(sample)
+
+            # Logic:
+            if sequence <= last_sequence:
+                continue
+
+            # Variables (Assignment):
+            # Prediction:
+            prediction: str = learner.predict(sample["window"][1], sample["features"][1] if self.horizon else None)
+
+            # Slot:
+            slot: numpy.ndarray = self.predictions.claim()
+
+            # Logic:
+            slot["sample"] = sequence
+            slot["prediction"] = indices.get(str(prediction), -1)
+
+            self.predictions.commit(slot)
+
+            self.control["predictions"] += 1
+
+            last_sequence = sequence
+
+        if learner.cascade is not None:
+            logger.info("[*] Cascade decisions: {} by the first stage, {} by the full forest.".format(*learner.decisions))
+
+    def actuate(self) -> None:
+        """
+        * Actuation process: steps the Writer on every new sample, with the latest prediction published so far.
+        """
+
+        # Imports:
+        from components.writer import Writer, RegisterBackend, RecordingBackend
+        from components.telemetry import Telemetry
+        from components.profiler import Histogram
+
+        # Initialization:
+        self.prepare(self.cores[2], "actuation")
+
+        # Variables (Assignment):
+        # Backend:
+        if self.replay is not None:
+            backend: Any = RecordingBackend()
+        elif self.backend == "register":
+            backend: Any = RegisterBackend(self.registers)
+        else:
+            backend: Any = None
+
+        # Writer:
+        writer: Writer = Writer(debug=self.debug, backend=backend)
+
+        # Telemetry:
+        telemetry: Telemetry = Telemetry(self.labels, **self.telemetry)
+        telemetry.start()
+
+        # Histogram:
+        latencies: Histogram = Histogram()
+
+        # Records:
+        sample: numpy.ndarray = numpy.zeros((), dtype=self.SAMPLE)
+        prediction: numpy.ndarray = numpy.zeros((), dtype=self.PREDICTION)
+
+        # Pointers:
+        thigh_pointer: Any = sample["orientations"][0].ctypes.data_as(ctypes.POINTER(ctypes.c_float))
+        shank_pointer: Any = sample["orientations"][1].ctypes.data_as(ctypes.POINTER(ctypes.c_float))
+
+        # Sequence:
+        last_sequence: int = -1
+
+        # Logic:
+        while not self.control["stopped"]:
+            # Logic:
+            if not self.actuation_doorbell.acquire(timeout=self.period * 4):
+                continue
+
+            # Variables (Assignment):
+            # Sequence:
+            sequence: int = self.samples.latest(sample)
+
+            # Logic:
+            if sequence <= last_sequence or self.predictions.latest(prediction) < 0:
+                continue
+
+            # Statistics:
+            if last_sequence >= 0:
+                self.control["skipped"] += sequence - last_sequence - 1
+
+            last_sequence = sequence
+
+            # Variables (Assignment):
+            # Label:
+            label: Optional[str] = self.labels[prediction["prediction"]] if prediction["prediction"] >= 0 else None
+
+            # Flexion & Modulation:
+            flexion, modulation = writer.step(thigh_pointer, shank_pointer, float(sample["calibration_offset"]), label == self.STOP_LABEL)
+
+            # Statistics:
+            latency: int = monotonic_ns() - int(sample["timestamp"])
+
+            latencies.record(latency)
+
+            self.control["actuations"] += 1
+            self.control["worst_latency"] = max(int(self.control["worst_latency"]), latency)
+
+            # Telemetry:
+            telemetry.record(label, flexion, modulation)
+
+        writer.write_pulse_modulation(0)
+        writer.close()
+
+        telemetry.stop()
+
+        logger.info("[*] Sample to write latency: {}".format(latencies.summary()))
+
+        if self.replay is not None:
+            logger.info("[*] Recorded {} GPIO writes.".format(len(backend.records)))
+
+    def report(self) -> None:
+        logger.info("[*] Samples: {} | Predictions: {} | Actuations: {} | Skipped samples: {} | Worst latency: {:.2f} ms".format(
+            int(self.control["samples"]), int(self.control["predictions"]), int(self.control["actuations"]), int(self.control["skipped"]),
+            int(self.control["worst_latency"]) / 1e6
+        ))
+
+    def start(self) -> None:
+        # Logic:
+        for target, name in ((self.infer, "inference"), (self.actuate, "actuation"), (self.acquire, "acquisition")):
+            # Variables (Assignment):
+            # Process:
+            process: Any = self.context.Process(target=target, name=name, daemon=True)
+
+            # Logic:
+            process.start()
+
+            self.processes.append(process)
+
+    def stop(self) -> None:
+        # Logic:
+        self.control["stopped"] = 1
+
+        for process in self.processes:
+            process.join(timeout=5.0)
+
+            if process.is_alive():
+                logger.warning("[!] {} process did not stop, terminating it.".format(process.name.capitalize()))
+
+                process.terminate()
+
+        self.report()
+
+        # Memory:
+        del self.control
+
+        self.memory.close()
+        self.memory.unlink()
+
+        self.samples.close()
+        self.predictions.close()
+
+    def run(self) -> None:
+        # Logic:
+        self.start()
+
+        try:
+            logger.warning("[*] Press CTRL + C to halt code execution.")
+
+            # Calibration:
+            while not self.control["calibrated"] and all(process.is_alive() for process in self.processes):
+                sleep(0.1)
+
+            # Variables (Assignment):
+            # End:
+            end: float = monotonic() + self.duration if self.duration is not None else float("inf")
+
+            # Logic:
+            while monotonic() < end and all(process.is_alive() for process in self.processes):
+                sleep(min(0.1, max(0.0, end - monotonic())))
+
+            self.stop()
+
+        except KeyboardInterrupt:
+            self.stop()
+
+            logger.info("[*] Execution halted by user.")
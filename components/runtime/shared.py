@@ -0,0 +1,127 @@
+# Written by: Christopher Gholmieh
+# Imports:
+
+# Typing:
+from typing import Optional, Any
+
+# Shared Memory:
+from multiprocessing.shared_memory import SharedMemory
+from multiprocessing import resource_tracker
+
+# Multiprocessing:
+import multiprocessing
+
+# Numpy:
+import numpy
+
+
+# Shared Ring:
+class SharedRing:
+    """
+    * Single producer ring of fixed-layout records in shared memory, readable by any amount of processes.
+        * Layout: an int64 head (sequence of the latest committed record, -1 when empty), then capacity records of the given dtype.
+        * Records must start with an int64 "sequence" field, the sequence the record was committed with (-1 while being written).
+
+    * The producer claims a slot (its sequence is set to -1), fills it in place, and commits it (slot sequence, then head).
+        * Readers copy the latest record, the slot being filled is the one after it, so the producer never writes what is read.
+        * NOTE: Readers only ever want the latest record, older records are simply overwritten.
+
+    * Commits and copies hold a process-shared lock (a POSIX semaphore), whose acquire and release order the plain numpy stores.
+        * NOTE: Without it, a weakly ordered CPU (the Raspberry Pi's ARM cores) may publish the head before the record it points to.
+        * NOTE: The lock is only held for the head update and the copy of one record, never while the producer fills a slot.
+        * Processes attaching to the segment by name must be handed the creator's lock.
+    """
+
+    # Initialization:
+    def __init__(self, dtype: numpy.dtype, capacity: int, name: Optional[str] = None, lock: Optional[Any] = None) -> None:
+        # Layout:
+        self.dtype: numpy.dtype = numpy.dtype(dtype)
+        self.capacity: int = capacity
+
+        # Validation:
+        if self.dtype.names is None or self.dtype.names[0] != "sequence" or self.dtype["sequence"] != numpy.dtype("<i8"):
+            raise ValueError("Shared ring records must start with an int64 sequence field!")
+
+        if capacity < 2:
+            raise ValueError("Shared ring must hold at least two records, one being read and one being written!")
+
+        # Lock:
+        self.lock: Any = lock if lock is not None else multiprocessing.Lock()
+
+        # Memory:
+        # NOTE: The creator passes no name, the other processes attach to the creator's segment by name.
+        self.memory: SharedMemory = SharedMemory(name=name, create=name is None, size=8 + self.dtype.itemsize * capacity)
+        self.owner: bool = name is None
+
+        if not self.owner:
+            # NOTE: Only the creator unlinks the segment, attaching processes must not be tracked as owners (Python < 3.13).
+            resource_tracker.unregister(self.memory._name, "shared_memory")
+
+        # Views:
+        self.head: numpy.ndarray = numpy.ndarray((1,), dtype="<i8", buffer=self.memory.buf, offset=0)
+        self.records: numpy.ndarray = numpy.ndarray((capacity,), dtype=self.dtype, buffer=self.memory.buf, offset=8)
+
+        if self.owner:
+            self.head[0] = -1
+            self.records["sequence"] = -1
+
+        # Producer:
+        self.sequence: int = int(self.head[0])
+
+    # Properties:
+    @property
+    def name(self) -> str:
+        return self.memory.name
+
+    # Methods:
+    def claim(self) -> numpy.ndarray:
+        """
+        * Returns the next slot as a writable record view, marked as being written.
+        """
+
+        # Variables (Assignment):
+        # Slot:
+        slot: numpy.ndarray = self.records[(self.sequence + 1) % self.capacity]
+
+        # Logic:
+        slot["sequence"] = -1
+
+        return slot
+
+    def commit(self, slot: numpy.ndarray) -> int:
+        # Sequence:
+        self.sequence += 1
+
+        # Logic:
+        with self.lock:
+            slot["sequence"] = self.sequence
+
+            self.head[0] = self.sequence
+
+        return self.sequence
+
+    def latest(self, output: numpy.ndarray) -> int:
+        """
+        * Copies the latest committed record into output (a 0-d array of the ring dtype), returning its sequence (-1 when empty).
+        """
+
+        # Logic:
+        with self.lock:
+            # Variables (Assignment):
+            # Head:
+            head: int = int(self.head[0])
+
+            # Logic:
+            if head >= 0:
+                output[...] = self.records[head % self.capacity]
+
+        return head
+
+    def close(self) -> None:
+        # Logic:
+        del self.head, self.records
+
+        self.memory.close()
+
+        if self.owner:
+            self.memory.unlink()
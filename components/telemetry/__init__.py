@@ -0,0 +1,5 @@
+# Written by: Christopher Gholmieh
+# Imports:
+
+# Telemetry:
+from .telemetry import Telemetry
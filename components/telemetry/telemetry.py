@@ -0,0 +1,155 @@
+# Written by: Christopher Gholmieh
+# Imports:
+
+# Typing:
+from typing import Optional, Sequence, Dict, BinaryIO
+
+# Loguru:
+from loguru import logger
+
+# Threading:
+from threading import Thread, Event
+
+# Time:
+from time import monotonic_ns
+
+# Numpy:
+import numpy
+
+
+# Telemetry:
+class Telemetry:
+    """
+    * Records prediction, flexion, and modulation of every control loop iteration without logging on the control thread.
+        * Records are written into a preallocated binary ring buffer (RECORD layout), and drained by a background thread.
+        * The drain thread formats the log lines and/or appends the raw records to a file (readable with numpy.fromfile(path, RECORD)).
+
+    * Sampling keeps every nth iteration, and the rate limit caps the amount of records per second.
+        * NOTE: There is a single producer (the control loop), records overwritten before being drained are counted as dropped.
+    """
+
+    # Constants:
+    RECORD: numpy.dtype = numpy.dtype([
+        ("timestamp", "<i8"),
+        ("prediction", "<i2"),
+        ("modulation", "<i2"),
+        ("flexion", "<f4"),
+    ])
+
+    # Initialization:
+    def __init__(self, labels: Sequence[str], capacity: int = 4096, sample_every: int = 1, rate: Optional[float] = None, interval: float = 0.5, path: Optional[str] = None, log: bool = True) -> None:
+        # Labels:
+        self.labels: Sequence[str] = list(labels)
+        self.indices: Dict[str, int] = {label: index for index, label in enumerate(self.labels)}
+
+        # Records:
+        self.records: numpy.ndarray = numpy.zeros(capacity, dtype=self.RECORD)
+
+        self.capacity: int = capacity
+
+        # Cursors:
+        self.head: int = 0
+        self.tail: int = 0
+
+        # Statistics:
+        self.dropped: int = 0
+
+        # Sampling:
+        self.sample_every: int = sample_every
+        self.samples: int = 0
+
+        # Rate:
+        self.minimum_gap: int = int(1e9 / rate) if rate else 0
+        self.last_record: int = -self.minimum_gap
+
+        # Sinks:
+        self.log: bool = log
+
+        self.file: Optional[BinaryIO] = open(path, "ab") if path is not None else None
+
+        # Thread:
+        self.interval: float = interval
+
+        self.stopped: Event = Event()
+        self.thread: Thread = Thread(target=self.drain_loop, daemon=True)
+
+    # Methods:
+    def start(self) -> None:
+        self.thread.start()
+
+    def record(self, prediction: Optional[str], flexion: Optional[float], modulation: int) -> None:
+        # Sampling:
+        self.samples += 1
+
+        if self.samples % self.sample_every:
+            return
+
+        # Variables (Assignment):
+        # Timestamp:
+        timestamp: int = monotonic_ns()
+
+        # Rate:
+        if timestamp - self.last_record < self.minimum_gap:
+            return
+
+        self.last_record = timestamp
+
+        # Logic:
+        self.records[self.head % self.capacity] = (
+            timestamp, self.indices.get(prediction, -1), modulation, flexion if flexion is not None else numpy.nan
+        )
+
+        self.head += 1
+
+    def drain(self) -> None:
+        # Variables (Assignment):
+        # Head:
+        head: int = self.head
+
+        # Overrun:
+        if head - self.tail > self.capacity:
+            self.dropped += head - self.tail - self.capacity
+            self.tail = head - self.capacity
+
+        # Logic:
+        if head == self.tail:
+            return
+
+        # Variables (Assignment):
+        # Indices:
+        indices: numpy.ndarray = numpy.arange(self.tail, head) % self.capacity
+
+        # Records:
+        records: numpy.ndarray = self.records[indices]
+
+        # Logic:
+        self.tail = head
+
+        if self.file is not None:
+            records.tofile(self.file)
+            self.file.flush()
+
+        if self.log:
+            for record in records:
+                logger.info("[*] Prediction: {} | Flexion: {:.2f} | Modulation: {}".format(
+                    self.labels[record["prediction"]] if record["prediction"] >= 0 else None, record["flexion"], record["modulation"]
+                ))
+
+    def drain_loop(self) -> None:
+        while not self.stopped.wait(self.interval):
+            self.drain()
+
+    def stop(self) -> None:
+        # Logic:
+        self.stopped.set()
+
+        if self.thread.is_alive():
+            self.thread.join()
+
+        self.drain()
+
+        if self.dropped:
+            logger.warning("[!] Telemetry dropped {} records.".format(self.dropped))
+
+        if self.file is not None:
+            self.file.close()
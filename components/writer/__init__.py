@@ -3,3 +3,6 @@
 
 # Writer:
 from .writer import Writer
+
+# Backends:
+from .backends import NativeBackend, RegisterBackend, RecordingBackend, StepResult, Step
@@ -0,0 +1,227 @@
+# Written by: Christopher Gholmieh
+# Imports:
+
+# Typing:
+from typing import List, Tuple, Any
+
+# Time:
+from time import perf_counter
+
+# CTypes:
+import ctypes
+
+# CSV:
+import csv
+
+
+# Step Result:
+class StepResult(ctypes.Structure):
+    """
+    * Mirrors struct step_result of the calculator optimizations, filled in place by the fused step.
+    """
+
+    # Fields:
+    _fields_ = [
+        ("flexion", ctypes.c_float),
+        ("modulation", ctypes.c_int),
+        ("stopped", ctypes.c_int),
+    ]
+
+
+# Step:
+class Step:
+    """
+    * Calls a fused step function (float*, float*, float, int, struct step_result*) with preallocated arguments.
+        * NOTE: Argtypes are deliberately left unset, every argument is passed already converted,
+          which avoids the ctypes conversion overhead (roughly two thirds of the call) on every step.
+    """
+
+    # Initialization:
+    def __init__(self, function: Any) -> None:
+        # Function:
+        self.function: Any = function
+        self.function.restype = None
+
+        # Offset:
+        self.offset: ctypes.c_float = ctypes.c_float(0.0)
+
+        # Result:
+        self.result: StepResult = StepResult()
+        self.reference: Any = ctypes.byref(self.result)
+
+    # Methods:
+    def hold_gil(self) -> None:
+        """
+        * Rebinds the function like ctypes.PyDLL would, so the GIL is kept during the call instead of being released and reacquired.
+            * The step takes well under a microsecond, releasing the GIL only lets another thread take over the control thread mid-step.
+        """
+
+        # Logic:
+        self.function = ctypes.PYFUNCTYPE(None)(ctypes.cast(self.function, ctypes.c_void_p).value)
+        self.function.argtypes = None
+
+    def __call__(self, thigh_pointer: Any, shank_pointer: Any, calibration_offset: float, stop: bool) -> Tuple[float, int]:
+        # Logic:
+        self.offset.value = calibration_offset
+
+        self.function(thigh_pointer, shank_pointer, self.offset, 1 if stop else 0, self.reference)
+
+        return self.result.flexion, self.result.modulation
+
+
+# Native Backend:
+class NativeBackend:
+    """
+    * Writes to the GPIO pins of the Raspberry Pi through the one-step-writer C bindings (wiringPi).
+    """
+
+    # Initialization:
+    def __init__(self) -> None:
+        # GPIO:
+        import RPi.GPIO as GPIO
+
+        GPIO.setmode(GPIO.BCM)
+
+        # Library:
+        self.library: ctypes.CDLL = ctypes.CDLL("./one-step-writer/one-step-writer.so")
+
+        self.library.initialize_optimizations.restype = None
+        self.library.initialize_optimizations.argtypes = []
+
+        self.library.initialize_pins.restype = None
+        self.library.initialize_pins.argtypes = []
+
+        self.library.write_pulse_modulation.restype = None
+        self.library.write_pulse_modulation.argtypes = [ctypes.c_int]
+
+        self.library.write_stop_pin.restype = None
+        self.library.write_stop_pin.argtypes = []
+
+        # Step:
+        self.step: Step = Step(self.library.step)
+
+        # Logic:
+        self.library.initialize_optimizations()
+        self.library.initialize_pins()
+
+    # Methods:
+    def write_pulse_modulation(self, value: int) -> None:
+        self.library.write_pulse_modulation(value)
+
+    def write_stop_pin(self) -> None:
+        self.library.write_stop_pin()
+
+
+# Register Backend:
+class RegisterBackend:
+    """
+    * Writes to the GPIO pins through the one-step-registers C bindings, directly on the memory-mapped GPIO block.
+        * Every write computes the set and clear masks of the pins that change, and applies them in at most two register writes.
+        * Unchanged pins are skipped, a repeated pulse modulation performs no register write at all.
+
+    * The path is /dev/gpiomem on the Raspberry Pi (BCM283x/BCM2711 register layout).
+        * NOTE: Any existing regular file works as a stand-in, the set and clear words then hold the last written masks. The path is never created.
+        * NOTE: Pull resistors are not configured, the pins are driven low once mapped.
+    """
+
+    # Constants:
+    PATH: str = "/dev/gpiomem"
+
+    LIBRARY_PATH: str = "./one-step-writer/one-step-registers.so"
+
+    # Initialization:
+    def __init__(self, path: str = PATH, library_path: str = LIBRARY_PATH) -> None:
+        # Path:
+        self.path: str = path
+
+        # Library:
+        self.library: ctypes.CDLL = ctypes.CDLL(library_path)
+
+        self.library.initialize_registers.restype = ctypes.c_int
+        self.library.initialize_registers.argtypes = [ctypes.c_char_p]
+
+        self.library.terminate_registers.restype = None
+        self.library.terminate_registers.argtypes = []
+
+        self.library.calculate_pulse_modulation_mask.restype = ctypes.c_uint32
+        self.library.calculate_pulse_modulation_mask.argtypes = [ctypes.c_int]
+
+        self.library.write_register_pulse_modulation.restype = ctypes.c_int
+        self.library.write_register_pulse_modulation.argtypes = [ctypes.c_int]
+
+        self.library.write_register_stop_pin.restype = ctypes.c_int
+        self.library.write_register_stop_pin.argtypes = []
+
+        self.library.get_register_state.restype = ctypes.c_uint32
+        self.library.get_register_state.argtypes = []
+
+        # Step:
+        self.step: Step = Step(self.library.register_step)
+
+        # Logic:
+        if self.library.initialize_registers(path.encode()) != 0:
+            raise OSError("Failed to map the GPIO registers at {}!".format(path))
+
+    # Methods:
+    def write_pulse_modulation(self, value: int) -> None:
+        self.library.write_register_pulse_modulation(value)
+
+    def write_stop_pin(self) -> None:
+        self.library.write_register_stop_pin()
+
+    def state(self) -> int:
+        return self.library.get_register_state()
+
+    def close(self) -> None:
+        self.library.terminate_registers()
+
+
+# Recording Backend:
+class RecordingBackend:
+    """
+    * Stand-in for the GPIO pins that records every write with a perf_counter timestamp.
+        * Records are (timestamp, pin, value), where pin is "modulation" or "stop".
+
+    * The fused step runs calculate_step of the calculator optimizations, then records the write.
+    """
+
+    # Initialization:
+    def __init__(self) -> None:
+        # Records:
+        self.records: List[Tuple[float, str, int]] = []
+
+        # Library:
+        self.library: ctypes.CDLL = ctypes.CDLL("./one-step-optimizations/calculator-optimizations.so")
+
+        # Step:
+        self.calculate_step: Step = Step(self.library.calculate_step)
+
+    # Methods:
+    def write_pulse_modulation(self, value: int) -> None:
+        self.records.append((perf_counter(), "modulation", value))
+
+    def write_stop_pin(self) -> None:
+        self.records.append((perf_counter(), "stop", 1))
+
+    def step(self, thigh_pointer: Any, shank_pointer: Any, calibration_offset: float, stop: bool) -> Tuple[float, int]:
+        # Variables (Assignment):
+        # Flexion & Modulation:
+        flexion, modulation = self.calculate_step(thigh_pointer, shank_pointer, calibration_offset, stop)
+
+        # Logic:
+        if stop:
+            self.write_stop_pin()
+        else:
+            self.write_pulse_modulation(modulation)
+
+        return flexion, modulation
+
+    def dump(self, path: str) -> None:
+        with open(path, "w", newline="") as file:
+            # Variables (Assignment):
+            # Writer:
+            writer = csv.writer(file)
+
+            # Logic:
+            writer.writerow(["timestamp", "pin", "value"])
+            writer.writerows(self.records)
@@ -1,17 +1,17 @@
 # Written by: Christopher Gholmieh
 # Imports:
 
-# GPIO:
-import RPi.GPIO as GPIO
+# Backends:
+from .backends import NativeBackend, Step
 
 # Loguru:
 from loguru import logger
 
 # Typing:
-from typing import List
+from typing import Optional, Tuple, List, Any
 
-# CTypes:
-import ctypes
+# Time:
+from time import monotonic_ns
 
 
 # Writer:
@@ -29,50 +29,90 @@ class Writer:
 
     * Has functionality to write a value to designated STOP pin.
         * GPIO 12: STOP
+
+    * Writes go through a backend, the native wiringPi backend is used unless another one (e.g. RegisterBackend, RecordingBackend) is given.
+        * Backends providing step are fused: flexion, modulation, and the write happen in one native call (see Calculator.step).
     """
 
+    # Constants:
+    PINS: List[int] = [14, 15, 18, 23, 24, 25, 8, 7]
+
+    STOP_PIN: int = 12
+
     # Initialization:
-    def __init__(self, debug: bool = False) -> None:
+    def __init__(self, debug: bool = False, backend: Optional[Any] = None, profiler: Optional[Any] = None) -> None:
         # Debug:
         self.debug: bool = debug
 
-        # GPIO:
-        GPIO.setmode(GPIO.BCM)
-
         # Pins:
-        self.pins: List[int] = [14, 15, 18, 23, 24, 25, 8, 7]
-        self.stop: int = 12
-
-        # Library:
-        self.library: ctypes.CDLL = ctypes.CDLL("./one-step-writer/one-step-writer.so")
-
-        self.library.initialize_optimizations.restype = None
-        self.library.initialize_optimizations.argtypes = []
-
-        self.library.initialize_pins.restype = None
-        self.library.initialize_pins.argtypes = []
+        self.pins: List[int] = list(self.PINS)
+        self.stop: int = self.STOP_PIN
 
-        self.library.number_to_binary.restype = ctypes.c_char_p
-        self.library.number_to_binary.argtypes = [ctypes.c_ubyte]
+        # Profiler:
+        self.profiler: Optional[Any] = profiler
 
-        self.library.write_pulse_modulation.restype = None
-        self.library.write_pulse_modulation.argtypes = [ctypes.c_int]
+        # Backend:
+        self.backend: Any = backend if backend is not None else NativeBackend()
 
-        self.library.write_stop_pin.restype = None
-        self.library.write_stop_pin.argtypes = []
-
-        # Logic:
-        self.library.initialize_optimizations()
-        self.library.initialize_pins()
+        # Fused:
+        self.fused: bool = hasattr(self.backend, "step")
 
         if self.debug:
             logger.info("[*] Initialized GPIO output pins.")
 
     # Methods:
     def write_pulse_modulation(self, value: int) -> None:
-        self.library.write_pulse_modulation(value)
+        # Profiler:
+        if self.profiler is not None:
+            start: int = monotonic_ns()
+
+        # Logic:
+        self.backend.write_pulse_modulation(value)
 
-        logger.info(f"[*] Wrote {value} to GPIO pins.")
+        if self.profiler is not None:
+            self.profiler.record("write", start)
+
+        if self.debug:
+            logger.info(f"[*] Wrote {value} to GPIO pins.")
 
     def write_stop_pin(self) -> None:
-        self.library.write_stop_pin()
+        # Profiler:
+        if self.profiler is not None:
+            start: int = monotonic_ns()
+
+        # Logic:
+        self.backend.write_stop_pin()
+
+        if self.profiler is not None:
+            self.profiler.record("write", start)
+
+    def close(self) -> None:
+        # Logic:
+        if hasattr(self.backend, "close"):
+            self.backend.close()
+
+    def hold_gil(self) -> None:
+        """
+        * Keeps the GIL during the fused step of the backend (see Step.hold_gil), used by the real-time mode.
+        """
+
+        # Logic:
+        for value in vars(self.backend).values():
+            if isinstance(value, Step):
+                value.hold_gil()
+
+    def step(self, thigh_pointer: Any, shank_pointer: Any, calibration_offset: float, stop: bool) -> Tuple[float, int]:
+        # Profiler:
+        if self.profiler is not None:
+            start: int = monotonic_ns()
+
+        # Logic:
+        flexion, modulation = self.backend.step(thigh_pointer, shank_pointer, calibration_offset, stop)
+
+        if self.profiler is not None:
+            self.profiler.record("step", start)
+
+        if self.debug:
+            logger.info(f"[*] Stepped to flexion {flexion} and wrote {'STOP' if stop else modulation} to GPIO pins.")
+
+        return flexion, modulation
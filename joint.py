@@ -2,84 +2,457 @@
 # Imports:
 
 # Components:
-from components import Calculator, Learner, Writer
+from components import Calculator, Learner, Writer, Runtime
+
+from components.calculator import ReplaySpatial, SensorGraph
+from components.writer import RegisterBackend, RecordingBackend
+from components.profiler import Profiler, Histogram
+from components.telemetry import Telemetry
+from components.recorder import Recorder
+from components.runtime import RealTime
 
 # Typing:
-from typing import Optional
+from typing import Optional, Callable, Dict, List, Any
 
 # Loguru:
 from loguru import logger
 
+# Numpy:
+import numpy
+
+# Argparse:
+from argparse import ArgumentParser, Namespace
+
 # Time:
-from time import sleep
+from time import sleep, perf_counter
+
+# Signal:
+import signal
 
 
 # Joint:
 class Joint:
+    """
+    * Reads the IMUs, predicts the gait state, and writes the pulse modulation to the GPIO pins.
+        * Scheduler "event": Wakes up as soon as a synchronized thigh and shank reading arrives.
+        * Scheduler "sleep": Polls the calculator every INTERVAL_DELAY seconds (fallback).
+
+    * A deadline miss is counted whenever two consecutive actuations are further apart than (1 + DEADLINE_TOLERANCE) / target_rate.
+        * The IMUs are sampled at the target rate, the tolerance absorbs their regular arrival jitter.
+        * NOTE: Counted in both schedulers, polling every INTERVAL_DELAY seconds the sleep scheduler misses every deadline of a faster target rate.
+
+    * Replay mode streams a recording through ReplaySpatial IMUs and records GPIO writes instead of driving the pins.
+        * Used to run the full pipeline without the Raspberry Pi, e.g. to measure throughput and latency regressions.
+
+    * Profiling collects per-stage latency histograms, reported on SIGUSR1 and at shutdown.
+
+    * Prediction, flexion, and modulation are recorded through Telemetry, the control thread never formats or writes logs.
+        * Debug mode restores the per-call logging of the calculator and writer.
+
+    * When the writer backend is fused, flexion, modulation, and the GPIO write happen in a single native call per step.
+
+    * Backend "native" writes the pins through wiringPi, backend "register" through the memory-mapped GPIO block at registers.
+
+    * Real-time mode pins the control thread, requests SCHED_FIFO, and freezes then disables the garbage collector once startup is done (see RealTime).
+        * The fused step then keeps the GIL during its native call, so the handler threads cannot take over mid-step.
+        * Period jitter (deviation of every actuation period from the target) is reported at shutdown in every mode, for comparison.
+
+    * With a lookup resolution, every step maps the orientations straight to the pulse modulation through the calculator's table,
+      skipping the flexion angle (recorded as NaN), see Calculator.lookup_error for its accuracy.
+
+    * With align, every step acts on thigh and shank orientations paired at a common device instant, skew and jitter are reported at shutdown.
+
+    * A sensor graph file (see SensorGraph) declares more IMUs and joints than the single knee, its first joint is the actuated one.
+        * The unfused step then calculates every joint angle in a single native call, the fused and lookup steps act on the actuated joint only.
+    """
+
     # Constants:
     INTERVAL_DELAY: float = 0.50
 
+    TARGET_RATE: float = 50.0
+
+    DEADLINE_TOLERANCE: float = 0.25
+
+    SCHEDULERS: tuple = ("event", "sleep")
+
+    BACKENDS: tuple = ("native", "register")
+
+    FIRST_WRITE_MESSAGE: str = "[*] First GPIO write."
+
+    LEARNER_PATH: str = "./learners/one-step-learner.forest"
+
     # Initialization:
-    def __init__(self) -> None:
-        # Calculator:
-        self.calculator: Calculator = Calculator(use_quaternions=False, debug=True)
+    def __init__(self, scheduler: str = "event", target_rate: float = TARGET_RATE, replay: Optional[str] = None, speed: float = 1.0, duration: Optional[float] = None, profile: bool = False, profile_path: Optional[str] = None, debug: bool = False, telemetry: Optional[Dict[str, Any]] = None, fused: bool = True, backend: str = "native", registers: str = RegisterBackend.PATH, record: Optional[str] = None, label: Optional[str] = None, align: bool = False, realtime: bool = False, core: int = RealTime.CORE, priority: int = RealTime.PRIORITY, lookup_resolution: int = 0, graph: Optional[str] = None, learner_path: str = LEARNER_PATH) -> None:
+        # Validation:
+        if scheduler not in self.SCHEDULERS:
+            raise ValueError("Scheduler must be one of {}!".format(self.SCHEDULERS))
+
+        if backend not in self.BACKENDS:
+            raise ValueError("Backend must be one of {}!".format(self.BACKENDS))
+
+        # Scheduler:
+        self.scheduler: str = scheduler
+
+        # Period:
+        self.target_rate: float = target_rate
+        self.period: float = 1.0 / target_rate
+
+        self.deadline: float = self.period * (1.0 + self.DEADLINE_TOLERANCE)
+
+        # Statistics:
+        self.iterations: int = 0
+        self.deadline_misses: int = 0
+
+        self.worst_period: float = 0.0
+
+        self.jitter: Histogram = Histogram()
+
+        # Written:
+        self.written: bool = False
+
+        # Duration:
+        self.duration: Optional[float] = duration
+
+        # Replay:
+        self.replay: Optional[str] = replay
+
+        # Profiler:
+        self.profiler: Optional[Profiler] = Profiler() if profile else None
+        self.profile_path: Optional[str] = profile_path
+
+        if self.profiler is not None:
+            signal.signal(signal.SIGUSR1, lambda signal_number, frame: self.profiler.report())
+
+        # Recorder:
+        self.recorder: Optional[Recorder] = Recorder(record) if record is not None else None
+
+        if self.recorder is not None:
+            self.recorder.set_label(label)
+
+        # Variables (Assignment):
+        # Factory:
+        spatial_factory: Optional[Callable[[], Any]] = (lambda: ReplaySpatial(replay, speed=speed)) if replay is not None else None
 
         # Learner:
-        self.learner: Learner = Learner(learner_path="./learners/one-step-learner.pkl")
+        self.learner: Learner = Learner(learner_path=learner_path, profiler=self.profiler)
         self.learner.load()
 
+        # Calculator:
+        # NOTE: The learner's feature horizon (0 for raw windows) decides whether the calculator maintains features.
+        self.calculator: Calculator = Calculator(use_quaternions=False, debug=debug, data_interval=int(1000 * self.period), spatial_factory=spatial_factory, profiler=self.profiler, feature_horizon=self.learner.horizon, recorder=self.recorder, align=align, lookup_resolution=lookup_resolution, graph=SensorGraph.load(graph) if graph is not None else None)
+
         # Writer:
-        self.writer: Writer = Writer(debug=True)
+        if replay is not None:
+            self.writer: Writer = Writer(debug=debug, backend=RecordingBackend(), profiler=self.profiler)
+        else:
+            self.writer: Writer = Writer(debug=debug, backend=RegisterBackend(registers) if backend == "register" else None, profiler=self.profiler)
+
+        # Fused:
+        self.fused: bool = fused and self.writer.fused and not self.calculator.use_quaternions
+
+        # Telemetry:
+        # NOTE: A learner that failed to load (logged by Learner.load) has no classes, predictions are then recorded as none.
+        self.telemetry: Telemetry = Telemetry(self.learner.forest.classes if self.learner.forest is not None else (), **(telemetry or {}))
+
+        # Real Time:
+        self.realtime: Optional[RealTime] = RealTime(core, priority) if realtime else None
+
+        if self.realtime is not None and self.fused:
+            self.writer.hold_gil()
 
     # Methods:
+    def wait(self, deadline: float) -> bool:
+        if self.scheduler == "sleep":
+            # Interval:
+            sleep(self.INTERVAL_DELAY)
+
+            # Logic:
+            return True
+
+        return self.calculator.wait_for_sample(timeout=max(0.0, deadline - perf_counter()))
+
+    def step(self) -> None:
+        # Logic:
+        if self.calculator.ready():
+            # Variables (Assignment):
+            # Window:
+            window: numpy.ndarray = self.calculator.snapshot()
+
+            # Prediction:
+            prediction: str = self.learner.predict(window[self.calculator.shank_index], self.calculator.snapshot_features()[self.calculator.shank_index] if self.learner.horizon else None)
+
+            # Stop:
+            stop: bool = prediction == "standing still"
+
+            # Logic:
+            if self.calculator.modulation_table is not None:
+                # Variables (Assignment):
+                # Flexion & Modulation:
+                flexion, modulation = None, self.calculator.lookup_pulse_modulation()
+
+                # Logic:
+                if stop:
+                    self.writer.write_stop_pin()
+                else:
+                    self.writer.write_pulse_modulation(modulation)
+            elif self.fused:
+                # Variables (Assignment):
+                # Flexion & Modulation:
+                flexion, modulation = self.calculator.step(self.writer, stop)
+            else:
+                # Variables (Assignment):
+                # Flexion:
+                # NOTE: The first joint angle is the actuated joint's flexion.
+                flexion: Optional[float] = float(self.calculator.calculate_joints()[0]) if len(self.calculator.graph.joints) > 1 else self.calculator.calculate()
+
+                # Modulation:
+                modulation: int = self.calculator.calculate_pulse_modulation(flexion)
+
+                # Logic:
+                if stop:
+                    self.writer.write_stop_pin()
+                else:
+                    self.writer.write_pulse_modulation(modulation)
+
+            if self.profiler is not None:
+                self.profiler.record("end-to-end", self.calculator.sample_time)
+
+            self.telemetry.record(prediction, flexion, modulation)
+
+            if not self.written:
+                # Logging:
+                logger.info(self.FIRST_WRITE_MESSAGE)
+
+                # Written:
+                self.written = True
+
+    def report(self) -> None:
+        logger.info("[*] Iterations: {} | Deadline misses: {} | Worst period: {:.2f} ms (target {:.2f} ms)".format(
+            self.iterations, self.deadline_misses, self.worst_period * 1000, self.period * 1000
+        ))
+
+        if self.jitter.count:
+            # Variables (Assignment):
+            # Summary:
+            jitter: Dict[str, float] = self.jitter.summary()
+
+            # Logging:
+            logger.info("[*] Period jitter{}: p50 {:.3f} ms | p99 {:.3f} ms | max {:.3f} ms".format(
+                " (real-time)" if self.realtime is not None else "", jitter["p50_us"] / 1000, jitter["p99_us"] / 1000, jitter["max_us"] / 1000
+            ))
+
+        if self.learner.cascade is not None:
+            logger.info("[*] Cascade decisions: {} by the first stage, {} by the full forest.".format(*self.learner.decisions))
+
+        if self.calculator.aligner is not None:
+            # Variables (Assignment):
+            # Summary:
+            summary: Dict[str, Dict[str, float]] = self.calculator.aligner.summary()
+
+            # Logging:
+            logger.info("[*] Inter-device skew: p50 {:.2f} ms, p99 {:.2f} ms | Inter-arrival jitter: p50 {:.2f} ms, p99 {:.2f} ms".format(
+                summary["skew"]["p50_us"] / 1000, summary["skew"]["p99_us"] / 1000, summary["jitter"]["p50_us"] / 1000, summary["jitter"]["p99_us"] / 1000
+            ))
+
+    def terminate(self) -> None:
+        if self.realtime is not None:
+            self.realtime.exit()
+
+        self.calculator.terminate()
+
+        if self.recorder is not None:
+            self.recorder.stop()
+        self.writer.write_pulse_modulation(0)
+        self.writer.close()
+
+        self.telemetry.stop()
+
+        self.report()
+
+        if self.profiler is not None:
+            # Logging:
+            self.profiler.report()
+
+            # Logic:
+            if self.profile_path is not None:
+                self.profiler.dump(self.profile_path)
+
+        if self.replay is not None:
+            # Variables (Assignment):
+            # Records:
+            records: list = self.writer.backend.records
+
+            # Logging:
+            logger.info("[*] Recorded {} GPIO writes ({:.1f} writes per second).".format(
+                len(records), len(records) / max(records[-1][0] - records[0][0], 1e-9) if len(records) > 1 else 0.0
+            ))
+
     def loop(self) -> None:
         try:
             logger.warning("[*] Press CTRL + C to halt code execution.")
 
-            while True:
+            # Real Time:
+            # NOTE: Entered once startup (and calibration) is done, everything allocated so far is frozen out of the collector.
+            if self.realtime is not None:
+                self.realtime.enter()
+
+            # Variables (Assignment):
+            # Actuation:
+            last_actuation: float = perf_counter()
+
+            # Deadline:
+            deadline: float = last_actuation + self.deadline
+
+            # End:
+            end: float = last_actuation + self.duration if self.duration is not None else float("inf")
+
+            # NOTE: Tested on the clock rather than the last actuation, so the duration still ends the loop once samples stop arriving.
+            while perf_counter() < end:
                 # Interval:
-                sleep(self.INTERVAL_DELAY)
+                if not self.wait(deadline):
+                    # Statistics:
+                    self.deadline_misses += 1
+
+                    # Deadline:
+                    deadline = perf_counter() + self.deadline
+
+                    continue
 
                 # Logic:
-                if len(self.calculator.shank_acceleration_readings) == 3 and len(self.calculator.shank_gyroscope_readings) == 3:
-                    # Variables (Assignment):
-                    # Prediction:
-                    prediction: str = self.learner.predict([
-                        acceleration_vector + gyroscope_vector for acceleration_vector, gyroscope_vector in zip(
-                            self.calculator.shank_acceleration_readings.stack, self.calculator.shank_gyroscope_readings.stack
-                        )
-                    ])
-
-                    # Flexion:
-                    flexion: Optional[float] = self.calculator.calculate()
-
-                    # Modulation:
-                    modulation: int = self.calculator.calculate_pulse_modulation(flexion)
-
-                    # Logic:
-                    logger.info(f"[*] Prediction: {prediction}")
-                    logger.info(f"[*] Flexion: {flexion}")
-                    logger.info(f"[*] Modulation: {modulation}")
-
-                    if prediction == "standing still":
-                        self.writer.write_stop_pin()
-                    else:
-                        self.writer.write_pulse_modulation(modulation)
+                self.step()
+
+                # Variables (Assignment):
+                # Actuation:
+                actuation: float = perf_counter()
+
+                # Statistics:
+                self.iterations += 1
+
+                if actuation > deadline:
+                    self.deadline_misses += 1
+
+                self.worst_period = max(self.worst_period, actuation - last_actuation)
+
+                # NOTE: The first two periods span the loop startup, the first actuation may consume a sample queued while entering real-time mode.
+                if self.iterations > 2:
+                    self.jitter.record(int(abs(actuation - last_actuation - self.period) * 1e9))
+
+                # Deadline:
+                deadline = actuation + self.deadline
+
+                last_actuation = actuation
+
+            self.terminate()
 
         except KeyboardInterrupt:
-            self.calculator.terminate()
-            self.writer.write_pulse_modulation(0)
+            self.terminate()
 
             logger.info("[*] Execution halted by user.")
 
     def actuate(self) -> None:
         # Initialization:
+        self.telemetry.start()
+
+        if self.recorder is not None:
+            self.recorder.start()
+
         self.calculator.actuate()
 
         # Logic:
         self.loop()
 
 
+# Arguments:
+def parse_arguments() -> Namespace:
+    # Variables (Assignment):
+    # Parser:
+    parser: ArgumentParser = ArgumentParser(description="Runs the One-Step prosthetic knee joint.")
+
+    # Arguments:
+    parser.add_argument("--scheduler", choices=Joint.SCHEDULERS, default="event", help="Control loop scheduling mode.")
+    parser.add_argument("--rate", type=float, default=Joint.TARGET_RATE, help="Target actuation rate in hertz.")
+    parser.add_argument("--replay", default=None, help="Replay a CSV or session recording instead of reading the IMUs, GPIO writes are recorded.")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed multiplier (0 replays as fast as possible).")
+    parser.add_argument("--duration", type=float, default=None, help="Stop after the given amount of seconds.")
+    parser.add_argument("--profile", action="store_true", help="Collect per-stage latency histograms (reported on SIGUSR1 and at shutdown).")
+    parser.add_argument("--profile-output", default=None, help="Write the latency histograms summary to a JSON file at shutdown.")
+    parser.add_argument("--backend", choices=Joint.BACKENDS, default="native", help="GPIO writer backend (ignored when replaying).")
+    parser.add_argument("--registers", default=RegisterBackend.PATH, help="GPIO memory device, or a file standing in for it, of the register backend.")
+    parser.add_argument("--processes", action="store_true", help="Run acquisition, inference, and actuation as separate processes over shared memory.")
+    parser.add_argument("--cores", type=int, nargs=3, default=list(Runtime.CORES), help="Cores pinned to the acquisition, inference, and actuation processes.")
+    parser.add_argument("--record", default=None, help="Append every thigh and shank sample to a binary session file (see Recorder).")
+    parser.add_argument("--label", default=None, help="Label of the recorded samples, such as \"walking forward\" when collecting training data.")
+    parser.add_argument("--align", action="store_true", help="Pair thigh and shank samples on their device timestamps before calculating, and report skew and jitter.")
+    parser.add_argument("--realtime", action="store_true", help="Pin the control thread, request SCHED_FIFO, and disable the garbage collector in the control loop.")
+    parser.add_argument("--realtime-core", type=int, default=RealTime.CORE, help="Core the control thread is pinned to in real-time mode.")
+    parser.add_argument("--realtime-priority", type=int, default=RealTime.PRIORITY, help="SCHED_FIFO priority (1 to 99) of the control thread in real-time mode.")
+    parser.add_argument("--lookup", type=int, nargs="?", const=Calculator.LOOKUP_RESOLUTION, default=0, help="Map orientations to the pulse modulation through a table of the given resolution (default {}).".format(Calculator.LOOKUP_RESOLUTION))
+    parser.add_argument("--graph", default=None, help="JSON sensor graph of the IMUs and joints (see SensorGraph), the single knee by default.")
+    parser.add_argument("--learner", default=Joint.LEARNER_PATH, help="Learner predicting the gait state (.forest or .pkl).")
+    parser.add_argument("--unfused", action="store_true", help="Calculate and write through separate calls instead of the fused native step.")
+    parser.add_argument("--debug", action="store_true", help="Log every calculation and GPIO write on the control thread.")
+    parser.add_argument("--telemetry-every", type=int, default=1, help="Record every nth control loop iteration.")
+    parser.add_argument("--telemetry-rate", type=float, default=10.0, help="Maximum amount of telemetry records per second (0 for unlimited).")
+    parser.add_argument("--telemetry-output", default=None, help="Append the raw binary telemetry records to a file.")
+
+    # Variables (Assignment):
+    # Arguments:
+    arguments: Namespace = parser.parse_args()
+
+    # Validation:
+    # NOTE: The runtime processes step the fused writer on every sample (see Runtime), the single-process control loop options do not apply to them.
+    if arguments.processes:
+        # Variables (Assignment):
+        # Options:
+        options: List[str] = [option for option, given in (
+            ("--scheduler", arguments.scheduler != "event"),
+            ("--profile", arguments.profile),
+            ("--profile-output", arguments.profile_output is not None),
+            ("--realtime", arguments.realtime),
+            ("--realtime-core", arguments.realtime_core != RealTime.CORE),
+            ("--realtime-priority", arguments.realtime_priority != RealTime.PRIORITY),
+            ("--lookup", arguments.lookup != 0),
+            ("--unfused", arguments.unfused),
+        ) if given]
+
+        # Validation:
+        if options:
+            parser.error("{} cannot be combined with --processes.".format(", ".join(options)))
+
+        if not arguments.learner.endswith(".forest"):
+            parser.error("--processes needs a .forest learner (see tools.convert).")
+
+    # Logic:
+    return arguments
+
+
 # Main:
-joint: Joint = Joint()
-joint.actuate()
+if __name__ == "__main__":
+    # Variables (Assignment):
+    # Arguments:
+    arguments: Namespace = parse_arguments()
+
+    # Telemetry:
+    telemetry: Dict[str, Any] = {"sample_every": arguments.telemetry_every, "rate": arguments.telemetry_rate, "path": arguments.telemetry_output}
+
+    # Logic:
+    if arguments.processes:
+        # Variables (Assignment):
+        # Runtime:
+        runtime: Runtime = Runtime(
+            target_rate=arguments.rate, replay=arguments.replay, speed=arguments.speed, duration=arguments.duration, debug=arguments.debug,
+            telemetry=telemetry, backend=arguments.backend, registers=arguments.registers, cores=arguments.cores, record=arguments.record, label=arguments.label,
+            align=arguments.align, graph=arguments.graph, learner_path=arguments.learner
+        )
+        runtime.run()
+    else:
+        # Variables (Assignment):
+        # Joint:
+        joint: Joint = Joint(
+            scheduler=arguments.scheduler, target_rate=arguments.rate, replay=arguments.replay, speed=arguments.speed, duration=arguments.duration,
+            profile=arguments.profile or arguments.profile_output is not None, profile_path=arguments.profile_output, debug=arguments.debug, fused=not arguments.unfused,
+            backend=arguments.backend, registers=arguments.registers, telemetry=telemetry, record=arguments.record, label=arguments.label, align=arguments.align,
+            realtime=arguments.realtime, core=arguments.realtime_core, priority=arguments.realtime_priority, lookup_resolution=arguments.lookup, graph=arguments.graph,
+            learner_path=arguments.learner
+        )
+        joint.actuate()
@@ -4,6 +4,9 @@
 // Math:
 #include <math.h>
 
+// Library:
+#include "calculator-optimizations.h"
+
 // Methods:
 /**
     @brief Performs a dot product operation on two vectors.
@@ -151,8 +154,24 @@ float calculate_angle_between_quaternions(const float* quaternion_one, const flo
     return acosf(scalar) * (180.0f / M_PI);
 }
 
+/**
+    @brief Calculates the z component in degrees of the extrinsic xyz Euler angles of a unit [w, x, y, z] quaternion (the flexion axis).
+        * Matches scipy's as_euler("xyz")[2], which the quaternion mode has always reported as the flexion.
+        * Both terms are products of two components, so a quaternion and its negation give the same angle.
+
+    @param quaternion The unit quaternion describing the rotation.
+*/
+float calculate_flexion_component(const float* quaternion) {
+    return atan2f(
+        2.0f * (quaternion[0] * quaternion[3] + quaternion[1] * quaternion[2]),
+        1.0f - 2.0f * (quaternion[2] * quaternion[2] + quaternion[3] * quaternion[3])
+    ) * (180.0f / M_PI);
+}
+
 /**
     @brief Calculates the knee flexion angle using the thigh quaternion, shank quaternion, and the initial calibration offset.
+        * The flexion is the z Euler component of the relative rotation (see calculate_flexion_component), not its total angle,
+          so ab/adduction and axial rotation of the shank are left out.
 
     @param thigh_quaternion The quaternion pertaining to the thigh.
     @param shank_quaternion The quaternion pertaining to the shank.
@@ -167,11 +186,12 @@ float calculate_quaternion_flexion_angle(const float* thigh_quaternion, const fl
     float inverse_thigh[4];
 
     // Operations:
+    // NOTE: The shank rotation relative to the thigh (shank * thigh^-1), as in the original scipy implementation.
     invert_quaternion(thigh_quaternion, inverse_thigh);
-    multiply_quaternions(inverse_thigh, shank_quaternion, relative_rotation);
+    multiply_quaternions(shank_quaternion, inverse_thigh, relative_rotation);
 
     // Logic:
-    return clamp(0.0f, 2.0f * acosf(relative_rotation[0]) * (180.0f / M_PI) + calibration_offset, 180.0f);
+    return clamp(0.0f, calculate_flexion_component(relative_rotation) + calibration_offset, 180.0f);
 }
 
 /** 
@@ -189,11 +209,12 @@ float calibrate_quaternion_flexion(const float* thigh_quaternion, const float* s
     float inverse_thigh[4];
 
     // Operations:
+    // NOTE: The shank rotation relative to the thigh (shank * thigh^-1), as in the original scipy implementation.
     invert_quaternion(thigh_quaternion, inverse_thigh);
-    multiply_quaternions(inverse_thigh, shank_quaternion, relative_rotation);
+    multiply_quaternions(shank_quaternion, inverse_thigh, relative_rotation);
 
     // Logic:
-    return 2.0f * acosf(relative_rotation[0]) * (180.0f / M_PI);
+    return calculate_flexion_component(relative_rotation);
 }
 
 /**
@@ -210,3 +231,235 @@ float calibrate_flexion(const float* thigh_orientation, const float* shank_orien
     // Logic:
     return acosf(scalar) * (180.0f / M_PI);
 }
+
+/**
+    @brief Calculates the flexion angle and pulse modulation of a control loop step in a single call.
+
+    @param thigh_orientation The thigh gyroscopic vector.
+    @param shank_orientation The shank gyroscopic vector.
+    @param calibration_offset The initial calibration offset that will be taken into account during calculations.
+    @param stop Whether the step should stop the leg instead of writing the pulse modulation.
+    @param result The step results that will be modified in place.
+*/
+void calculate_step(const float* thigh_orientation, const float* shank_orientation, const float calibration_offset, const int stop, struct step_result* result) {
+    // Calculations:
+    // Flexion:
+    result->flexion = calculate_flexion_angle(thigh_orientation, shank_orientation, calibration_offset);
+
+    // Modulation:
+    result->modulation = calculate_pulse_modulation(result->flexion);
+
+    // Stopped:
+    result->stopped = stop;
+}
+
+/**
+    @brief Calculates the flexion angles of count thigh and shank orientation pairs, stored as contiguous count x 3 arrays.
+
+    @param thigh_orientations The thigh gyroscopic vectors.
+    @param shank_orientations The shank gyroscopic vectors.
+    @param count The amount of orientation pairs.
+    @param calibration_offset The initial calibration offset that will be taken into account during calculations.
+    @param flexions The count flexion angles that will be modified in place.
+*/
+void calculate_flexion_angles(const float* thigh_orientations, const float* shank_orientations, const int count, const float calibration_offset, float* flexions) {
+    // Logic:
+    for (int index = 0; index < count; index++) {
+        flexions[index] = calculate_flexion_angle(thigh_orientations + 3 * index, shank_orientations + 3 * index, calibration_offset);
+    }
+}
+
+/**
+    @brief Calculates the knee flexion angles of count thigh and shank quaternion pairs, stored as contiguous count x 4 arrays.
+
+    @param thigh_quaternions The quaternions pertaining to the thigh.
+    @param shank_quaternions The quaternions pertaining to the shank.
+    @param count The amount of quaternion pairs.
+    @param calibration_offset The initial calibration offset used in calculations.
+    @param flexions The count flexion angles that will be modified in place.
+*/
+void calculate_quaternion_flexion_angles(const float* thigh_quaternions, const float* shank_quaternions, const int count, const float calibration_offset, float* flexions) {
+    // Logic:
+    for (int index = 0; index < count; index++) {
+        flexions[index] = calculate_quaternion_flexion_angle(thigh_quaternions + 4 * index, shank_quaternions + 4 * index, calibration_offset);
+    }
+}
+
+/**
+    @brief Maps count angles in degrees to their pulse modulations.
+
+    @param angles The angles in degrees to be mapped to pulse modulations.
+    @param count The amount of angles.
+    @param modulations The count pulse modulations that will be modified in place.
+*/
+void calculate_pulse_modulations(const float* angles, const int count, unsigned char* modulations) {
+    // Logic:
+    // NOTE: The mapping and clamp of calculate_pulse_modulation written out without branches, so the compiler can vectorize the loop.
+    for (int index = 0; index < count; index++) {
+        // Variables (Assignment):
+        // Modulation:
+        const float modulation = 31.0f + ((angles[index] * (255.0f - 31.0f)) / 180.0f);
+
+        // Logic:
+        modulations[index] = (unsigned char) (int) (modulation < 31.0f ? 31.0f : (modulation > 255.0f ? 255.0f : modulation));
+    }
+}
+
+/**
+    @brief Calculates the angle of every joint of a sensor graph, from the orientations of all of its sensors in a single call.
+
+    @param orientations The gyroscopic vectors of every sensor, a contiguous sensors x 3 array.
+    @param proximal The sensor row of the proximal side (e.g. the thigh) of every joint.
+    @param distal The sensor row of the distal side (e.g. the shank) of every joint.
+    @param count The amount of joints.
+    @param calibration_offsets The initial calibration offset of every joint.
+    @param angles The count joint angles that will be modified in place.
+*/
+void calculate_joint_angles(const float* orientations, const int* proximal, const int* distal, const int count, const float* calibration_offsets, float* angles) {
+    // Logic:
+    for (int index = 0; index < count; index++) {
+        angles[index] = calculate_flexion_angle(orientations + 3 * proximal[index], orientations + 3 * distal[index], calibration_offsets[index]);
+    }
+}
+
+/**
+    @brief Calculates the angle of every joint of a sensor graph, from the quaternions of all of its sensors in a single call.
+
+    @param quaternions The quaternions of every sensor, a contiguous sensors x 4 array.
+    @param proximal The sensor row of the proximal side (e.g. the thigh) of every joint.
+    @param distal The sensor row of the distal side (e.g. the shank) of every joint.
+    @param count The amount of joints.
+    @param calibration_offsets The initial calibration offset of every joint.
+    @param angles The count joint angles that will be modified in place.
+*/
+void calculate_quaternion_joint_angles(const float* quaternions, const int* proximal, const int* distal, const int count, const float* calibration_offsets, float* angles) {
+    // Logic:
+    for (int index = 0; index < count; index++) {
+        angles[index] = calculate_quaternion_flexion_angle(quaternions + 4 * proximal[index], quaternions + 4 * distal[index], calibration_offsets[index]);
+    }
+}
+
+/**
+    @brief Fills a lookup table mapping the quantized orientation dot product straight to the pulse modulation.
+        * Entry i holds the pulse modulation of the dot product -1 + 2 * i / (resolution - 1), through the exact flexion path.
+        * Rounding the dot product to the nearest entry moves it by at most 1 / (resolution - 1), the flexion error peaks at the ends
+          of the range (acosf is steepest there) at acos(1 - 1 / (resolution - 1)) degrees.
+
+    @param table The resolution pulse modulations that will be modified in place.
+    @param resolution The amount of entries, at least two.
+    @param calibration_offset The initial calibration offset that will be taken into account during calculations.
+*/
+void build_modulation_table(unsigned char* table, const int resolution, const float calibration_offset) {
+    // Variables (Assignment):
+    // Orientations:
+    const float thigh_orientation[3] = {0.0f, 0.0f, 1.0f};
+
+    float shank_orientation[3] = {0.0f, 0.0f, 0.0f};
+
+    // Logic:
+    for (int index = 0; index < resolution; index++) {
+        // Variables (Assignment):
+        // Orientation:
+        // NOTE: Only the dot product with the thigh orientation matters, the z component holds it.
+        shank_orientation[2] = -1.0f + (2.0f * (float) index) / (float) (resolution - 1);
+
+        // Logic:
+        table[index] = (unsigned char) calculate_pulse_modulation(calculate_flexion_angle(thigh_orientation, shank_orientation, calibration_offset));
+    }
+}
+
+/**
+    @brief Maps the thigh and shank orientations to the pulse modulation through a table built by build_modulation_table.
+
+    @param thigh_orientation The thigh gyroscopic vector.
+    @param shank_orientation The shank gyroscopic vector.
+    @param table The pulse modulation table.
+    @param resolution The amount of entries of the table.
+*/
+int lookup_pulse_modulation(const float* thigh_orientation, const float* shank_orientation, const unsigned char* table, const int resolution) {
+    // Variables (Assignment):
+    // Scalar:
+    const float scalar = clamp(-1.0f, calculate_dot_product(thigh_orientation, shank_orientation), 1.0f);
+
+    // Logic:
+    return table[(int) ((scalar + 1.0f) * (0.5f * (float) (resolution - 1)) + 0.5f)];
+}
+
+/**
+    @brief Updates a gravity direction estimate with a complementary filter, fusing the gyroscope and the accelerometer.
+        * The gyroscope term rotates the previous estimate by the angular rotation over the interval (dg/dt = g x w).
+        * The accelerometer term pulls the estimate towards the measured acceleration with weight interval / (time_constant + interval).
+        * A non-positive interval (first sample, timestamp reset) or time constant resets the estimate to the measured acceleration.
+
+    @param orientation The unit gravity direction estimate that will be modified in place.
+    @param acceleration The measured acceleration.
+    @param angular_rotation The measured angular rotation in degrees per second.
+    @param interval The seconds elapsed since the previous sample.
+    @param time_constant The seconds over which the gyroscope is trusted before the accelerometer corrects it.
+*/
+void update_orientation(float* orientation, const float* acceleration, const float* angular_rotation, const float interval, const float time_constant) {
+    // Variables (Assignment):
+    // Magnitude:
+    const float magnitude = sqrtf(calculate_dot_product(acceleration, acceleration));
+
+    // Weight:
+    const float weight = (interval > 0.0f && time_constant > 0.0f) ? interval / (time_constant + interval) : 1.0f;
+
+    // Rotation:
+    const float scale = interval * (M_PI / 180.0f);
+
+    const float rotation[3] = {angular_rotation[0] * scale, angular_rotation[1] * scale, angular_rotation[2] * scale};
+
+    // Prediction:
+    float prediction[3] = {
+        orientation[0] + (orientation[1] * rotation[2] - orientation[2] * rotation[1]),
+        orientation[1] + (orientation[2] * rotation[0] - orientation[0] * rotation[2]),
+        orientation[2] + (orientation[0] * rotation[1] - orientation[1] * rotation[0]),
+    };
+
+    // Logic:
+    if (magnitude > 1e-6f) {
+        // Calculations:
+        // Correction:
+        prediction[0] += weight * (acceleration[0] / magnitude - prediction[0]);
+        prediction[1] += weight * (acceleration[1] / magnitude - prediction[1]);
+        prediction[2] += weight * (acceleration[2] / magnitude - prediction[2]);
+    }
+
+    // Variables (Assignment):
+    // Norm:
+    const float norm = sqrtf(calculate_dot_product(prediction, prediction));
+
+    // Logic:
+    if (norm > 1e-6f) {
+        // Calculations:
+        // Orientation:
+        orientation[0] = prediction[0] / norm;
+        orientation[1] = prediction[1] / norm;
+        orientation[2] = prediction[2] / norm;
+    }
+}
+
+/**
+    @brief Fuses count readings of one IMU into their orientations, applying update_orientation reading by reading.
+        * Readings are contiguous count x 6 rows of [acceleration..., angular_rotation...], like the calculator's samples.
+        * The estimate is carried from reading to reading and left at the last one, so consecutive chunks continue it.
+
+    @param orientation The unit gravity direction estimate that will be modified in place.
+    @param readings The count readings.
+    @param intervals The seconds elapsed before every reading, non-positive resets the estimate.
+    @param count The amount of readings.
+    @param time_constant The seconds over which the gyroscope is trusted before the accelerometer corrects it.
+    @param orientations The count x 3 orientations after every reading that will be modified in place.
+*/
+void fuse_orientations(float* orientation, const float* readings, const float* intervals, const int count, const float time_constant, float* orientations) {
+    // Logic:
+    for (int index = 0; index < count; index++) {
+        // Logic:
+        update_orientation(orientation, readings + 6 * index, readings + 6 * index + 3, intervals[index], time_constant);
+
+        orientations[3 * index + 0] = orientation[0];
+        orientations[3 * index + 1] = orientation[1];
+        orientations[3 * index + 2] = orientation[2];
+    }
+}
@@ -3,6 +3,20 @@
 #ifndef __CALCULATOR_OPTIMIZATIONS_H__
 #define __CALCULATOR_OPTIMIZATIONS_H__
 
+// Structures:
+/**
+    @brief Results of a single control loop step.
+
+    @param flexion The knee flexion angle in degrees.
+    @param modulation The pulse modulation mapped from the flexion angle.
+    @param stopped Whether the STOP pin was written instead of the pulse modulation.
+*/
+struct step_result {
+    float flexion;
+    int modulation;
+    int stopped;
+};
+
 // Definitions:
 float calculate_dot_product(const float* vector_one, const float* vector_two);
 float clamp(float minimum, float value, float maximum);
@@ -12,13 +26,29 @@ int calculate_pulse_modulation(float angle);
 float calculate_flexion_angle(const float* thigh_orientation, const float* shank_orientation, const float calibration_offset);
 float calibrate_flexion(const float* thigh_orientation, const float* shank_orientation);
 
+void update_orientation(float* orientation, const float* acceleration, const float* angular_rotation, const float interval, const float time_constant);
+void fuse_orientations(float* orientation, const float* readings, const float* intervals, const int count, const float time_constant, float* orientations);
+
 void multiply_quaternions(const float* quaternion_one, const float* quaternion_two, float* result); 
 void normalize_quaternion(float* quaternion);
 void invert_quaternion(const float* quaternion, float* result);
 
+float calculate_flexion_component(const float* quaternion);
 float calculate_angle_between_quaternions(const float* quaternion_one, const float* quaternion_two);
 float calculate_quaternion_flexion_angle(const float* thigh_quaternion, const float* shank_quaternion, const float calibration_offset);
 float calibrate_quaternion_flexion(const float* thigh_quaternion, const float* shank_quaternion);
 
+void calculate_flexion_angles(const float* thigh_orientations, const float* shank_orientations, const int count, const float calibration_offset, float* flexions);
+void calculate_quaternion_flexion_angles(const float* thigh_quaternions, const float* shank_quaternions, const int count, const float calibration_offset, float* flexions);
+void calculate_pulse_modulations(const float* angles, const int count, unsigned char* modulations);
+
+void calculate_joint_angles(const float* orientations, const int* proximal, const int* distal, const int count, const float* calibration_offsets, float* angles);
+void calculate_quaternion_joint_angles(const float* quaternions, const int* proximal, const int* distal, const int count, const float* calibration_offsets, float* angles);
+
+void build_modulation_table(unsigned char* table, const int resolution, const float calibration_offset);
+int lookup_pulse_modulation(const float* thigh_orientation, const float* shank_orientation, const unsigned char* table, const int resolution);
+
+void calculate_step(const float* thigh_orientation, const float* shank_orientation, const float calibration_offset, const int stop, struct step_result* result);
+
 // Header Guard:
 #endif // __CALCULATOR_OPTIMIZATIONS_H__
@@ -0,0 +1,147 @@
+// Written by: Christopher Gholmieh
+// Headers:
+
+// Library:
+#include "forest-optimizations.h"
+
+// Methods:
+/**
+    @brief Classifies a single window using a flattened random forest, mirroring RandomForestClassifier.predict.
+
+    @param features The feature index tested by each node.
+    @param thresholds The threshold tested by each node, a window value lower or equal to it descends to the left child.
+    @param left_children The absolute index of each node's left child, FOREST_LEAF for leaves.
+    @param right_children The absolute index of each node's right child, FOREST_LEAF for leaves.
+    @param values The class probabilities of each node, stored row-major as node_count x class_count.
+    @param roots The absolute index of each tree's root node.
+    @param tree_count The amount of trees in the forest.
+    @param class_count The amount of classes predicted by the forest.
+    @param window The window to be classified.
+    @param probabilities Scratch buffer of class_count doubles where the summed probabilities are accumulated.
+*/
+int predict_forest_window(const int* features, const double* thresholds, const int* left_children, const int* right_children, const double* values, const int* roots, const int tree_count, const int class_count, const float* window, double* probabilities) {
+    // Initialization:
+    for (int iteration = 0; iteration < class_count; iteration++) {
+        probabilities[iteration] = 0.0;
+    }
+
+    // Logic:
+    for (int tree = 0; tree < tree_count; tree++) {
+        // Variables (Assignment):
+        // Node:
+        int node = roots[tree];
+
+        // Traversal:
+        while (left_children[node] != FOREST_LEAF) {
+            node = ((double) window[features[node]] <= thresholds[node]) ? left_children[node] : right_children[node];
+        }
+
+        // Accumulation:
+        for (int iteration = 0; iteration < class_count; iteration++) {
+            probabilities[iteration] += values[node * class_count + iteration];
+        }
+    }
+
+    // Variables (Assignment):
+    // Prediction:
+    int prediction = 0;
+
+    // Logic:
+    for (int iteration = 1; iteration < class_count; iteration++) {
+        if (probabilities[iteration] > probabilities[prediction]) {
+            prediction = iteration;
+        }
+    }
+
+    return prediction;
+}
+
+/**
+    @brief Classifies a contiguous batch of windows using a flattened random forest.
+
+    @param features The feature index tested by each node.
+    @param thresholds The threshold tested by each node.
+    @param left_children The absolute index of each node's left child, FOREST_LEAF for leaves.
+    @param right_children The absolute index of each node's right child, FOREST_LEAF for leaves.
+    @param values The class probabilities of each node, stored row-major as node_count x class_count.
+    @param roots The absolute index of each tree's root node.
+    @param tree_count The amount of trees in the forest.
+    @param class_count The amount of classes predicted by the forest.
+    @param windows The windows to be classified, stored row-major as window_count x feature_count.
+    @param window_count The amount of windows to be classified.
+    @param feature_count The amount of features in each window.
+    @param probabilities Scratch buffer of class_count doubles.
+    @param predictions The resulting class indices, one per window.
+*/
+void predict_forest(const int* features, const double* thresholds, const int* left_children, const int* right_children, const double* values, const int* roots, const int tree_count, const int class_count, const float* windows, const int window_count, const int feature_count, double* probabilities, int* predictions) {
+    for (int iteration = 0; iteration < window_count; iteration++) {
+        predictions[iteration] = predict_forest_window(
+            features, thresholds, left_children, right_children, values, roots, tree_count, class_count, windows + (iteration * feature_count), probabilities
+        );
+    }
+}
+
+/**
+    @brief Classifies a single window, and returns the share of the summed class probabilities held by the predicted class.
+        * Used by the first stage of a cascade, which only decides when that share reaches its confidence threshold.
+
+    @param features The feature index tested by each node.
+    @param thresholds The threshold tested by each node.
+    @param left_children The absolute index of each node's left child, FOREST_LEAF for leaves.
+    @param right_children The absolute index of each node's right child, FOREST_LEAF for leaves.
+    @param values The class probabilities of each node, stored row-major as node_count x class_count.
+    @param roots The absolute index of each tree's root node.
+    @param tree_count The amount of trees in the forest.
+    @param class_count The amount of classes predicted by the forest.
+    @param window The window to be classified.
+    @param probabilities Scratch buffer of class_count doubles where the summed probabilities are accumulated.
+    @param prediction The resulting class index.
+*/
+double vote_forest_window(const int* features, const double* thresholds, const int* left_children, const int* right_children, const double* values, const int* roots, const int tree_count, const int class_count, const float* window, double* probabilities, int* prediction) {
+    // Variables (Assignment):
+    // Prediction:
+    *prediction = predict_forest_window(features, thresholds, left_children, right_children, values, roots, tree_count, class_count, window, probabilities);
+
+    // Total:
+    double total = 0.0;
+
+    // Logic:
+    for (int iteration = 0; iteration < class_count; iteration++) {
+        total += probabilities[iteration];
+    }
+
+    return (total > 0.0) ? probabilities[*prediction] / total : 0.0;
+}
+
+/**
+    @brief Classifies a single window through a cascade: the first stage decides alone when confident enough, the full forest otherwise.
+        * Both forests must predict the same classes in the same order.
+
+    @param stage The node tables of the first stage.
+    @param confidence The share of the summed class probabilities the first stage needs to decide alone.
+    @param forest The node tables of the full forest.
+    @param window The window to be classified.
+    @param probabilities Scratch buffer of class_count doubles.
+    @param decided Set to 1 when the first stage decided, 0 when the full forest did.
+*/
+int predict_cascade_window(const struct forest* stage, const double confidence, const struct forest* forest, const float* window, double* probabilities, int* decided) {
+    // Variables (Assignment):
+    // Prediction:
+    int prediction;
+
+    // Vote:
+    const double vote = vote_forest_window(
+        stage->features, stage->thresholds, stage->left_children, stage->right_children, stage->values, stage->roots, stage->tree_count, stage->class_count, window, probabilities, &prediction
+    );
+
+    // Logic:
+    *decided = (vote >= confidence);
+
+    if (*decided) {
+        return prediction;
+    }
+
+    return predict_forest_window(
+        forest->features, forest->thresholds, forest->left_children, forest->right_children, forest->values, forest->roots, forest->tree_count, forest->class_count, window, probabilities
+    );
+}
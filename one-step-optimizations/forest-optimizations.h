@@ -0,0 +1,33 @@
+// Written by: Christopher Gholmieh
+// Header Guards:
+#ifndef __FOREST_OPTIMIZATIONS_H__
+#define __FOREST_OPTIMIZATIONS_H__
+
+// Definitions:
+#define FOREST_LEAF -1
+
+// Structures:
+struct forest {
+    const int* features;
+    const double* thresholds;
+
+    const int* left_children;
+    const int* right_children;
+
+    const double* values;
+    const int* roots;
+
+    int tree_count;
+    int class_count;
+};
+
+int predict_forest_window(const int* features, const double* thresholds, const int* left_children, const int* right_children, const double* values, const int* roots, const int tree_count, const int class_count, const float* window, double* probabilities);
+
+void predict_forest(const int* features, const double* thresholds, const int* left_children, const int* right_children, const double* values, const int* roots, const int tree_count, const int class_count, const float* windows, const int window_count, const int feature_count, double* probabilities, int* predictions);
+
+double vote_forest_window(const int* features, const double* thresholds, const int* left_children, const int* right_children, const double* values, const int* roots, const int tree_count, const int class_count, const float* window, double* probabilities, int* prediction);
+
+int predict_cascade_window(const struct forest* stage, const double confidence, const struct forest* forest, const float* window, double* probabilities, int* decided);
+
+// Header Guard:
+#endif // __FOREST_OPTIMIZATIONS_H__
@@ -0,0 +1,229 @@
+// Written by: Christopher Gholmieh
+// Imports:
+
+// Standard:
+#include <stdio.h>
+#include <stdint.h>
+#include <string.h>
+#include <errno.h>
+
+// System:
+#include <fcntl.h>
+#include <unistd.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+
+// Library:
+#include "one-step-registers.h"
+
+
+// Constants:
+// Pins (most significant bit of the pulse modulation first, like the wiringPi writer):
+static const int pins[] = {14, 15, 18, 23, 24, 25, 8, 7};
+
+// Variables (Assignment):
+// Registers:
+static volatile uint32_t* registers = NULL;
+
+// Descriptor:
+static int descriptor = -1;
+
+// State:
+static uint32_t state = 0;
+
+// Masks:
+static uint32_t masks[256];
+
+
+// Methods:
+/**
+    @brief Maps the GPIO block and configures the modulation pins and the STOP pin as outputs, driven low.
+        * The path is /dev/gpiomem on the Raspberry Pi, or any regular file used as a stand-in on other machines.
+        * Regular files are extended to the size of the GPIO block, the set and clear registers then hold the last written masks.
+        * NOTE: The path is never created, a missing device (or stand-in) fails instead of silently mapping a new file.
+
+    @param path The path of the GPIO memory device or of the stand-in file.
+*/
+int initialize_registers(const char* path) {
+    // Variables (Assignment):
+    // Status:
+    struct stat status;
+
+    // Descriptor:
+    descriptor = open(path, O_RDWR | O_SYNC);
+
+    if (descriptor < 0) {
+        fprintf(stderr, "[!] Failed to open GPIO registers at %s: %s.\n", path, strerror(errno));
+
+        return -1;
+    }
+
+    // Logic:
+    if (fstat(descriptor, &status) == 0 && S_ISREG(status.st_mode) && status.st_size < REGISTERS_BLOCK_SIZE) {
+        if (ftruncate(descriptor, REGISTERS_BLOCK_SIZE) != 0) {
+            fprintf(stderr, "[!] Failed to extend GPIO register stand-in %s.\n", path);
+
+            close(descriptor);
+            descriptor = -1;
+
+            return -1;
+        }
+    }
+
+    // Registers:
+    void* block = mmap(NULL, REGISTERS_BLOCK_SIZE, PROT_READ | PROT_WRITE, MAP_SHARED, descriptor, 0);
+
+    if (block == MAP_FAILED) {
+        fprintf(stderr, "[!] Failed to map GPIO registers at %s.\n", path);
+
+        close(descriptor);
+        descriptor = -1;
+
+        return -1;
+    }
+
+    registers = (volatile uint32_t*) block;
+
+    // Masks:
+    for (int modulation = 0; modulation < 256; modulation++) {
+        masks[modulation] = 0;
+
+        for (int iteration = 0; iteration < 8; iteration++) {
+            if ((modulation >> (7 - iteration)) & 1) {
+                masks[modulation] |= (uint32_t) 1 << pins[iteration];
+            }
+        }
+    }
+
+    // Outputs:
+    for (int iteration = 0; iteration < 9; iteration++) {
+        // Variables (Assignment):
+        // Pin:
+        const int pin = (iteration < 8) ? pins[iteration] : REGISTERS_STOP_PIN;
+
+        // Shift:
+        const int shift = (pin % 10) * 3;
+
+        // Logic:
+        registers[REGISTERS_FUNCTION_SELECT + pin / 10] = (registers[REGISTERS_FUNCTION_SELECT + pin / 10] & ~((uint32_t) 7 << shift)) | ((uint32_t) 1 << shift);
+    }
+
+    // State:
+    registers[REGISTERS_CLEAR] = masks[255] | ((uint32_t) 1 << REGISTERS_STOP_PIN);
+
+    state = 0;
+
+    return 0;
+}
+
+/**
+    @brief Unmaps the GPIO block and closes its descriptor.
+*/
+void terminate_registers() {
+    // Logic:
+    if (registers != NULL) {
+        munmap((void*) registers, REGISTERS_BLOCK_SIZE);
+
+        registers = NULL;
+    }
+
+    if (descriptor >= 0) {
+        close(descriptor);
+
+        descriptor = -1;
+    }
+}
+
+/**
+    @brief Maps a pulse modulation to the mask of the pins that should be driven high.
+
+    @param pulse_modulation The pulse modulation, only its lowest byte is written.
+*/
+uint32_t calculate_pulse_modulation_mask(int pulse_modulation) {
+    return masks[pulse_modulation & 0xFF];
+}
+
+/**
+    @brief Drives exactly the pins of a mask high and the other output pins low.
+        * Only pins whose value changes are touched: one write to the set register and/or one to the clear register.
+        * Returns the amount of register writes performed (0 when the pins already hold the mask).
+
+    @param mask The pins that should be driven high.
+*/
+int write_registers(uint32_t mask) {
+    // Variables (Assignment):
+    // Changed:
+    const uint32_t changed = mask ^ state;
+
+    // Writes:
+    int writes = 0;
+
+    // Logic:
+    if (changed & mask) {
+        registers[REGISTERS_SET] = changed & mask;
+
+        writes++;
+    }
+
+    if (changed & state) {
+        registers[REGISTERS_CLEAR] = changed & state;
+
+        writes++;
+    }
+
+    state = mask;
+
+    return writes;
+}
+
+/**
+    @brief Writes a pulse modulation to the eight modulation pins and drives the STOP pin low.
+
+    @param pulse_modulation The pulse modulation to be written.
+*/
+int write_register_pulse_modulation(int pulse_modulation) {
+    return write_registers(masks[pulse_modulation & 0xFF]);
+}
+
+/**
+    @brief Drives the eight modulation pins low, then the STOP pin high.
+        * Unlike write_registers, both registers are always written, stopping never relies on the tracked state.
+        * Returns the amount of register writes performed (always 2).
+*/
+int write_register_stop_pin() {
+    // Logic:
+    registers[REGISTERS_CLEAR] = masks[255];
+    registers[REGISTERS_SET] = (uint32_t) 1 << REGISTERS_STOP_PIN;
+
+    state = (uint32_t) 1 << REGISTERS_STOP_PIN;
+
+    return 2;
+}
+
+/**
+    @brief Returns the mask of the output pins currently driven high.
+*/
+uint32_t get_register_state() {
+    return state;
+}
+
+/**
+    @brief Calculates the flexion angle and pulse modulation, then writes them through the GPIO registers in a single call.
+
+    @param thigh_orientation The thigh gyroscopic vector.
+    @param shank_orientation The shank gyroscopic vector.
+    @param calibration_offset The initial calibration offset that will be taken into account during calculations.
+    @param stop Whether the step should stop the leg instead of writing the pulse modulation.
+    @param result The step results that will be modified in place.
+*/
+void register_step(const float* thigh_orientation, const float* shank_orientation, const float calibration_offset, const int stop, struct step_result* result) {
+    // Calculations:
+    calculate_step(thigh_orientation, shank_orientation, calibration_offset, stop, result);
+
+    // Logic:
+    if (stop) {
+        write_register_stop_pin();
+    } else {
+        write_register_pulse_modulation(result->modulation);
+    }
+}
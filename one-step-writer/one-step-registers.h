@@ -0,0 +1,37 @@
+// Written by: Christopher Gholmieh
+// Guards:
+#ifndef __ONE_STEP_REGISTERS_H__
+#define __ONE_STEP_REGISTERS_H__
+
+// Standard:
+#include <stdint.h>
+
+// Calculator:
+#include "../one-step-optimizations/calculator-optimizations.h"
+
+// Definitions:
+#define REGISTERS_STOP_PIN 12
+
+#define REGISTERS_BLOCK_SIZE 4096
+
+// Registers (32-bit word offsets within the BCM283x/BCM2711 GPIO block):
+#define REGISTERS_FUNCTION_SELECT 0
+#define REGISTERS_SET 7
+#define REGISTERS_CLEAR 10
+
+// Methods:
+int initialize_registers(const char* path);
+void terminate_registers();
+
+uint32_t calculate_pulse_modulation_mask(int pulse_modulation);
+
+int write_registers(uint32_t mask);
+int write_register_pulse_modulation(int pulse_modulation);
+int write_register_stop_pin();
+
+uint32_t get_register_state();
+
+void register_step(const float* thigh_orientation, const float* shank_orientation, const float calibration_offset, const int stop, struct step_result* result);
+
+// Guard:
+#endif // __ONE_STEP_REGISTERS_H__
@@ -40,54 +40,50 @@ void initialize_pins() {
 
     pinMode(STOP_PIN, OUTPUT);
     pullUpDnControl(STOP_PIN, PUD_DOWN);
-}
-
-char* number_to_binary(unsigned char number) {
-    // Variables (Assignment):
-    // Binary:
-    char* binary = (char*) malloc(sizeof(char) * 9);
-
-    if (binary == NULL) {
-        fprintf(stderr, "%s", "[!] Failed to allocate memory for binary.\n");
-    }
 
     // Logic:
-    for (int iteration = 7; iteration >= 0; iteration--) {
-        binary[7 - iteration] = ((number >> iteration) & 1) ? '1' : '0';
+    // NOTE: Driven low unconditionally, so the tracked status matches the pins whatever an earlier process left them at.
+    for (int iteration = 0; iteration < 8; iteration++) {
+        digitalWrite(pins[iteration], LOW);
+        status[iteration] = 0;
     }
-
-    binary[8] = '\0';
-
-    return binary;
 }
 
 void write_pulse_modulation(int pulse_modulation) {
-    // Variables (Assignment):
-    // Binary:
-    char* binary = number_to_binary((unsigned char) pulse_modulation);
-
     // Logic:
     digitalWrite(STOP_PIN, LOW);
 
     for (int iteration = 7; iteration >= 0; iteration--) {
-        if (binary[iteration] == '1' && status[iteration] == 0) {
-            digitalWrite(pins[iteration], HIGH);
-            status[iteration] = 1;
-
-            continue;
-        } else if (binary[iteration] == '0' && status[iteration] == 1) {
-            digitalWrite(pins[iteration], LOW);
-            status[iteration] = 0;
+        // Variables (Assignment):
+        // Bit:
+        const int bit = (pulse_modulation >> (7 - iteration)) & 1;
+
+        // Logic:
+        if (bit != status[iteration]) {
+            digitalWrite(pins[iteration], bit ? HIGH : LOW);
+            status[iteration] = bit;
         }
     }
-
-    free(binary);
 }
 
 void write_stop_pin() {
+    // NOTE: Every pin is driven low regardless of the tracked status, stopping never relies on it.
     for (int iteration = 0; iteration < 8; iteration++) {
         digitalWrite(pins[iteration], LOW);
+        status[iteration] = 0;
     }
 
     digitalWrite(STOP_PIN, HIGH);
 }
+
+void step(const float* thigh_orientation, const float* shank_orientation, const float calibration_offset, const int stop, struct step_result* result) {
+    // Calculations:
+    calculate_step(thigh_orientation, shank_orientation, calibration_offset, stop, result);
+
+    // Logic:
+    if (stop) {
+        write_stop_pin();
+    } else {
+        write_pulse_modulation(result->modulation);
+    }
+}
@@ -3,6 +3,9 @@
 #ifndef __ONE_STEP_WRITER_H__
 #define __ONE_STEP_WRITER_H__
 
+// Calculator:
+#include "../one-step-optimizations/calculator-optimizations.h"
+
 // Definitions:
 #define STOP_PIN 12
 
@@ -10,10 +13,10 @@
 void initialize_optimizations();
 void initialize_pins();
 
-char* number_to_binary(unsigned char number);
-
 void write_pulse_modulation(int pulse_modulation);
 void write_stop_pin();
 
+void step(const float* thigh_orientation, const float* shank_orientation, const float calibration_offset, const int stop, struct step_result* result);
+
 // Guard:
 #endif // __ONE_STEP_WRITER_H__
@@ -0,0 +1,2 @@
+# Written by: Christopher Gholmieh
+# Tools:
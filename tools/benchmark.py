@@ -0,0 +1,337 @@
+# Written by: Christopher Gholmieh
+# Imports:
+
+# Components:
+from components.calculator import Calculator, ReplaySpatial, SensorGraph
+from components.learner import Learner
+from components.learner.features import FeatureExtractor
+from components.recorder import Recorder
+from components.writer import Writer, RegisterBackend, RecordingBackend, Step
+
+# Typing:
+from typing import Callable, Dict, List, Tuple, Any
+
+# Loguru:
+from loguru import logger
+
+# Argparse:
+from argparse import ArgumentParser, Namespace
+
+# Timeit:
+from timeit import Timer
+
+# Math:
+from math import degrees, acos, atan2
+
+# Platform:
+import platform
+
+# CTypes:
+import ctypes
+
+# Tempfile:
+from tempfile import NamedTemporaryFile
+
+# JSON:
+import json
+
+# System:
+import sys
+
+# Numpy:
+import numpy
+
+
+# Constants:
+DATA_PATH: str = "./data/static-data.csv"
+
+BATCH_SIZE: int = 4096
+
+FOREST_PATH: str = "./learners/one-step-learner.forest"
+
+
+# Reference:
+def clamp(minimum: float, value: float, maximum: float) -> float:
+    return max(minimum, min(value, maximum))
+
+
+def calculate_pulse_modulation(angle: float) -> int:
+    return int(clamp(31.0, 31.0 + (angle * (255.0 - 31.0)) / 180.0, 255.0))
+
+
+def calculate_flexion_angle(thigh_orientation: List[float], shank_orientation: List[float], calibration_offset: float) -> float:
+    # Variables (Assignment):
+    # Scalar:
+    scalar: float = clamp(-1.0, sum(thigh * shank for thigh, shank in zip(thigh_orientation, shank_orientation)), 1.0)
+
+    # Logic:
+    return clamp(0.0, degrees(acos(scalar)) + calibration_offset, 180.0)
+
+
+def calculate_flexion_angle_numpy(thigh_orientation: numpy.ndarray, shank_orientation: numpy.ndarray, calibration_offset: float) -> float:
+    return float(numpy.clip(numpy.degrees(numpy.arccos(numpy.clip(numpy.dot(thigh_orientation, shank_orientation), -1.0, 1.0))) + calibration_offset, 0.0, 180.0))
+
+
+def calculate_quaternion_flexion_angle(thigh_quaternion: List[float], shank_quaternion: List[float], calibration_offset: float) -> float:
+    # Variables (Assignment):
+    # Components:
+    w1, x1, y1, z1 = shank_quaternion
+    w2, x2, y2, z2 = thigh_quaternion[0], -thigh_quaternion[1], -thigh_quaternion[2], -thigh_quaternion[3]
+
+    # Relative:
+    w: float = w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2
+    x: float = w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2
+    y: float = w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2
+    z: float = w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2
+
+    # Logic:
+    return clamp(0.0, degrees(atan2(2.0 * (w * z + x * y), 1.0 - 2.0 * (y * y + z * z))) + calibration_offset, 180.0)
+
+
+# Benchmarks:
+def build_benchmarks() -> List[Tuple[str, Callable[[], Any]]]:
+    """
+    * Returns (name, callable) pairs, names are "<function>/<implementation>".
+        * "c" benchmarks include the ctypes marshalling the calculator performs on every call.
+        * "c-preallocated" benchmarks pass arrays built once, isolating the cost of the C function itself.
+        * "iteration" benchmarks compare separate flexion, modulation, and write calls to the fused step (recording backend).
+        * "iteration-native" benchmarks compare the ctypes round-trips alone, without the python write of the recording backend.
+    """
+
+    # Variables (Assignment):
+    # Graph:
+    # NOTE: Both legs (hips, knees, and ankles) over seven IMUs, calculate_joints covers all six joints in one call.
+    legs: SensorGraph = SensorGraph(
+        {"pelvis": 0, "left_thigh": 1, "left_shank": 2, "left_foot": 3, "right_thigh": 4, "right_shank": 5, "right_foot": 6},
+        {
+            "left_knee": ["left_thigh", "left_shank"], "right_knee": ["right_thigh", "right_shank"],
+            "left_hip": ["pelvis", "left_thigh"], "right_hip": ["pelvis", "right_thigh"],
+            "left_ankle": ["left_shank", "left_foot"], "right_ankle": ["right_shank", "right_foot"],
+        }
+    )
+
+    # Calculators:
+    calculator: Calculator = Calculator(use_quaternions=False, spatial_factory=lambda: ReplaySpatial(DATA_PATH), lookup_resolution=Calculator.LOOKUP_RESOLUTION)
+    quaternion_calculator: Calculator = Calculator(use_quaternions=True, spatial_factory=lambda: ReplaySpatial(DATA_PATH))
+    legs_calculator: Calculator = Calculator(use_quaternions=False, spatial_factory=lambda: ReplaySpatial(DATA_PATH), graph=legs)
+
+    for instance in (calculator, quaternion_calculator, legs_calculator):
+        instance.actuated = True
+
+    # Library:
+    library: ctypes.CDLL = calculator.library
+
+    # Orientations:
+    thigh_orientation: numpy.ndarray = numpy.array([0.1, 0.2, 0.97]) / numpy.linalg.norm([0.1, 0.2, 0.97])
+    shank_orientation: numpy.ndarray = numpy.array([0.4, -0.1, 0.9]) / numpy.linalg.norm([0.4, -0.1, 0.9])
+
+    calculator.thigh_orientation[:], calculator.shank_orientation[:] = thigh_orientation, shank_orientation
+
+    # Quaternions:
+    thigh_quaternion: numpy.ndarray = numpy.array([0.98, 0.1, 0.15, 0.05]) / numpy.linalg.norm([0.98, 0.1, 0.15, 0.05])
+    shank_quaternion: numpy.ndarray = numpy.array([0.85, 0.4, 0.2, 0.1]) / numpy.linalg.norm([0.85, 0.4, 0.2, 0.1])
+
+    quaternion_calculator.thigh_quaternion[:], quaternion_calculator.shank_quaternion[:] = thigh_quaternion, shank_quaternion
+
+    # Sample:
+    acceleration, angular_rotation = [0.1, 0.2, 0.97], [12.0, -4.0, 30.0]
+
+    # Preallocated:
+    thigh_array = (ctypes.c_float * 3)(*thigh_orientation)
+    shank_array = (ctypes.c_float * 3)(*shank_orientation)
+
+    thigh_quaternion_array = (ctypes.c_float * 4)(*thigh_quaternion)
+    shank_quaternion_array = (ctypes.c_float * 4)(*shank_quaternion)
+
+    # Lists:
+    thigh_list, shank_list = thigh_orientation.tolist(), shank_orientation.tolist()
+    thigh_quaternion_list, shank_quaternion_list = thigh_quaternion.tolist(), shank_quaternion.tolist()
+
+    # Batches:
+    # NOTE: BATCH_SIZE rows per call, divide the per-call time by BATCH_SIZE for the per-row cost.
+    thigh_orientations: numpy.ndarray = numpy.tile(thigh_orientation.astype(numpy.float32), (BATCH_SIZE, 1))
+    shank_orientations: numpy.ndarray = numpy.tile(shank_orientation.astype(numpy.float32), (BATCH_SIZE, 1))
+
+    thigh_quaternions: numpy.ndarray = numpy.tile(thigh_quaternion.astype(numpy.float32), (BATCH_SIZE, 1))
+    shank_quaternions: numpy.ndarray = numpy.tile(shank_quaternion.astype(numpy.float32), (BATCH_SIZE, 1))
+
+    flexions: numpy.ndarray = numpy.zeros(BATCH_SIZE, dtype=numpy.float32)
+
+    readings: numpy.ndarray = numpy.tile(numpy.asarray(acceleration + angular_rotation, dtype=numpy.float32), (BATCH_SIZE, 1))
+    intervals: numpy.ndarray = numpy.full(BATCH_SIZE, 0.016, dtype=numpy.float32)
+    fused: numpy.ndarray = numpy.zeros((BATCH_SIZE, 3), dtype=numpy.float32)
+    modulations: numpy.ndarray = numpy.zeros(BATCH_SIZE, dtype=numpy.uint8)
+
+    # Learner:
+    learner: Learner = Learner(learner_path=FOREST_PATH)
+    learner.load()
+
+    # Writer:
+    writer: Writer = Writer(backend=RecordingBackend())
+
+    # Registers:
+    # NOTE: The mapping outlives the stand-in file once it is deleted.
+    with NamedTemporaryFile(suffix=".gpiomem") as registers:
+        register_backend: RegisterBackend = RegisterBackend(path=registers.name)
+
+    # Step:
+    step: Step = Step(ctypes.CDLL("./one-step-optimizations/calculator-optimizations.so").calculate_step)
+
+    # Window:
+    window: numpy.ndarray = numpy.asarray(ReplaySpatial.read(DATA_PATH)[:3], dtype=numpy.float32)
+
+    # Recorder:
+    # NOTE: Never started, the benchmark only measures the copy into the ring buffer performed on the handler threads.
+    with NamedTemporaryFile(suffix=Recorder.EXTENSION) as session:
+        recorder: Recorder = Recorder(session.name)
+
+    # Features:
+    extractor: FeatureExtractor = FeatureExtractor()
+    features: numpy.ndarray = numpy.zeros(FeatureExtractor.SIZE, dtype=numpy.float32)
+
+    # NOTE: The handlers encode outside the calculator condition, only push holds it.
+    quantized: List[int] = extractor.encode(acceleration, angular_rotation)
+
+    # Logic:
+    benchmarks: List[Tuple[str, Callable[[], Any]]] = [
+        # Clamp:
+        ("clamp/c", lambda: library.clamp(0.0, 200.0, 180.0)),
+        ("clamp/python", lambda: clamp(0.0, 200.0, 180.0)),
+
+        # Modulation:
+        ("calculate_pulse_modulation/c", lambda: library.calculate_pulse_modulation(90.0)),
+        ("calculate_pulse_modulation/python", lambda: calculate_pulse_modulation(90.0)),
+
+        # Flexion:
+        ("calculate_flexion_angle/c", lambda: library.calculate_flexion_angle((ctypes.c_float * 3)(*thigh_orientation), (ctypes.c_float * 3)(*shank_orientation), 0.0)),
+        ("calculate_flexion_angle/c-preallocated", lambda: library.calculate_flexion_angle(thigh_array, shank_array, 0.0)),
+        ("calculate_flexion_angle/numpy", lambda: calculate_flexion_angle_numpy(thigh_orientation, shank_orientation, 0.0)),
+        ("calculate_flexion_angle/python", lambda: calculate_flexion_angle(thigh_list, shank_list, 0.0)),
+
+        # Quaternions:
+        ("calculate_quaternion_flexion_angle/c", lambda: library.calculate_quaternion_flexion_angle((ctypes.c_float * 4)(*thigh_quaternion), (ctypes.c_float * 4)(*shank_quaternion), 0.0)),
+        ("calculate_quaternion_flexion_angle/c-preallocated", lambda: library.calculate_quaternion_flexion_angle(thigh_quaternion_array, shank_quaternion_array, 0.0)),
+        ("calculate_quaternion_flexion_angle/python", lambda: calculate_quaternion_flexion_angle(thigh_quaternion_list, shank_quaternion_list, 0.0)),
+
+        # Batches:
+        ("Calculator.fuse_orientations/batch-{}".format(BATCH_SIZE), lambda: calculator.fuse_orientations(readings, intervals, calculator.thigh_orientation, fused)),
+        ("Calculator.calculate_flexion_angles/batch-{}".format(BATCH_SIZE), lambda: calculator.calculate_flexion_angles(thigh_orientations, shank_orientations, output=flexions)),
+        ("Calculator.calculate_quaternion_flexion_angles/batch-{}".format(BATCH_SIZE), lambda: quaternion_calculator.calculate_quaternion_flexion_angles(thigh_quaternions, shank_quaternions, output=flexions)),
+        ("Calculator.calculate_pulse_modulations/batch-{}".format(BATCH_SIZE), lambda: calculator.calculate_pulse_modulations(flexions, output=modulations)),
+
+        # Fusion:
+        ("update_orientation/c-preallocated", lambda: library.update_orientation(calculator.thigh_pointer, *calculator.thigh_sample_pointers, 0.016, 0.5)),
+
+        # Calculator:
+        ("Calculator.handle_imu/acceleration", lambda: calculator.handle_imu(calculator.thigh_index, None, acceleration, angular_rotation, [0.0, 0.0, 0.0], 0.0)),
+        ("Calculator.calculate/acceleration", calculator.calculate),
+        ("Calculator.calculate_joints/knee", calculator.calculate_joints),
+        ("Calculator.calculate_joints/legs-{}".format(len(legs.joints)), legs_calculator.calculate_joints),
+        ("Calculator.calculate/quaternion", quaternion_calculator.calculate),
+        ("Calculator.lookup_pulse_modulation/acceleration", calculator.lookup_pulse_modulation),
+
+        # Iteration:
+        ("iteration/separate", lambda: writer.write_pulse_modulation(calculator.calculate_pulse_modulation(calculator.calculate()))),
+        ("iteration/fused", lambda: calculator.step(writer, False)),
+        ("iteration-native/separate", lambda: library.calculate_pulse_modulation(library.calculate_flexion_angle(calculator.thigh_pointer, calculator.shank_pointer, 0.0))),
+        ("iteration-native/lookup", lambda: calculator.lookup(*calculator.lookup_arguments)),
+        ("iteration-native/fused", lambda: step(calculator.thigh_pointer, calculator.shank_pointer, 0.0, False)),
+        ("iteration-register/fused", lambda: register_backend.step(calculator.thigh_pointer, calculator.shank_pointer, 0.0, False)),
+
+        # Registers:
+        ("write_pulse_modulation/register", lambda: register_backend.write_pulse_modulation(0xA5 if register_backend.state() == 0 else 0)),
+
+        # Recorder:
+        ("Recorder.record/python", lambda: recorder.record(Recorder.row(recorder.sensors, Recorder.SHANK), acceleration, angular_rotation, [0.0, 0.0, 0.0], 0.0)),
+
+        # Features:
+        ("FeatureExtractor.update/python", lambda: extractor.update(acceleration, angular_rotation)),
+        ("FeatureExtractor.encode/python", lambda: extractor.encode(acceleration, angular_rotation)),
+        ("FeatureExtractor.push/python", lambda: extractor.push(quantized)),
+        ("FeatureExtractor.values/python", lambda: extractor.values(features)),
+
+        # Learner:
+        ("Learner.predict/" + ("compiled" if learner.forest.library is not None else "numpy"), lambda: learner.predict(window)),
+    ]
+
+    return benchmarks
+
+
+def run(benchmarks: List[Tuple[str, Callable[[], Any]]], repeat: int, minimum_time: float) -> Dict[str, float]:
+    """
+    * Times every benchmark, returning the best per-call time in microseconds over the repeats.
+    """
+
+    # Variables (Assignment):
+    # Results:
+    results: Dict[str, float] = {}
+
+    # Logic:
+    for name, function in benchmarks:
+        # Variables (Assignment):
+        # Timer:
+        timer: Timer = Timer(function)
+
+        # Number:
+        number, _ = timer.autorange()
+        number = max(1, int(number * minimum_time / 0.2))
+
+        # Logic:
+        results[name] = min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+        logger.info("[*] {:<52} {:>10.3f} us".format(name, results[name]))
+
+    return results
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], tolerance: float) -> List[str]:
+    # Logic:
+    return [
+        name for name, microseconds in results.items() if name in baseline and microseconds > baseline[name] * (1.0 + tolerance)
+    ]
+
+
+# Main:
+if __name__ == "__main__":
+    # Variables (Assignment):
+    # Parser:
+    parser: ArgumentParser = ArgumentParser(description="Benchmarks the C bindings against numpy and pure python implementations.")
+
+    # Arguments:
+    parser.add_argument("--output", default=None, help="Write the results to a JSON file.")
+    parser.add_argument("--baseline", default=None, help="JSON results of a previous run to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown relative to the baseline (0.25 = 25%%).")
+    parser.add_argument("--repeat", type=int, default=5, help="Amount of timing repeats, the best one is kept.")
+    parser.add_argument("--minimum-time", type=float, default=0.2, help="Minimum seconds spent per repeat.")
+    parser.add_argument("--filter", default=None, help="Only run benchmarks containing this substring.")
+
+    # Arguments:
+    arguments: Namespace = parser.parse_args()
+
+    # Variables (Assignment):
+    # Benchmarks:
+    benchmarks: List[Tuple[str, Callable[[], Any]]] = [
+        (name, function) for name, function in build_benchmarks() if arguments.filter is None or arguments.filter in name
+    ]
+
+    # Results:
+    results: Dict[str, float] = run(benchmarks, arguments.repeat, arguments.minimum_time)
+
+    # Logic:
+    if arguments.output is not None:
+        with open(arguments.output, "w") as file:
+            json.dump({
+                "machine": platform.machine(), "python": platform.python_version(), "unit": "microseconds", "results": results
+            }, file, indent=4)
+
+    if arguments.baseline is not None:
+        with open(arguments.baseline) as file:
+            # Variables (Assignment):
+            # Regressions:
+            regressions: List[str] = compare(results, json.load(file)["results"], arguments.tolerance)
+
+        # Logic:
+        for name in regressions:
+            logger.error("[!] Regression: {}".format(name))
+
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,45 @@
+# Written by: Christopher Gholmieh
+# Imports:
+
+# Components:
+from components.learner import Learner
+
+# Loguru:
+from loguru import logger
+
+# Argparse:
+from argparse import ArgumentParser, Namespace
+
+
+# Methods:
+def convert(learner_path: str, forest_path: str) -> None:
+    """
+    * Converts a joblib learner and its encoder (.pkl pair) into a single memory-mappable .forest file.
+    """
+
+    # Variables (Assignment):
+    # Learner:
+    learner: Learner = Learner(learner_path=learner_path)
+    learner.load()
+
+    # Logic:
+    learner.forest.save(forest_path)
+
+    logger.info("[*] Converted {} to {}.".format(learner_path, forest_path))
+
+
+# Main:
+if __name__ == "__main__":
+    # Variables (Assignment):
+    # Parser:
+    parser: ArgumentParser = ArgumentParser(description="Converts .pkl learners into the .forest format.")
+
+    # Arguments:
+    parser.add_argument("--learner", default="./learners/one-step-learner.pkl", help="Path to the .pkl learner, the encoder is expected next to it.")
+    parser.add_argument("--output", default=None, help="Path to the .forest file (defaults to the learner path with a .forest extension).")
+
+    # Arguments:
+    arguments: Namespace = parser.parse_args()
+
+    # Logic:
+    convert(arguments.learner, arguments.output or arguments.learner.replace(".pkl", ".forest"))
@@ -0,0 +1,71 @@
+# Written by: Christopher Gholmieh
+# Imports:
+
+# Joint:
+from joint import Joint
+
+# Components:
+from components.runtime import RealTime
+
+# Typing:
+from typing import Dict, List, Tuple
+
+# Loguru:
+from loguru import logger
+
+# Argparse:
+from argparse import ArgumentParser, Namespace
+
+# JSON:
+import json
+
+
+# Methods:
+def measure_jitter(replay: str, duration: float, realtime: bool, core: int, priority: int) -> Dict[str, float]:
+    """
+    * Replays a recording through the full joint pipeline, and returns the period jitter summary (see Joint.jitter).
+    """
+
+    # Variables (Assignment):
+    # Joint:
+    # NOTE: Telemetry is throttled to one record per second, its logging stays out of the measurement.
+    joint: Joint = Joint(replay=replay, duration=duration, telemetry={"rate": 1.0}, realtime=realtime, core=core, priority=priority)
+
+    # Logic:
+    joint.actuate()
+
+    return {**joint.jitter.summary(), "deadline_misses": joint.deadline_misses, "worst_period_ms": joint.worst_period * 1000}
+
+
+# Main:
+if __name__ == "__main__":
+    # Variables (Assignment):
+    # Parser:
+    parser: ArgumentParser = ArgumentParser(description="Measures the control loop period jitter of a replay without, then with, the real-time mode.")
+
+    # Arguments:
+    parser.add_argument("--replay", default="./data/static-data.csv", help="CSV or session recording to replay.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of control loop per run.")
+    parser.add_argument("--core", type=int, default=RealTime.CORE, help="Core the control thread is pinned to in real-time mode.")
+    parser.add_argument("--priority", type=int, default=RealTime.PRIORITY, help="SCHED_FIFO priority of the control thread in real-time mode.")
+    parser.add_argument("--output", default=None, help="Write both summaries to a JSON file.")
+
+    # Arguments:
+    arguments: Namespace = parser.parse_args()
+
+    # Variables (Assignment):
+    # Summaries:
+    # NOTE: Both runs share the process, real-time mode restores the scheduling and the collector when the joint terminates.
+    summaries: List[Tuple[str, Dict[str, float]]] = [
+        (name, measure_jitter(arguments.replay, arguments.duration, realtime, arguments.core, arguments.priority)) for name, realtime in (("standard", False), ("real-time", True))
+    ]
+
+    # Logic:
+    for name, summary in summaries:
+        logger.info("[*] {:<9} | Periods: {:>6} | p50: {:8.1f} us | p99: {:8.1f} us | Max: {:8.1f} us | Deadline misses: {}".format(
+            name, summary["count"], summary["p50_us"], summary["p99_us"], summary["max_us"], summary["deadline_misses"]
+        ))
+
+    if arguments.output is not None:
+        with open(arguments.output, "w") as file:
+            json.dump(dict(summaries), file, indent=4)
@@ -0,0 +1,736 @@
+# Written by: Christopher Gholmieh
+# Imports:
+
+# Components:
+from components.calculator import Calculator, ReplaySpatial, SensorGraph
+from components.learner import Learner
+from components.learner.forest import Forest
+from components.learner.features import FeatureExtractor
+from components.writer import Writer, RegisterBackend
+
+# Typing:
+from typing import Optional, Dict, List, Tuple, Any
+
+# Collections:
+from collections import Counter
+
+# Loguru:
+from loguru import logger
+
+# Argparse:
+from argparse import ArgumentParser, Namespace
+
+# Pandas:
+from pandas import read_csv
+
+# Time:
+from time import perf_counter
+
+# Tempfile:
+from tempfile import TemporaryDirectory
+
+# OS:
+import os
+
+# CTypes:
+import ctypes
+
+# System:
+import sys
+
+# Numpy:
+import numpy
+
+
+# Methods:
+def measure(predict, windows: numpy.ndarray) -> float:
+    # Variables (Assignment):
+    # Start:
+    start: float = perf_counter()
+
+    # Logic:
+    for window in windows:
+        predict(window.reshape(1, -1))
+
+    return (perf_counter() - start) / len(windows) * 1e6
+
+
+def create_sliding_windows(data: List[List[Any]], window_size: int, stride: int) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    """
+    * Reference windowing (the original per-row loop), the label of a window is Counter.most_common of its labels.
+    """
+
+    # Variables (Assignment):
+    # Windows & Labels:
+    windows, labels = [], []
+
+    # Logic:
+    for iteration in range(0, len(data) - window_size + 1, stride):
+        # Window:
+        windows.append([float(value) for row in data[iteration:iteration + window_size] for value in row[:-1]])
+
+        # Label:
+        labels.append(Counter(row[-1] for row in data[iteration:iteration + window_size]).most_common(1)[0][0])
+
+    return numpy.array(windows, dtype=numpy.float32), numpy.array(labels)
+
+
+def verify_windows(data_path: str) -> int:
+    """
+    * Checks that the vectorized and the chunked windowing match the reference loop, over strides, window sizes, and chunk sizes.
+        * Labels are shuffled within short runs, so ties and majorities are exercised.
+        * Returns the amount of mismatching configurations.
+    """
+
+    # Variables (Assignment):
+    # Data:
+    data: List[List[Any]] = read_csv(data_path).values.tolist()
+
+    # Labels:
+    labels: List[str] = [row[-1] for row in data]
+
+    numpy.random.default_rng(0).shuffle(labels)
+
+    data = [row[:-1] + [label] for row, label in zip(data, labels)]
+
+    # Mismatches:
+    mismatches: int = 0
+
+    # Logic:
+    with TemporaryDirectory() as directory:
+        # Variables (Assignment):
+        # Path:
+        path: str = os.path.join(directory, "shuffled.csv")
+
+        # Logic:
+        with open(path, "w") as file:
+            file.write(",".join(read_csv(data_path, nrows=0).columns) + "\n")
+            file.writelines(",".join(str(value) for value in row) + "\n" for row in data)
+
+        for window_size in (1, 2, 3, 5):
+            for stride in (1, 2, 3):
+                # Variables (Assignment):
+                # Learner:
+                learner: Learner = Learner(learner_path="")
+                learner.window_size, learner.stride = window_size, stride
+
+                # Expected:
+                expected_windows, expected_labels = create_sliding_windows(data, window_size, stride)
+
+                # Logic:
+                for name, (windows, window_labels) in [("vectorized", learner.create_sliding_windows(data))] + [
+                    ("chunked ({})".format(chunk_size), learner.read_windows([path], chunk_size)) for chunk_size in (7, 100)
+                ]:
+                    if not (numpy.array_equal(windows, expected_windows) and numpy.array_equal(window_labels, expected_labels)):
+                        # Logging:
+                        logger.error("[!] Windowing mismatch ({}): window size {}, stride {}.".format(name, window_size, stride))
+
+                        # Logic:
+                        mismatches += 1
+
+    logger.info("[*] Windowing parity: {} mismatching configurations.".format(mismatches))
+
+    return mismatches
+
+
+def verify_features(data_path: str, horizons: Tuple[int, ...] = (2, 5, 25)) -> int:
+    """
+    * Checks that the incremental feature extractor (runtime) and its batch transform (training) produce bit-identical features.
+        * Also checks that chunked windows with features match the windows of the whole recording.
+        * Returns the amount of mismatching horizons.
+    """
+
+    # Variables (Assignment):
+    # Readings:
+    readings: numpy.ndarray = read_csv(data_path).iloc[:, :6].to_numpy(dtype=numpy.float32)
+
+    # Mismatches:
+    mismatches: int = 0
+
+    # Logic:
+    for horizon in horizons:
+        # Variables (Assignment):
+        # Extractor:
+        extractor: FeatureExtractor = FeatureExtractor(horizon)
+
+        # Incremental:
+        incremental: numpy.ndarray = numpy.zeros((len(readings), FeatureExtractor.SIZE), dtype=numpy.float32)
+
+        # Logic:
+        for index, reading in enumerate(readings.tolist()):
+            extractor.update(reading[:3], reading[3:])
+            extractor.values(incremental[index])
+
+        # Variables (Assignment):
+        # Learner:
+        learner: Learner = Learner(learner_path="", horizon=horizon)
+
+        # Windows:
+        windows, _ = learner.read_windows(data_path)
+        chunked_windows, _ = learner.read_windows(data_path, chunk_size=horizon + 1)
+
+        # Logic:
+        if not numpy.array_equal(incremental, FeatureExtractor.transform(readings, horizon)) or not numpy.array_equal(windows, chunked_windows):
+            # Logging:
+            logger.error("[!] Feature mismatch with a horizon of {}.".format(horizon))
+
+            # Logic:
+            mismatches += 1
+
+    logger.info("[*] Feature parity: {} / {} horizons bit-identical between the incremental and batch extractors.".format(
+        len(horizons) - mismatches, len(horizons)
+    ))
+
+    return mismatches
+
+
+def verify_forest(learner_path: str, data_path: str, forest_path: Optional[str] = None) -> int:
+    """
+    * Checks that the forest engines predict exactly the same labels as sklearn on every sliding window.
+        * Covers the compiled engine, the numpy fallback, and optionally a converted .forest file.
+        * Returns the amount of mismatching windows.
+    """
+
+    # Variables (Assignment):
+    # Learner:
+    learner: Learner = Learner(learner_path=learner_path)
+    learner.load()
+
+    # Windows:
+    windows, _ = learner.create_sliding_windows(read_csv(data_path).values.tolist())
+    windows = windows.astype(numpy.float32)
+
+    # Reference:
+    expected: numpy.ndarray = learner.encoder.inverse_transform(learner.learner.predict(windows))
+
+    # Engines:
+    engines: Dict[str, Forest] = {"compiled": learner.forest, "numpy": Forest.from_classifier(learner.learner, learner.encoder)}
+
+    if forest_path is not None:
+        engines[forest_path] = Forest.load(forest_path)
+        engines[forest_path].bind()
+
+    # Mismatches:
+    mismatches: int = 0
+
+    # Logic:
+    for name, forest in engines.items():
+        # Variables (Assignment):
+        # Mismatches:
+        engine_mismatches: int = int(numpy.count_nonzero(expected != forest.predict(windows)))
+
+        # Logging:
+        logger.info("[*] Forest parity ({}): {} / {} windows match sklearn, {:.1f} us per window.".format(
+            name, len(windows) - engine_mismatches, len(windows), measure(forest.predict, windows[:200])
+        ))
+
+        # Logic:
+        mismatches += engine_mismatches
+
+    logger.info("[*] Single window latency (sklearn): {:.1f} us".format(measure(learner.learner.predict, windows[:50])))
+
+    return mismatches
+
+
+def verify_cascade(learner_path: str, data_path: str) -> int:
+    """
+    * Checks that the fused C cascade decides exactly like its definition on every sliding window.
+        * The first stage alone when its numpy confidence reaches the threshold, otherwise the label sklearn predicts.
+        * Covers the compiled cascade and the numpy fallback, returns the amount of mismatching windows.
+    """
+
+    # SKLearn:
+    from sklearn.ensemble import RandomForestClassifier
+
+    # Variables (Assignment):
+    # Learner:
+    learner: Learner = Learner(learner_path=learner_path)
+    learner.load()
+
+    # Windows:
+    windows, labels = learner.create_sliding_windows(read_csv(data_path).values.tolist())
+    windows = windows.astype(numpy.float32)
+
+    # Cascade:
+    # NOTE: Parity checks the engines rather than the calibration, the first stage (shaped like fit_cascade's) is calibrated on the verified
+    #       windows themselves without the held-out check of fit_cascade, so both stages decide a share of them.
+    cascade: Forest = Forest.from_classifier(
+        RandomForestClassifier(n_estimators=3, max_depth=4, random_state=learner.state).fit(windows, learner.encoder.transform(labels)), learner.encoder, learner.horizon
+    )
+
+    predictions, confidences = cascade.vote(windows)
+
+    threshold: Optional[float] = Learner.calibrate_confidence(confidences, cascade.classes[predictions] == learner.forest.predict(windows), 0.99)
+
+    # Validation:
+    if threshold is None:
+        logger.error("[!] Cascade parity: no first stage could be calibrated on {}.".format(data_path))
+
+        return 1
+
+    # Logic:
+    cascade.confidence = threshold
+    cascade.bind()
+
+    learner.cascade = cascade
+
+    # Reference:
+    predictions, confidences = learner.cascade.vote(windows)
+
+    decided: numpy.ndarray = confidences >= learner.cascade.confidence
+    expected: numpy.ndarray = numpy.where(decided, learner.cascade.classes[predictions], learner.encoder.inverse_transform(learner.learner.predict(windows)))
+
+    # Stage:
+    # NOTE: Unbound copy of the first stage, predicting through the numpy fallback.
+    stage: Forest = Forest(
+        learner.cascade.features, learner.cascade.thresholds, learner.cascade.left_children, learner.cascade.right_children, learner.cascade.values,
+        learner.cascade.roots, learner.cascade.classes, learner.cascade.feature_count, learner.cascade.horizon, learner.cascade.confidence
+    )
+
+    # Engines:
+    engines: Dict[str, Tuple[Forest, Forest]] = {
+        "compiled": (learner.cascade, learner.forest), "numpy": (stage, Forest.from_classifier(learner.learner, learner.encoder)),
+    }
+
+    # Mismatches:
+    mismatches: int = 0
+
+    # Logic:
+    for name, (first_stage, forest) in engines.items():
+        # Variables (Assignment):
+        # Results:
+        results: List[Tuple[str, bool]] = [first_stage.predict_cascade(forest, window[numpy.newaxis]) for window in windows]
+
+        # Mismatches:
+        engine_mismatches: int = sum(label != expected[index] or stage_decided != decided[index] for index, (label, stage_decided) in enumerate(results))
+
+        # Logging:
+        logger.info("[*] Cascade parity ({}): {} / {} windows match, the first stage decides {:.1%} of them.".format(
+            name, len(windows) - engine_mismatches, len(windows), decided.mean()
+        ))
+
+        # Logic:
+        mismatches += engine_mismatches
+
+    return mismatches
+
+
+def verify_quaternions(data_path: str, count: int = 2000, tolerance: float = 0.1) -> int:
+    """
+    * Checks that the quaternion flexion of the calculator matches the original scipy implementation on random unit quaternion pairs:
+      the z component of (shank * thigh^-1).as_euler("xyz"), clamped to [0, 180] degrees.
+        * NOTE: The quaternions are [w, x, y, z] as the Phidget reports them, so they are read scalar first.
+        * Covers both halves of the double cover (negative scalar parts) and the calibration offset.
+        * Returns the amount of pairs further than the tolerance (in degrees) from scipy.
+    """
+
+    # Imports:
+    from scipy.spatial.transform import Rotation
+
+    # Variables (Assignment):
+    # Calculator:
+    calculator: Calculator = Calculator(use_quaternions=True, spatial_factory=lambda: ReplaySpatial(data_path))
+    calculator.actuated = True
+
+    # Quaternions:
+    quaternions: numpy.ndarray = numpy.random.default_rng(0).normal(size=(count, 2, 4))
+    quaternions /= numpy.linalg.norm(quaternions, axis=2, keepdims=True)
+
+    # Reference:
+    expected: numpy.ndarray = numpy.clip((
+        Rotation.from_quat(quaternions[:, 1], scalar_first=True) * Rotation.from_quat(quaternions[:, 0], scalar_first=True).inv()
+    ).as_euler("xyz", degrees=True)[:, 2], 0.0, 180.0)
+
+    # Flexions:
+    flexions: numpy.ndarray = numpy.zeros(count)
+
+    # Logic:
+    for index, (thigh_quaternion, shank_quaternion) in enumerate(quaternions):
+        # Quaternions:
+        calculator.thigh_quaternion[:], calculator.shank_quaternion[:] = thigh_quaternion, shank_quaternion
+
+        # Flexion:
+        flexions[index] = calculator.calculate()
+
+    # Variables (Assignment):
+    # Mismatches:
+    mismatches: int = int(numpy.count_nonzero(numpy.abs(flexions - expected) > tolerance))
+
+    # Calibration:
+    calculator.thigh_quaternion[:], calculator.shank_quaternion[:] = quaternions[0]
+    calculator.calibrate()
+
+    # Logic:
+    if abs(calculator.calculate()) > tolerance:
+        mismatches += 1
+
+    logger.info("[*] Quaternion parity: {} / {} pairs within {} degrees of scipy, worst error {:.4f} degrees.".format(
+        count - mismatches, count, tolerance, numpy.abs(flexions - expected).max()
+    ))
+
+    return mismatches
+
+
+def verify_lookup(data_path: str, resolution: int = Calculator.LOOKUP_RESOLUTION, count: int = 100000, offsets: Tuple[float, ...] = (0.0, -20.0, 35.0)) -> int:
+    """
+    * Checks the pulse modulation table against the exact flexion and modulation path, over the full dot product range.
+        * Every dot product from -1 to 1 (and the table entries with their midpoints) is checked under several calibration offsets.
+        * The flexion at the looked up entry must stay within Calculator.lookup_error, and the modulation within the steps that error spans.
+        * Returns the amount of dot products outside of those bounds.
+    """
+
+    # Variables (Assignment):
+    # Calculator:
+    calculator: Calculator = Calculator(spatial_factory=lambda: ReplaySpatial(data_path), lookup_resolution=resolution)
+    calculator.actuated = True
+
+    # Library:
+    library: Any = calculator.library
+
+    # Bound:
+    bound: float = Calculator.lookup_error(resolution)
+
+    # Steps:
+    # NOTE: A flexion error spans at most floor(error / step) + 1 pulse modulation steps of 180 / 224 degrees.
+    steps: int = int(bound / (180.0 / 224.0)) + 1
+
+    # Entries:
+    entries: numpy.ndarray = numpy.linspace(-1.0, 1.0, resolution)
+
+    # Dots:
+    # NOTE: With the thigh orientation along z, the float32 dot product is exactly the z component of the shank orientation.
+    dots: numpy.ndarray = numpy.unique(numpy.concatenate([
+        numpy.linspace(-1.0, 1.0, count), entries, (entries[1:] + entries[:-1]) / 2.0
+    ]).astype(numpy.float32))
+
+    # Counters:
+    mismatches, exact, worst = 0, 0, 0.0
+
+    # Logic:
+    calculator.thigh_orientation[:] = (0.0, 0.0, 1.0)
+
+    for offset in offsets:
+        # Calibration:
+        calculator.calibration_offset = offset
+        calculator.build_modulation_table()
+
+        # Variables (Assignment):
+        # Indices:
+        indices: numpy.ndarray = numpy.floor((dots + numpy.float32(1.0)) * numpy.float32(0.5 * (resolution - 1)) + numpy.float32(0.5)).astype(numpy.int64)
+
+        # Errors:
+        # NOTE: Flexion of the dot product against the flexion of the entry it is looked up at, both clamped like the exact path.
+        errors: numpy.ndarray = numpy.abs(
+            numpy.clip(numpy.degrees(numpy.arccos(dots.astype(numpy.float64))) + offset, 0.0, 180.0) -
+            numpy.clip(numpy.degrees(numpy.arccos(numpy.clip(entries[indices], -1.0, 1.0))) + offset, 0.0, 180.0)
+        )
+
+        worst = max(worst, float(errors.max()))
+
+        # Logic:
+        for dot, error in zip(dots.tolist(), errors.tolist()):
+            # Orientation:
+            calculator.shank_orientation[:] = (numpy.sqrt(max(1.0 - dot * dot, 0.0)), 0.0, dot)
+
+            # Variables (Assignment):
+            # Modulations:
+            expected: int = library.calculate_pulse_modulation(library.calculate_flexion_angle(calculator.thigh_pointer, calculator.shank_pointer, offset))
+            looked_up: int = calculator.lookup_pulse_modulation()
+
+            # Logic:
+            if abs(looked_up - expected) > steps or error > bound + 1e-4:
+                mismatches += 1
+
+            exact += looked_up == expected
+
+    # Variables (Assignment):
+    # Total:
+    total: int = len(dots) * len(offsets)
+
+    # Logic:
+    logger.info("[*] Lookup parity: {} / {} dot products within bounds at resolution {} ({} bytes), {:.2%} exact modulations, worst flexion error {:.4f} degrees (bound {:.4f}, {} step{}).".format(
+        total - mismatches, total, resolution, resolution, exact / total, worst, bound, steps, "" if steps == 1 else "s"
+    ))
+
+    return mismatches
+
+
+def verify_batches(data_path: str, count: int = 20000, offset: float = 12.5) -> int:
+    """
+    * Checks the array methods of the calculator bit for bit against the single pair kernels, on random orientations and quaternions.
+        * Fused orientations are checked against update_orientation applied reading by reading.
+        * Angles span beyond both ends of the pulse modulation range, so both clamps are covered.
+        * Returns the amount of mismatching rows.
+    """
+
+    # Variables (Assignment):
+    # Calculator:
+    calculator: Calculator = Calculator(spatial_factory=lambda: ReplaySpatial(data_path))
+
+    # Library:
+    library: Any = calculator.library
+
+    # Generator:
+    generator: numpy.random.Generator = numpy.random.default_rng(0)
+
+    # Orientations & Quaternions:
+    orientations: numpy.ndarray = generator.normal(size=(2, count, 3)).astype(numpy.float32)
+    orientations /= numpy.linalg.norm(orientations, axis=2, keepdims=True)
+
+    quaternions: numpy.ndarray = generator.normal(size=(2, count, 4)).astype(numpy.float32)
+    quaternions /= numpy.linalg.norm(quaternions, axis=2, keepdims=True)
+
+    # Angles:
+    angles: numpy.ndarray = generator.uniform(-30.0, 210.0, size=count).astype(numpy.float32)
+
+    # Readings & Intervals:
+    # NOTE: One interval in a hundred is zero, so the estimate resets mid-batch like on a timestamp reset.
+    readings: numpy.ndarray = numpy.concatenate([generator.normal(size=(count, 3)), generator.normal(scale=90.0, size=(count, 3))], axis=1).astype(numpy.float32)
+    intervals: numpy.ndarray = numpy.where(generator.random(count) < 0.01, 0.0, generator.uniform(0.004, 0.04, size=count)).astype(numpy.float32)
+
+    # Batches:
+    flexions: numpy.ndarray = calculator.calculate_flexion_angles(orientations[0], orientations[1], offset)
+    quaternion_flexions: numpy.ndarray = calculator.calculate_quaternion_flexion_angles(quaternions[0], quaternions[1], offset)
+    modulations: numpy.ndarray = calculator.calculate_pulse_modulations(angles)
+
+    # NOTE: Fused in two chunks, so the carried estimate is covered.
+    fused: numpy.ndarray = numpy.empty((count, 3), dtype=numpy.float32)
+    estimate: numpy.ndarray = numpy.array([0.0, 0.0, 1.0], dtype=numpy.float32)
+
+    calculator.fuse_orientations(readings[:count // 2], intervals[:count // 2], estimate, fused[:count // 2])
+    calculator.fuse_orientations(readings[count // 2:], intervals[count // 2:], estimate, fused[count // 2:])
+
+    # Mismatches:
+    mismatches: int = 0
+
+    # Orientation:
+    orientation: numpy.ndarray = numpy.array([0.0, 0.0, 1.0], dtype=numpy.float32)
+    orientation_pointer: Any = orientation.ctypes.data_as(ctypes.POINTER(ctypes.c_float))
+
+    # Logic:
+    for index in range(count):
+        # Variables (Assignment):
+        # Pointers:
+        pointers: List[Any] = [array[index].ctypes.data_as(ctypes.POINTER(ctypes.c_float)) for array in (*orientations, *quaternions)]
+
+        # Logic:
+        library.update_orientation(
+            orientation_pointer, readings[index, :3].ctypes.data_as(ctypes.POINTER(ctypes.c_float)), readings[index, 3:].ctypes.data_as(ctypes.POINTER(ctypes.c_float)),
+            float(intervals[index]), calculator.time_constant
+        )
+
+        if (
+            library.calculate_flexion_angle(pointers[0], pointers[1], offset) != flexions[index] or
+            library.calculate_quaternion_flexion_angle(pointers[2], pointers[3], offset) != quaternion_flexions[index] or
+            library.calculate_pulse_modulation(float(angles[index])) != modulations[index] or
+            not numpy.array_equal(orientation, fused[index])
+        ):
+            mismatches += 1
+
+    logger.info("[*] Batch parity: {} / {} rows bit-identical between the array methods and the single pair kernels.".format(count - mismatches, count))
+
+    return mismatches
+
+
+def verify_joints(data_path: str, count: int = 2000) -> int:
+    """
+    * Checks calculate_joints, in both fusion modes, bit for bit against the single pair kernels on a five sensor graph
+      whose eight joints share sensors and run in both directions.
+        * Every trial draws new orientations, quaternions, and per-joint calibration offsets.
+        * Returns the amount of mismatching joint angles.
+    """
+
+    # Variables (Assignment):
+    # Graph:
+    graph: SensorGraph = SensorGraph(
+        {"a": 0, "b": 1, "c": 2, "d": 3, "e": 4},
+        {"ab": ["a", "b"], "bc": ["b", "c"], "cd": ["c", "d"], "de": ["d", "e"], "ba": ["b", "a"], "ae": ["a", "e"], "ec": ["e", "c"], "db": ["d", "b"]}
+    )
+
+    # Calculators:
+    calculator: Calculator = Calculator(spatial_factory=lambda: ReplaySpatial(data_path), graph=graph)
+    quaternion_calculator: Calculator = Calculator(use_quaternions=True, spatial_factory=lambda: ReplaySpatial(data_path), graph=graph)
+
+    for instance in (calculator, quaternion_calculator):
+        instance.actuated = True
+
+    # Library:
+    library: Any = calculator.library
+
+    # Generator:
+    generator: numpy.random.Generator = numpy.random.default_rng(0)
+
+    # Mismatches:
+    mismatches: int = 0
+
+    # Logic:
+    for _ in range(count):
+        # Variables (Assignment):
+        # Orientations & Quaternions:
+        orientations: numpy.ndarray = generator.normal(size=(len(graph), 3)).astype(numpy.float32)
+        quaternions: numpy.ndarray = generator.normal(size=(len(graph), 4)).astype(numpy.float32)
+
+        # Logic:
+        calculator.orientations[:] = orientations / numpy.linalg.norm(orientations, axis=1, keepdims=True)
+        quaternion_calculator.quaternions[:] = quaternions / numpy.linalg.norm(quaternions, axis=1, keepdims=True)
+
+        for instance in (calculator, quaternion_calculator):
+            instance.calibration_offsets[:] = generator.uniform(-40.0, 40.0, size=len(graph.joints))
+
+        # Variables (Assignment):
+        # Angles:
+        angles: numpy.ndarray = calculator.calculate_joints().copy()
+        quaternion_angles: numpy.ndarray = quaternion_calculator.calculate_joints().copy()
+
+        # Logic:
+        for joint, (proximal, distal) in enumerate(zip(graph.proximal.tolist(), graph.distal.tolist())):
+            # Variables (Assignment):
+            # Pointers:
+            pointers: List[Any] = [
+                array[row].ctypes.data_as(ctypes.POINTER(ctypes.c_float)) for array in (calculator.orientations, quaternion_calculator.quaternions) for row in (proximal, distal)
+            ]
+
+            # Logic:
+            if library.calculate_flexion_angle(pointers[0], pointers[1], float(calculator.calibration_offsets[joint])) != angles[joint]:
+                mismatches += 1
+
+            if library.calculate_quaternion_flexion_angle(pointers[2], pointers[3], float(quaternion_calculator.calibration_offsets[joint])) != quaternion_angles[joint]:
+                mismatches += 1
+
+    logger.info("[*] Joint parity: {} / {} joint angles bit-identical between calculate_joints and the single pair kernels.".format(
+        count * len(graph.joints) * 2 - mismatches, count * len(graph.joints) * 2
+    ))
+
+    return mismatches
+
+
+def verify_registers(count: int = 5000) -> int:
+    """
+    * Checks the register backend bit by bit against the pin order of the wiringPi writer (GPIO 14 holds the most significant bit),
+      on a file standing in for the GPIO block.
+        * After every write, the pins driven high must match the written value, and the set and clear words must hold exactly the changed pins.
+        * A stop must always write both words: every modulation pin cleared and the STOP pin set, whatever the tracked state.
+        * Returns the amount of mismatching writes.
+    """
+
+    # Variables (Assignment):
+    # Pins:
+    pins, stop = Writer.PINS, Writer.STOP_PIN
+
+    # Values:
+    values: numpy.ndarray = numpy.random.default_rng(0).integers(-1, 256, size=count)
+
+    # Logic:
+    with TemporaryDirectory() as directory:
+        # Variables (Assignment):
+        # Path:
+        # NOTE: The stand-in is created here, the backend never creates its path.
+        path: str = os.path.join(directory, "gpiomem")
+
+        open(path, "wb").close()
+
+        # Backend:
+        backend: RegisterBackend = RegisterBackend(path=path)
+
+        # Registers:
+        registers: numpy.memmap = numpy.memmap(backend.path, dtype=numpy.uint32, mode="r")
+
+        # State:
+        state: int = 0
+
+        # Counters:
+        mismatches, writes = 0, 0
+
+        # Logic:
+        for value in values.tolist():
+            # Variables (Assignment):
+            # Expected:
+            expected: int = (1 << stop) if value < 0 else sum(1 << pin for bit, pin in enumerate(pins) if (value >> (7 - bit)) & 1)
+
+            # Words:
+            set_word, clear_word = int(registers[7]), int(registers[10])
+
+            # Writes:
+            if value < 0:
+                performed: int = backend.library.write_register_stop_pin()
+            else:
+                performed: int = backend.library.write_register_pulse_modulation(value)
+
+            writes += performed
+
+            # Changed:
+            changed: int = expected ^ state
+
+            # Words:
+            # NOTE: A word keeps its previous mask when the write skips its register.
+            if value < 0:
+                expected_set, expected_clear, expected_writes = 1 << stop, sum(1 << pin for pin in pins), 2
+            else:
+                expected_set, expected_clear, expected_writes = (changed & expected) or set_word, (changed & state) or clear_word, bool(changed & expected) + bool(changed & state)
+
+            # Logic:
+            if backend.state() != expected or performed != expected_writes:
+                mismatches += 1
+            elif (int(registers[7]), int(registers[10])) != (expected_set, expected_clear):
+                mismatches += 1
+
+            state = expected
+
+        backend.close()
+
+    logger.info("[*] Register parity: {} / {} writes match the writer pin order, {:.2f} register writes per GPIO write.".format(
+        count - mismatches, count, writes / count
+    ))
+
+    return mismatches
+
+
+# Main:
+if __name__ == "__main__":
+    # Variables (Assignment):
+    # Parser:
+    parser: ArgumentParser = ArgumentParser(description="Verifies the optimized engines against their reference implementations.")
+
+    # Arguments:
+    parser.add_argument("--learner", default="./learners/one-step-learner.pkl", help="Path to the learner.")
+    parser.add_argument("--data", default="./data/static-data.csv", help="CSV file used for verification.")
+    parser.add_argument("--forest", default=None, help="Converted .forest file that should match the learner.")
+    parser.add_argument("--resolution", type=int, default=Calculator.LOOKUP_RESOLUTION, help="Resolution of the verified pulse modulation table.")
+    parser.add_argument("--check", choices=("forest", "cascade", "quaternion", "lookup", "batches", "joints", "registers", "windows", "features", "all"), default="all", help="Which engines to verify.")
+
+    # Arguments:
+    arguments: Namespace = parser.parse_args()
+
+    # Variables (Assignment):
+    # Mismatches:
+    mismatches: int = 0
+
+    # Logic:
+    if arguments.check in ("forest", "all"):
+        mismatches += verify_forest(arguments.learner, arguments.data, arguments.forest)
+
+    if arguments.check in ("cascade", "all"):
+        mismatches += verify_cascade(arguments.learner, arguments.data)
+
+    if arguments.check in ("quaternion", "all"):
+        mismatches += verify_quaternions(arguments.data)
+
+    if arguments.check in ("lookup", "all"):
+        mismatches += verify_lookup(arguments.data, arguments.resolution)
+
+    if arguments.check in ("batches", "all"):
+        mismatches += verify_batches(arguments.data)
+
+    if arguments.check in ("joints", "all"):
+        mismatches += verify_joints(arguments.data)
+
+    if arguments.check in ("registers", "all"):
+        mismatches += verify_registers()
+
+    if arguments.check in ("windows", "all"):
+        mismatches += verify_windows(arguments.data)
+
+    if arguments.check in ("features", "all"):
+        mismatches += verify_features(arguments.data)
+
+    sys.exit(1 if mismatches else 0)
@@ -0,0 +1,430 @@
+# Written by: Christopher Gholmieh
+# Imports:
+
+# Components:
+from components.calculator import Calculator, ReplaySpatial
+from components.learner import Learner
+from components.recorder import Recorder
+
+# Typing:
+from typing import Optional, Dict, List, Tuple, Iterator, Any
+
+# Loguru:
+from loguru import logger
+
+# Argparse:
+from argparse import ArgumentParser, Namespace
+
+# Pandas:
+from pandas import DataFrame, read_csv
+
+# Time:
+from time import perf_counter_ns
+
+# Math:
+from math import degrees, acos
+
+# JSON:
+import json
+
+# System:
+import sys
+
+# Numpy:
+import numpy
+
+
+# Constants:
+STAGES: Tuple[str, ...] = ("read", "calibrate", "fuse", "window", "predict", "flexion", "modulation")
+
+STOP_LABEL: str = "standing still"
+
+CALIBRATION_DELAY: float = 2.0
+
+
+# Methods:
+def read(path: str, chunk_size: int, interval: int) -> Iterator[Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray]]:
+    """
+    * Yields (thigh, shank, thigh_intervals, shank_intervals, labels) chunks of a recording, at most chunk_size readings at a time.
+        * Readings are (rows, 6) float32 [acceleration..., angular_rotation...], intervals the seconds elapsed before every reading (0 first).
+        * Session files are memory-mapped, every thigh and shank record (resolved by name, see Recorder.row) is kept (unlabelled ones too) and the nth thigh reading is paired
+          with the nth shank reading, intervals come from the device timestamps.
+        * CSV recordings hold shank readings only, they are fed to both IMUs like ReplaySpatial does, every interval milliseconds apart.
+    """
+
+    # Logic:
+    if path.endswith(Recorder.EXTENSION):
+        # Variables (Assignment):
+        # Records, Labels & Sensors:
+        records, labels, sensors = Recorder.load(path)
+
+        # Readings:
+        shank, shank_labels = Recorder.select(records, labels, sensors, Recorder.SHANK, labelled=False)
+        thigh, _ = Recorder.select(records, labels, sensors, Recorder.THIGH, labelled=False)
+
+        # Intervals:
+        intervals: List[numpy.ndarray] = [
+            numpy.diff(records["device_timestamp"][records["imu"] == Recorder.row(sensors, sensor)], prepend=numpy.nan) / 1000 for sensor in (Recorder.THIGH, Recorder.SHANK)
+        ]
+
+        # Logic:
+        # NOTE: A session without thigh records is fed to both IMUs, like a CSV recording.
+        if not len(thigh):
+            thigh, intervals[0] = shank, intervals[1]
+
+        # Variables (Assignment):
+        # Rows:
+        rows: int = min(len(thigh), len(shank))
+
+        # Logic:
+        for start in range(0, rows, chunk_size):
+            # Variables (Assignment):
+            # Chunk:
+            chunk: slice = slice(start, min(start + chunk_size, rows))
+
+            # Logic:
+            yield thigh[chunk], shank[chunk], *(numpy.nan_to_num(values[chunk]).astype(numpy.float32) for values in intervals), shank_labels[chunk]
+
+        return
+
+    # Variables (Assignment):
+    # First:
+    first: bool = True
+
+    # Logic:
+    for chunk in read_csv(path, chunksize=chunk_size):
+        # Variables (Assignment):
+        # Readings:
+        readings: numpy.ndarray = chunk.iloc[:, :-1].to_numpy(dtype=numpy.float32)
+
+        # Intervals:
+        intervals: numpy.ndarray = numpy.full(len(readings), interval / 1000, dtype=numpy.float32)
+
+        # Logic:
+        if first:
+            intervals[0], first = 0.0, False
+
+        yield readings, readings, intervals, intervals, chunk.iloc[:, -1].to_numpy(dtype=str)
+
+
+def calibrate(calculator: Calculator, chunks: Iterator[Tuple[numpy.ndarray, ...]]) -> float:
+    """
+    * Returns the knee calibration offset at the first reading CALIBRATION_DELAY seconds into a recording, like Calculator.calibrate after Calculator.actuate's delay.
+        * Fuses the chunks up to that reading only, continued across chunks, so the offset does not depend on the chunk size.
+        * NOTE: A recording shorter than CALIBRATION_DELAY calibrates on its last reading.
+    """
+
+    # Variables (Assignment):
+    # Estimates:
+    thigh_orientation: numpy.ndarray = numpy.array([0.0, 0.0, 1.0], dtype=numpy.float32)
+    shank_orientation: numpy.ndarray = numpy.array([0.0, 0.0, 1.0], dtype=numpy.float32)
+
+    # Elapsed:
+    elapsed: float = 0.0
+
+    # Offset:
+    offset: float = 0.0
+
+    # Logic:
+    for thigh, shank, thigh_intervals, shank_intervals, _ in chunks:
+        # Variables (Assignment):
+        # Orientations:
+        shank_orientations: numpy.ndarray = calculator.fuse_orientations(shank, shank_intervals, shank_orientation)
+        thigh_orientations: numpy.ndarray = calculator.fuse_orientations(thigh, thigh_intervals, thigh_orientation) if thigh is not shank else shank_orientations
+
+        # Times:
+        times: numpy.ndarray = elapsed + numpy.cumsum(shank_intervals, dtype=numpy.float64)
+
+        # Calibration:
+        calibration: int = int(numpy.searchsorted(times, CALIBRATION_DELAY))
+
+        # Offset:
+        # NOTE: Calculator.calibrate's knee offset, computed directly since the calculator is never actuated.
+        offset = degrees(acos(calculator.clamp(-1.0, float(numpy.dot(thigh_orientations[min(calibration, len(shank) - 1)], shank_orientations[min(calibration, len(shank) - 1)])), 1.0)))
+
+        # Logic:
+        if calibration < len(shank):
+            break
+
+        elapsed = float(times[-1])
+
+    return offset
+
+
+def run(path: str, learner_path: str, calibration_offset: Optional[float] = None, chunk_size: int = 65536, interval: int = ReplaySpatial.DATA_INTERVAL, decisions_path: Optional[str] = None, keep: bool = False) -> Dict[str, Any]:
+    """
+    * Streams a recording through the offline pipeline as fast as possible, chunk by chunk:
+        * fuse: both IMUs' orientations (Calculator.fuse_orientations, continued across chunks).
+        * window: the shank windows, one per reading once the first window is full (Learner.window, stride 1).
+        * predict: the gait state of every window (Learner.predict_windows).
+        * flexion, modulation: the knee flexion and pulse modulation at every window's last reading (Calculator array methods).
+
+    * Stop is set wherever the prediction is STOP_LABEL, the runtime then writes the stop pin instead of the modulation.
+    * Without a calibration offset, the pipeline first calibrates on the reading CALIBRATION_DELAY seconds in, like Calculator.actuate (calibrate, timed as its own stage).
+
+    * Returns the summary (throughput, per-stage time, accuracy against the recording labels), with the decision stream when kept.
+        * NOTE: Writing the decisions (decisions_path) is reported separately (write), it is neither part of the throughput nor of the stage shares.
+    """
+
+    # Variables (Assignment):
+    # Learner:
+    learner: Learner = Learner(learner_path=learner_path)
+    learner.load()
+
+    # Calculator:
+    # NOTE: Never actuated, the array methods need neither the IMUs nor the handlers.
+    calculator: Calculator = Calculator(use_quaternions=False, spatial_factory=lambda: ReplaySpatial(path))
+
+    # Estimates:
+    thigh_orientation: numpy.ndarray = numpy.array([0.0, 0.0, 1.0], dtype=numpy.float32)
+    shank_orientation: numpy.ndarray = numpy.array([0.0, 0.0, 1.0], dtype=numpy.float32)
+
+    # Carry:
+    # NOTE: The last readings of a chunk, so windows and features span chunk boundaries (see Learner.stream_windows).
+    carry: int = max(learner.window_size, learner.horizon) - 1
+
+    carry_readings: numpy.ndarray = numpy.empty((0, 6), dtype=numpy.float32)
+    carry_labels: numpy.ndarray = numpy.empty(0, dtype=str)
+
+    # Times:
+    times: Dict[str, int] = dict.fromkeys(STAGES + ("write",), 0)
+
+    # Calibration:
+    if calibration_offset is None:
+        # Variables (Assignment):
+        # Start:
+        start: int = perf_counter_ns()
+
+        # Logic:
+        calibration_offset = calibrate(calculator, read(path, chunk_size, interval))
+
+        times["calibrate"] += perf_counter_ns() - start
+
+    # Counters:
+    samples, decisions, labelled, correct, stops, row = 0, 0, 0, 0, 0, 0
+
+    recording: float = 0.0
+
+    # Decisions:
+    kept: Dict[str, List[numpy.ndarray]] = {"prediction": [], "modulation": [], "stop": []}
+
+    # Logic:
+    chunks: Iterator[Tuple[numpy.ndarray, ...]] = read(path, chunk_size, interval)
+
+    while True:
+        # Read:
+        start: int = perf_counter_ns()
+
+        chunk: Optional[Tuple[numpy.ndarray, ...]] = next(chunks, None)
+
+        times["read"] += perf_counter_ns() - start
+
+        # Logic:
+        if chunk is None:
+            break
+
+        # Variables (Assignment):
+        # Chunk:
+        thigh, shank, thigh_intervals, shank_intervals, labels = chunk
+
+        # Fuse:
+        start = perf_counter_ns()
+
+        shank_orientations: numpy.ndarray = calculator.fuse_orientations(shank, shank_intervals, shank_orientation)
+        thigh_orientations: numpy.ndarray = calculator.fuse_orientations(thigh, thigh_intervals, thigh_orientation) if thigh is not shank else shank_orientations
+
+        times["fuse"] += perf_counter_ns() - start
+
+        # Window:
+        start = perf_counter_ns()
+
+        readings: numpy.ndarray = numpy.concatenate([carry_readings, shank])
+        labels = numpy.concatenate([carry_labels, labels])
+
+        windows, window_labels = learner.window(readings, labels, row - len(carry_readings), len(carry_readings)) if len(readings) >= learner.window_size else (
+            numpy.empty((0, learner.buffer.shape[1]), dtype=numpy.float32), numpy.empty(0, dtype=str)
+        )
+
+        carry_readings, carry_labels = readings[len(readings) - min(carry, len(readings)):], labels[len(labels) - min(carry, len(labels)):]
+
+        times["window"] += perf_counter_ns() - start
+
+        # Predict:
+        start = perf_counter_ns()
+
+        predictions: numpy.ndarray = learner.predict_windows(windows)
+
+        times["predict"] += perf_counter_ns() - start
+
+        # Flexion:
+        # NOTE: Windows end at the last readings of the chunk, one per reading.
+        start = perf_counter_ns()
+
+        flexions: numpy.ndarray = calculator.calculate_flexion_angles(thigh_orientations[len(shank) - len(windows):], shank_orientations[len(shank) - len(windows):], calibration_offset)
+
+        times["flexion"] += perf_counter_ns() - start
+
+        # Modulation:
+        start = perf_counter_ns()
+
+        modulations: numpy.ndarray = calculator.calculate_pulse_modulations(flexions)
+        stop: numpy.ndarray = predictions == STOP_LABEL
+
+        times["modulation"] += perf_counter_ns() - start
+
+        # Statistics:
+        mask: numpy.ndarray = window_labels != ""
+
+        labelled += int(mask.sum())
+        correct += int((predictions[mask] == window_labels[mask]).sum())
+
+        stops += int(stop.sum())
+
+        recording += float(shank_intervals.sum())
+
+        # Write:
+        start = perf_counter_ns()
+
+        if decisions_path is not None:
+            DataFrame({
+                "row": numpy.arange(row + len(shank) - len(windows), row + len(shank)), "label": window_labels, "prediction": predictions,
+                "flexion": flexions, "modulation": modulations, "stop": stop
+            }).to_csv(decisions_path, mode="w" if row == 0 else "a", header=row == 0, index=False)
+
+        if keep:
+            for name, values in (("prediction", predictions), ("modulation", modulations), ("stop", stop)):
+                kept[name].append(values)
+
+        times["write"] += perf_counter_ns() - start
+
+        # Counters:
+        samples += len(shank)
+        decisions += len(windows)
+
+        row += len(shank)
+
+    # Variables (Assignment):
+    # Elapsed:
+    # NOTE: The pipeline stages only, writing the decisions is the tool's own output.
+    elapsed: float = sum(times[stage] for stage in STAGES) / 1e9
+
+    # Summary:
+    summary: Dict[str, Any] = {
+        "input": path,
+        "learner": learner_path,
+        "samples": samples,
+        "decisions": decisions,
+        "seconds": elapsed,
+        "samples_per_second": samples / elapsed if elapsed else 0.0,
+        "per_sample_us": elapsed * 1e6 / samples if samples else 0.0,
+        "recording_seconds": recording,
+        "realtime_factor": recording / elapsed if elapsed else 0.0,
+        "stages": {
+            stage: {"seconds": times[stage] / 1e9, "share": times[stage] / 1e9 / elapsed if elapsed else 0.0, "per_sample_us": times[stage] / 1e3 / samples if samples else 0.0}
+            for stage in STAGES
+        },
+        "write": {"seconds": times["write"] / 1e9, "per_sample_us": times["write"] / 1e3 / samples if samples else 0.0},
+        "calibration_offset": calibration_offset,
+        "accuracy": correct / labelled if labelled else None,
+        "stop_share": stops / decisions if decisions else 0.0,
+    }
+
+    # Logic:
+    if learner.cascade is not None:
+        summary["cascade"] = {"first_stage": learner.decisions[0], "full_forest": learner.decisions[1]}
+
+    if keep:
+        summary["stream"] = {name: numpy.concatenate(values) if values else numpy.empty(0) for name, values in kept.items()}
+
+    return summary
+
+
+def compare(stream: Dict[str, numpy.ndarray], reference_path: str) -> Dict[str, int]:
+    """
+    * Counts the decisions differing from a decision stream written earlier (see run), per column, over the rows both hold.
+    """
+
+    # Variables (Assignment):
+    # Reference:
+    reference: DataFrame = read_csv(reference_path, usecols=["prediction", "modulation", "stop"], keep_default_na=False)
+
+    # Rows:
+    rows: int = min(len(reference), len(stream["prediction"]))
+
+    # Logic:
+    return {
+        "rows": rows,
+        "length": abs(len(reference) - len(stream["prediction"])),
+        **{name: int((reference[name].to_numpy()[:rows] != stream[name][:rows]).sum()) for name in ("prediction", "modulation", "stop")},
+    }
+
+
+# Main:
+if __name__ == "__main__":
+    # Variables (Assignment):
+    # Parser:
+    parser: ArgumentParser = ArgumentParser(description="Streams a recording through fusion, windowing, prediction, flexion, and modulation as fast as possible, and reports throughput.")
+
+    # Arguments:
+    parser.add_argument("input", help="CSV or session recording to stream through the pipeline.")
+    parser.add_argument("--learner", default="./learners/one-step-learner.forest", help="Learner predicting the gait state (.forest or .pkl).")
+    parser.add_argument("--calibration-offset", type=float, default=None, help="Calibration offset in degrees, calibrated {} seconds in by default.".format(CALIBRATION_DELAY))
+    parser.add_argument("--chunk-size", type=int, default=65536, help="Readings read and processed per chunk.")
+    parser.add_argument("--interval", type=int, default=ReplaySpatial.DATA_INTERVAL, help="Data interval in milliseconds of CSV recordings.")
+    parser.add_argument("--decisions", default=None, help="Write the decision stream (row, label, prediction, flexion, modulation, stop) to a CSV file.")
+    parser.add_argument("--compare", default=None, help="Compare the decision stream against one written earlier, exit with 1 when they differ.")
+    parser.add_argument("--output", default=None, help="Write the summary to a JSON file.")
+
+    # Arguments:
+    arguments: Namespace = parser.parse_args()
+
+    # Variables (Assignment):
+    # Summary:
+    summary: Dict[str, Any] = run(
+        arguments.input, arguments.learner, arguments.calibration_offset, arguments.chunk_size, arguments.interval, arguments.decisions, arguments.compare is not None
+    )
+
+    # Stream:
+    stream: Optional[Dict[str, numpy.ndarray]] = summary.pop("stream", None)
+
+    # Logic:
+    logger.info("[*] {} samples, {} decisions in {:.3f} s | {:,.0f} samples/s | {:.2f} us per sample | {:.0f}x real time ({:.1f} s recorded).".format(
+        summary["samples"], summary["decisions"], summary["seconds"], summary["samples_per_second"], summary["per_sample_us"], summary["realtime_factor"], summary["recording_seconds"]
+    ))
+
+    for stage, times in summary["stages"].items():
+        logger.info("[*] {:<10} {:8.3f} s | {:6.1%} | {:8.3f} us per sample".format(stage, times["seconds"], times["share"], times["per_sample_us"]))
+
+    if arguments.decisions is not None:
+        logger.info("[*] {:<10} {:8.3f} s | {:>6} | {:8.3f} us per sample (not part of the throughput).".format("write", summary["write"]["seconds"], "-", summary["write"]["per_sample_us"]))
+
+    logger.info("[*] Calibration offset: {:.4f} degrees | Accuracy: {} | Stop: {:.1%} of decisions.".format(
+        summary["calibration_offset"], "{:.2%}".format(summary["accuracy"]) if summary["accuracy"] is not None else "unlabelled", summary["stop_share"]
+    ))
+
+    if "cascade" in summary:
+        logger.info("[*] Cascade: {first_stage} decided by the first stage, {full_forest} by the full forest.".format(**summary["cascade"]))
+
+    # Mismatches:
+    mismatches: int = 0
+
+    if stream is not None:
+        # Variables (Assignment):
+        # Differences:
+        differences: Dict[str, int] = compare(stream, arguments.compare)
+
+        # Logic:
+        summary["differences"] = differences
+
+        mismatches = differences["length"] + differences["prediction"] + differences["modulation"] + differences["stop"]
+
+        logger.info("[*] Against {}: {} rows compared | predictions: {} | modulations: {} | stops: {} differ{}.".format(
+            arguments.compare, differences["rows"], differences["prediction"], differences["modulation"], differences["stop"],
+            "" if not differences["length"] else " | {} rows only in one stream".format(differences["length"])
+        ))
+
+    if arguments.output is not None:
+        with open(arguments.output, "w") as file:
+            json.dump(summary, file, indent=4)
+
+    sys.exit(1 if mismatches else 0)
@@ -0,0 +1,82 @@
+# Written by: Christopher Gholmieh
+# Imports:
+
+# Components:
+from components.recorder import Recorder
+
+# Loguru:
+from loguru import logger
+
+# Argparse:
+from argparse import ArgumentParser, Namespace
+
+# Numpy:
+import numpy
+
+
+# Methods:
+def summarize(path: str) -> None:
+    """
+    * Logs the amount of records, labels, and the device timestamp span of every sensor in a session file.
+    """
+
+    # Variables (Assignment):
+    # Records, Labels & Sensors:
+    records, labels, sensors = Recorder.load(path)
+
+    # Logic:
+    logger.info("[*] {}: {} records, labels {}, sensors {}.".format(path, len(records), labels, sensors))
+
+    for name in sensors:
+        # Variables (Assignment):
+        # Records:
+        imu_records: numpy.ndarray = records[records["imu"] == Recorder.row(sensors, name)]
+
+        # Logic:
+        if not len(imu_records):
+            continue
+
+        # Variables (Assignment):
+        # Counts:
+        counts: numpy.ndarray = numpy.bincount(imu_records["label"] + 1, minlength=len(labels) + 1)
+
+        # Logic:
+        logger.info("[*] {}: {} records over {:.1f} s | unlabelled: {} | {}".format(
+            name.capitalize(), len(imu_records), (imu_records["device_timestamp"][-1] - imu_records["device_timestamp"][0]) / 1000, counts[0],
+            " | ".join("{}: {}".format(label, count) for label, count in zip(labels, counts[1:]) if count)
+        ))
+
+
+# Main:
+if __name__ == "__main__":
+    # Variables (Assignment):
+    # Parser:
+    parser: ArgumentParser = ArgumentParser(description="Converts CSV recordings to and from binary session files, or summarizes a session file.")
+
+    # Arguments:
+    parser.add_argument("command", choices=("import", "export", "summary"), help="import: CSV to session, export: session to CSV, summary: describe a session.")
+    parser.add_argument("input", help="Path to the CSV recording (import) or session file (export, summary).")
+    parser.add_argument("output", nargs="?", default=None, help="Path to the session file (import) or CSV recording (export).")
+    parser.add_argument("--sensor", default=Recorder.SHANK, help="Sensor (by sensor graph name) the CSV recording holds.")
+    parser.add_argument("--interval", type=int, default=16, help="Data interval in milliseconds, used to synthesize timestamps when importing.")
+
+    # Arguments:
+    arguments: Namespace = parser.parse_args()
+
+    # Logic:
+    if arguments.command == "summary":
+        summarize(arguments.input)
+    elif arguments.command == "import":
+        # Variables (Assignment):
+        # Output:
+        output: str = arguments.output or arguments.input.rsplit(".", 1)[0] + Recorder.EXTENSION
+
+        # Logic:
+        logger.info("[*] Imported {} rows from {} into {}.".format(Recorder.from_csv(arguments.input, output, arguments.sensor, arguments.interval), arguments.input, output))
+    else:
+        # Variables (Assignment):
+        # Output:
+        output: str = arguments.output or arguments.input.rsplit(".", 1)[0] + ".csv"
+
+        # Logic:
+        logger.info("[*] Exported {} labelled rows from {} into {}.".format(Recorder.to_csv(arguments.input, output, arguments.sensor), arguments.input, output))
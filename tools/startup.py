@@ -0,0 +1,145 @@
+# Written by: Christopher Gholmieh
+# Imports:
+
+# Joint:
+from joint import Joint
+
+# Typing:
+from typing import Optional, List, Tuple, IO
+
+# Loguru:
+from loguru import logger
+
+# Argparse:
+from argparse import ArgumentParser, Namespace
+
+# Subprocess:
+from subprocess import Popen, PIPE, DEVNULL, TimeoutExpired
+
+# Threading:
+from threading import Thread
+
+# Queue:
+from queue import Queue, Empty
+
+# Time:
+from time import perf_counter
+
+# Signal:
+import signal
+
+# System:
+import sys
+
+
+# Constants:
+SHUTDOWN_TIMEOUT: float = 10.0
+
+
+# Methods:
+def forward_lines(stream: IO[str], lines: "Queue[Optional[str]]") -> None:
+    """
+    * Forwards every line of a stream into a queue, then None once the stream is closed.
+    """
+
+    # Logic:
+    for line in stream:
+        lines.put(line)
+
+    lines.put(None)
+
+
+def measure_cold_start(arguments: List[str], timeout: float) -> Tuple[float, List[Tuple[int, str]]]:
+    """
+    * Launches joint.py with -X importtime and measures the time from process launch to the first Writer write.
+        * Returns the cold start time in seconds and the cumulative import time (microseconds) of each top-level module.
+        * The joint is interrupted (CTRL + C) once the first write is observed, or once the timeout elapsed without it.
+        * NOTE: Stderr is read by a thread, so the timeout holds even when the joint stops writing to it, stdout is discarded.
+    """
+
+    # Variables (Assignment):
+    # Launch:
+    launch: float = perf_counter()
+
+    # Deadline:
+    deadline: float = launch + timeout
+
+    # Process:
+    process: Popen = Popen([sys.executable, "-X", "importtime", "joint.py", *arguments], stderr=PIPE, stdout=DEVNULL, text=True)
+
+    # Lines:
+    lines: "Queue[Optional[str]]" = Queue()
+
+    Thread(target=forward_lines, args=(process.stderr, lines), daemon=True).start()
+
+    # Imports:
+    imports: List[Tuple[int, str]] = []
+
+    # Logic:
+    try:
+        while True:
+            # Variables (Assignment):
+            # Line:
+            try:
+                line: Optional[str] = lines.get(timeout=max(0.0, deadline - perf_counter()))
+            except Empty:
+                break
+
+            # Logic:
+            if line is None:
+                break
+
+            if line.startswith("import time:") and "|" in line:
+                # Variables (Assignment):
+                # Columns:
+                _, cumulative, name = line.split("|")
+
+                # Logic:
+                if cumulative.strip().isdigit() and not name.startswith("   "):
+                    imports.append((int(cumulative), name.strip()))
+
+            elif Joint.FIRST_WRITE_MESSAGE in line:
+                return perf_counter() - launch, imports
+
+        raise RuntimeError("joint.py exited or timed out before writing to the GPIO pins!")
+    finally:
+        process.send_signal(signal.SIGINT)
+
+        try:
+            process.wait(timeout=SHUTDOWN_TIMEOUT)
+        except TimeoutExpired:
+            logger.warning("[!] joint.py did not stop after CTRL + C, killing it.")
+
+            process.kill()
+            process.wait()
+
+
+# Main:
+if __name__ == "__main__":
+    # Variables (Assignment):
+    # Parser:
+    parser: ArgumentParser = ArgumentParser(description="Reports the cold start time of joint.py, from process launch to the first GPIO write.")
+
+    # Arguments:
+    parser.add_argument("--budget", type=float, default=5.0, help="Maximum allowed cold start time in seconds.")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for the first write.")
+    parser.add_argument("joint_arguments", nargs="*", help="Arguments forwarded to joint.py (prefix with --).")
+
+    # Arguments:
+    arguments: Namespace = parser.parse_args()
+
+    # Variables (Assignment):
+    # Measurement:
+    cold_start, imports = measure_cold_start(arguments.joint_arguments, arguments.timeout)
+
+    # Logging:
+    for cumulative, name in sorted(imports, reverse=True)[:10]:
+        logger.info("[*] Import {:<40} {:>8.1f} ms".format(name, cumulative / 1000))
+
+    logger.info("[*] Cold start: {:.3f} s (budget {:.3f} s)".format(cold_start, arguments.budget))
+
+    # Logic:
+    if cold_start > arguments.budget:
+        logger.error("[!] Cold start exceeded the budget.")
+
+        sys.exit(1)
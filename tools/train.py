@@ -0,0 +1,295 @@
+# Written by: Christopher Gholmieh
+# Imports:
+
+# Components:
+from components.learner import Learner
+from components.learner.forest import Forest
+from components.learner.features import FeatureExtractor
+
+# Typing:
+from typing import Optional, Sequence, Dict, List, Tuple, Any
+
+# Loguru:
+from loguru import logger
+
+# Argparse:
+from argparse import ArgumentParser, Namespace
+
+# Time:
+from time import perf_counter_ns
+
+# System:
+import sys
+
+# Numpy:
+import numpy
+
+
+# Constants:
+LATENCY_PREDICTIONS: int = 2000
+
+CHUNK_SIZE: int = 100000
+
+
+# Methods:
+def fit(estimators: int, depth: Optional[int], windows: numpy.ndarray, labels: numpy.ndarray, state: int) -> Any:
+    # SKLearn:
+    from sklearn.ensemble import RandomForestClassifier
+
+    # Logic:
+    return RandomForestClassifier(n_estimators=estimators, max_depth=depth, random_state=state).fit(windows, labels)
+
+
+def measure_latency(forest: Forest, windows: numpy.ndarray) -> Tuple[float, float]:
+    """
+    * Times single-window predictions (like the control loop performs them), returning the p50 and p99 in microseconds.
+    """
+
+    # Variables (Assignment):
+    # Timings:
+    timings: numpy.ndarray = numpy.zeros(len(windows))
+
+    # Logic:
+    for index, window in enumerate(windows):
+        # Variables (Assignment):
+        # Start:
+        start: int = perf_counter_ns()
+
+        # Logic:
+        forest.predict(window)
+
+        timings[index] = (perf_counter_ns() - start) / 1000
+
+    return float(numpy.percentile(timings, 50)), float(numpy.percentile(timings, 99))
+
+
+def measure_cascade(learner: Learner, windows: numpy.ndarray, labels: numpy.ndarray) -> Dict[str, Dict[str, float]]:
+    """
+    * Runs every window through Learner.predict without and with the cascade, reporting the share decided by each stage, latency, and accuracy.
+    """
+
+    # Variables (Assignment):
+    # Cascade:
+    cascade: Any = learner.cascade
+
+    # Raw:
+    raw: int = learner.window_size * FeatureExtractor.CHANNELS
+
+    # Results:
+    results: Dict[str, Dict[str, float]] = {}
+
+    # Logic:
+    for name, stage in (("forest", None), ("cascade", cascade)):
+        # Variables (Assignment):
+        # Timings:
+        timings: numpy.ndarray = numpy.zeros(len(windows))
+
+        # Predictions:
+        predictions: List[str] = []
+
+        # Learner:
+        learner.cascade = stage
+
+        # Warm Up:
+        for window in windows[:LATENCY_PREDICTIONS // 10]:
+            learner.predict(window[:raw].reshape(learner.window_size, -1), window[raw:] if learner.horizon else None)
+
+        learner.decisions = [0, 0]
+
+        # Logic:
+        for index, window in enumerate(windows):
+            # Variables (Assignment):
+            # Start:
+            start: int = perf_counter_ns()
+
+            # Logic:
+            predictions.append(learner.predict(window[:raw].reshape(learner.window_size, -1), window[raw:] if learner.horizon else None))
+
+            timings[index] = (perf_counter_ns() - start) / 1000
+
+        results[name] = {
+            "first_stage": learner.decisions[0] / len(windows), "mean_us": float(timings.mean()), "p99_us": float(numpy.percentile(timings, 99)),
+            "accuracy": float(numpy.mean(numpy.array(predictions) == labels)),
+        }
+
+        logger.info("[*] {:<7} | First stage decides: {:6.1%} | Mean: {:8.1f} us | p99: {:8.1f} us | Accuracy: {:.4f}".format(
+            name.capitalize(), results[name]["first_stage"], results[name]["mean_us"], results[name]["p99_us"], results[name]["accuracy"]
+        ))
+
+    return results
+
+
+def search(data_paths: Sequence[str], estimators: Sequence[int], depths: Sequence[Optional[int]], budget: float, jobs: int, horizons: Sequence[int] = (0,), cascade: bool = False) -> Tuple[Optional[Learner], List[Dict[str, Any]]]:
+    """
+    * Fits every (estimators, depth, horizon) candidate in parallel, and validates them on the most recent windows of the recordings.
+        * A horizon of 0 classifies the raw windows, other horizons append the FeatureExtractor features of that many readings.
+        * NOTE: Recordings are concatenated in the given order, pass them oldest first.
+        * Latency is the p99 of single-window predictions through the Forest engine, measured one candidate at a time.
+        * The best candidate is the most accurate one within the latency budget (ties go to the fastest one).
+        * With cascade, a first stage is fitted in front of the best candidate, and both are measured through Learner.predict.
+    """
+
+    # Joblib:
+    from joblib import Parallel, delayed
+
+    # SKLearn:
+    from sklearn.preprocessing import LabelEncoder
+
+    # Variables (Assignment):
+    # Encoder:
+    encoder: LabelEncoder = LabelEncoder()
+
+    # Learner:
+    learner: Learner = Learner(learner_path="")
+
+    # Recordings:
+    # NOTE: Every recording is read and windowed once, every horizon yields the same windows and labels, only the appended features differ.
+    recordings: List[Tuple[numpy.ndarray, numpy.ndarray]] = [
+        (numpy.concatenate([readings for readings, _ in chunks]), numpy.concatenate([labels for _, labels in chunks]))
+        for chunks in (list(learner.read_chunks(path, CHUNK_SIZE)) for path in data_paths) if chunks
+    ]
+
+    recordings = [(readings, labels) for readings, labels in recordings if len(readings) >= learner.window_size]
+
+    # Validation:
+    if not recordings:
+        raise ValueError("No recording holds at least {} readings!".format(learner.window_size))
+
+    # Windows:
+    windowed: List[Tuple[numpy.ndarray, numpy.ndarray]] = [learner.window(readings, labels) for readings, labels in recordings]
+
+    windows: numpy.ndarray = numpy.concatenate([recording_windows for recording_windows, _ in windowed])
+    labels: numpy.ndarray = encoder.fit_transform(numpy.concatenate([window_labels for _, window_labels in windowed]))
+
+    # Ends:
+    # NOTE: The last reading of every window, where its features are taken (see Learner.window).
+    ends: List[numpy.ndarray] = [numpy.arange(len(recording_windows)) * learner.stride + learner.window_size - 1 for recording_windows, _ in windowed]
+
+    # Splits:
+    splits: Dict[int, Tuple[numpy.ndarray, ...]] = {}
+
+    for horizon in horizons:
+        # Variables (Assignment):
+        # Features:
+        features: numpy.ndarray = windows if not horizon else numpy.concatenate([
+            windows, numpy.concatenate([FeatureExtractor.transform(readings, horizon)[recording_ends] for (readings, _), recording_ends in zip(recordings, ends)])
+        ], axis=1)
+
+        # Logic:
+        splits[horizon] = learner.split(features, labels)
+
+    # Candidates:
+    candidates: List[Tuple[int, Optional[int], int]] = [(estimator, depth, horizon) for horizon in horizons for estimator in estimators for depth in depths]
+
+    # Classifiers:
+    classifiers: List[Any] = Parallel(n_jobs=jobs)(
+        delayed(fit)(estimator, depth, splits[horizon][0], splits[horizon][2], learner.state) for estimator, depth, horizon in candidates
+    )
+
+    # Results:
+    results: List[Dict[str, Any]] = []
+
+    # Logic:
+    for (estimator, depth, horizon), classifier in zip(candidates, classifiers):
+        # Variables (Assignment):
+        # Split:
+        _, window_test, _, label_test = splits[horizon]
+
+        # Forest:
+        forest: Forest = Forest.from_classifier(classifier, encoder, horizon=horizon)
+        forest.bind()
+
+        # Latency:
+        p50, p99 = measure_latency(forest, numpy.resize(window_test, (LATENCY_PREDICTIONS, window_test.shape[1])))
+
+        # Logic:
+        results.append({
+            "estimators": estimator, "depth": depth, "horizon": horizon, "nodes": len(forest.features),
+            "accuracy": float(numpy.mean(forest.predict(window_test) == encoder.inverse_transform(label_test))),
+            "p50_us": p50, "p99_us": p99, "classifier": classifier, "forest": forest,
+        })
+
+        logger.info("[*] Estimators: {:>4} | Depth: {:>4} | Horizon: {:>3} | Nodes: {:>7} | Accuracy: {:.4f} | p50: {:8.1f} us | p99: {:8.1f} us{}".format(
+            estimator, depth or "-", horizon or "-", results[-1]["nodes"], results[-1]["accuracy"], p50, p99, "" if p99 <= budget else " (over budget)"
+        ))
+
+    # Variables (Assignment):
+    # Eligible:
+    eligible: List[Dict[str, Any]] = [result for result in results if result["p99_us"] <= budget]
+
+    # Logic:
+    if not eligible:
+        return None, results
+
+    # Variables (Assignment):
+    # Best:
+    best: Dict[str, Any] = max(eligible, key=lambda result: (result["accuracy"], -result["p99_us"]))
+
+    # Learner:
+    learner = Learner(learner_path="", estimators=best["estimators"], depth=best["depth"], horizon=best["horizon"])
+
+    learner.learner, learner.encoder, learner.forest = best["classifier"], encoder, best["forest"]
+    learner.bind()
+
+    # Cascade:
+    if cascade:
+        # Variables (Assignment):
+        # Split:
+        window_train, window_test, label_train, label_test = splits[best["horizon"]]
+
+        # Logic:
+        if learner.fit_cascade(window_train, label_train, window_test) is not None:
+            # Variables (Assignment):
+            # Evaluation:
+            # NOTE: Measured on the held-out half only, the calibration half decided the threshold.
+            _, evaluation = learner.split_calibration(len(window_test))
+
+            # Logic:
+            measure_cascade(learner, window_test[evaluation], encoder.inverse_transform(label_test[evaluation]))
+
+    return learner, results
+
+
+# Main:
+if __name__ == "__main__":
+    # Variables (Assignment):
+    # Parser:
+    parser: ArgumentParser = ArgumentParser(description="Searches learners within a per-prediction latency budget, and saves the most accurate one.")
+
+    # Arguments:
+    parser.add_argument("--data", nargs="+", default=["./data/static-data.csv"], help="Time-ordered CSV or session recordings used for training and validation.")
+    parser.add_argument("--output", default=None, help="Path of the saved learner (.pkl pair and .forest, or .forest only), required unless --dry-run is given.")
+    parser.add_argument("--budget", type=float, default=100.0, help="Maximum p99 single-window prediction latency in microseconds.")
+    parser.add_argument("--estimators", type=int, nargs="+", default=[10, 25, 50, 100], help="Amounts of trees to search.")
+    parser.add_argument("--depths", type=int, nargs="+", default=[6, 10, 16, 0], help="Maximum tree depths to search (0 for unlimited).")
+    parser.add_argument("--horizons", type=int, nargs="+", default=[0, 25], help="Feature horizons to search in readings (0 for raw windows only).")
+    parser.add_argument("--cascade", action="store_true", help="Fit a cheap first stage in front of the best candidate, and report how often each stage decides.")
+    parser.add_argument("--jobs", type=int, default=-1, help="Amount of candidates fitted in parallel (-1 for every core).")
+    parser.add_argument("--dry-run", action="store_true", help="Report the candidates without saving the best one.")
+
+    # Arguments:
+    arguments: Namespace = parser.parse_args()
+
+    # Validation:
+    # NOTE: Never defaults to the deployed learner, a search only replaces it when asked to.
+    if arguments.output is None and not arguments.dry_run:
+        parser.error("--output is required unless --dry-run is given.")
+
+    # Variables (Assignment):
+    # Search:
+    learner, _ = search(arguments.data, arguments.estimators, [depth or None for depth in arguments.depths], arguments.budget, arguments.jobs, arguments.horizons, arguments.cascade)
+
+    # Logic:
+    if learner is None:
+        logger.error("[!] No candidate meets the {:.1f} us budget.".format(arguments.budget))
+
+        sys.exit(1)
+
+    logger.info("[*] Best candidate: {} estimators, depth {}, horizon {}.".format(learner.estimators, learner.depth or "unlimited", learner.horizon or "none"))
+
+    if not arguments.dry_run:
+        # Path:
+        learner.learner_path = arguments.output
+
+        # Logic:
+        learner.save()